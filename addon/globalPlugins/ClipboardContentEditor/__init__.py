@@ -2,10 +2,17 @@
 # Copyright (C) 2026 Fauzan January
 # Released under GPL 2
 
+import contextlib
+import io
+import os
+import re
+
 import addonHandler
 import api
 import globalPluginHandler
+import globalVars
 import gui
+import speech
 from gui import guiHelper
 from gui.settingsDialogs import SettingsPanel, NVDASettingsDialog
 
@@ -14,6 +21,44 @@ import tones
 import ui
 import wx
 from scriptHandler import script
+from speech.commands import CallbackCommand
+from speech.extensions import pre_speechCanceled
+
+from .appendSession import AppendSession
+from .backgroundJob import BackgroundJob
+from .backupHistory import BackupHistory, BackupStore
+from .clipboardFormats import (
+	FORMAT_FILES,
+	FORMAT_HTML,
+	FORMAT_IMAGE,
+	FORMAT_RTF,
+	REGISTERED_FORMAT_NAMES,
+	decodeFileList,
+	dibToBmp,
+	readPayload,
+)
+from .clipboardMonitor import ClipboardMonitor, Win32ClipboardBackend, textDigest
+from .compression import TextPacker, unpackText
+from .history import ClipboardHistory, makePreview
+from .historyArchive import ArchiveError, exportEntries, readArchive
+from .historyStore import HistoryStore
+from .ruleSets import RuleSyntaxError, compileRules, dumpRuleSets, formatRules, loadRuleSets, parseRules
+from .searchIndex import SearchIndex
+from .speechReader import SpeechReader
+from .textFile import LINE_ENDINGS, SAVE_ENCODINGS, writeTextFile
+from .spill import removeStaleSpillFiles
+from .textSearch import (
+	compileSearchPattern,
+	expandReplacement,
+	MatchIndex,
+	matchAt,
+	replaceAll,
+	replacementDeltas,
+)
+from .textStats import IncrementalStats, computeStats
+from .thumbnails import ThumbnailCache
+from .transforms import STEP_NAMES, UnknownStepError, compilePipeline, dumpPresets, formatSteps, loadPresets, parseSteps
+from .undoStack import STEP_DELTA_LIMIT, TextDelta, UndoStack, applyDeltas, compactStep, diffTexts
 
 addonHandler.initTranslation()
 
@@ -55,11 +100,52 @@ class InfoDialog(wx.Dialog):
 
 ADDON_SUMMARY = addonHandler.getCodeAddon().manifest["summary"]
 
+# Polling only reads the clipboard sequence number, so it can run often.
+CLIP_POLL_INTERVAL = 250
+# Editor statistics catch up with the text once typing pauses for this long (ms).
+STATS_UPDATE_DELAY = 300
+# Editor operations on at least this many characters run on a worker thread and can be canceled.
+JOB_THRESHOLD = 1024 * 1024
+# How often a running job announces its progress (ms).
+JOB_PROGRESS_INTERVAL = 2000
+# Texts longer than this open in large document mode: the text is kept outside the control,
+# which shows one page of it at a time (characters).
+LARGE_DOCUMENT_THRESHOLD = 4 * 1024 * 1024
+LARGE_DOCUMENT_PAGE_SIZE = 256 * 1024
+# How far a page boundary may move to fall after a line break (characters).
+PAGE_BREAK_SEARCH = 4096
+
+# History export and import handle this many bytes of text per batch, then let other
+# events such as clipboard polls run for this long before the next one (ms).
+TRANSFER_BATCH_SIZE = 4 * 1024 * 1024
+TRANSFER_BATCH_DELAY = 20
+
+# Payloads of other formats, images above all, are only read when restored or shown,
+# so they move to temporary files sooner than text does (bytes).
+PAYLOAD_SPILL_THRESHOLD = 1024 * 1024
+
+HISTORY_STORE_FILENAME = "history.log"
+BACKUP_STORE_FILENAME = "backups.dat"
+SPILL_DIRECTORY_NAME = "spill"
+# Characters of each level shown when choosing a backup.
+BACKUP_PREVIEW_LENGTH = 60
+
 confspec = {
 	"protectModeEnabled": "boolean(default=True)",
-	"backupLevels": "integer(default=1)",
+	"backupLevels": "integer(default=1, min=1, max=500)",
+	"persistBackups": "boolean(default=False)",
 	"soundEnabled": "boolean(default=True)",
 	"historySize": "string(default='10')",
+	"persistHistory": "boolean(default=False)",
+	"previewLength": "integer(default=80, min=10, max=1000)",
+	"previewCollapseWhitespace": "boolean(default=True)",
+	"memoryBudget": "integer(default=64, min=0)",
+	"compressThreshold": "integer(default=64, min=0)",
+	"spillThreshold": "integer(default=16, min=0)",
+	"ruleSets": "string(default='')",
+	"transformPresets": "string(default='')",
+	"saveEncoding": "string(default='utf-8')",
+	"saveLineEnding": "string(default='keep')",
 	"language": "string(default='default')",
 }
 config.conf.spec["ClipboardContentEditor"] = confspec
@@ -84,21 +170,93 @@ except Exception:
 
 
 def _buildInformationMessage(text):
-	charCount = len(text)
-	wordCount = len(text.split())
-	lineCount = len(text.splitlines()) if text else 0
-	# Paragraphs are separated by empty lines (double newline)
-	import re
-	paraCount = len([p for p in re.split(r'\n\s*\n', text) if p.strip()]) if text else 0
-	
-	return _("Clipboard information: {chars} characters, {words} words, {lines} lines, {paras} paragraphs").format(
-		chars=charCount,
-		words=wordCount,
-		lines=lineCount,
-		paras=paraCount,
+	return _formatStatsMessage(computeStats(text))
+
+
+def _formatStatsMessage(stats):
+	return _(
+		"Clipboard information: {chars} characters, {nonSpace} without whitespace, {words} words, "
+		"{sentences} sentences, {lines} lines, {paras} paragraphs"
+	).format(
+		chars=stats.chars,
+		nonSpace=stats.nonSpace,
+		words=stats.words,
+		sentences=stats.sentences,
+		lines=stats.lines,
+		paras=stats.paragraphs,
 	)
 
 
+def _formatSelectionStatsMessage(stats):
+	return _(
+		"Selection: {chars} characters, {nonSpace} without whitespace, {words} words, "
+		"{sentences} sentences, {lines} lines, {paras} paragraphs"
+	).format(
+		chars=stats.chars,
+		nonSpace=stats.nonSpace,
+		words=stats.words,
+		sentences=stats.sentences,
+		lines=stats.lines,
+		paras=stats.paragraphs,
+	)
+
+
+def _speakChunk(text, onDone):
+	# The callback fires once the synthesizer has spoken text; the reader continues on the GUI thread.
+	speech.speak([text, CallbackCommand(lambda: wx.CallAfter(onDone))])
+
+
+def _getDataDirectory():
+	path = os.path.join(globalVars.appArgs.configPath, "ClipboardContentEditor")
+	os.makedirs(path, exist_ok=True)
+	return path
+
+
+def _getSpillDirectory():
+	path = os.path.join(_getDataDirectory(), SPILL_DIRECTORY_NAME)
+	os.makedirs(path, exist_ok=True)
+	return path
+
+
+def _formatSize(size):
+	if size < 1024:
+		return _("{size} bytes").format(size=size)
+	if size < 1024 * 1024:
+		return _("{size:.1f} KB").format(size=size / 1024)
+	return _("{size:.1f} MB").format(size=size / (1024 * 1024))
+
+
+def _getRuleSets():
+	return loadRuleSets(config.conf["ClipboardContentEditor"].get("ruleSets", ""))
+
+
+def _saveRuleSets(ruleSets):
+	config.conf["ClipboardContentEditor"]["ruleSets"] = dumpRuleSets(ruleSets)
+
+
+def _getTransformPresets():
+	return loadPresets(config.conf["ClipboardContentEditor"].get("transformPresets", ""))
+
+
+def _saveTransformPresets(presets):
+	config.conf["ClipboardContentEditor"]["transformPresets"] = dumpPresets(presets)
+
+
+def _getSaveOptions():
+	# The encoding and line break chosen in the settings, as writeTextFile takes them.
+	encoding = config.conf["ClipboardContentEditor"].get("saveEncoding", "utf-8")
+	if encoding not in SAVE_ENCODINGS:
+		encoding = "utf-8"
+	return encoding, LINE_ENDINGS.get(config.conf["ClipboardContentEditor"].get("saveLineEnding", "keep"))
+
+
+def _getRunningPlugin():
+	for plugin in globalPluginHandler.runningPlugins:
+		if isinstance(plugin, GlobalPlugin):
+			return plugin
+	return None
+
+
 def _playSound(hz, duration):
 	if config.conf["ClipboardContentEditor"].get("soundEnabled", True):
 		tones.beep(hz, duration)
@@ -128,104 +286,80 @@ def _copyTextToClipboard(text):
 	return False
 
 
-def _isWordChar(ch):
-	return ch.isalnum() or ch == "_"
-
-
-def _isWordBoundary(fullText, start, end):
-	if start > 0 and _isWordChar(fullText[start - 1]):
-		return False
-	if end < len(fullText) and _isWordChar(fullText[end]):
-		return False
-	return True
+def _copyDataToClipboard(text, formats):
+	# Puts text back together with the rich formats captured with it; falls back to text alone.
+	if not formats:
+		return _copyTextToClipboard(text)
+	try:
+		data = wx.DataObjectComposite()
+		if text:
+			data.Add(wx.TextDataObject(text), True)
+		for name, payload in formats.items():
+			if name == FORMAT_FILES:
+				fileData = wx.FileDataObject()
+				for path in decodeFileList(payload):
+					fileData.AddFile(path)
+				data.Add(fileData)
+			elif name == FORMAT_IMAGE:
+				imageData = wx.CustomDataObject(wx.DataFormat(wx.DF_DIB))
+				imageData.SetData(payload)
+				data.Add(imageData)
+			else:
+				customData = wx.CustomDataObject(wx.DataFormat(REGISTERED_FORMAT_NAMES[name]))
+				customData.SetData(payload)
+				data.Add(customData)
+		if wx.TheClipboard.Open():
+			try:
+				if wx.TheClipboard.SetData(data):
+					return True
+			finally:
+				wx.TheClipboard.Close()
+	except Exception:
+		pass
+	return _copyTextToClipboard(text)
 
 
-def _findNextMatch(fullText, findText, startIndex, wholeWordsOnly, ignoreCase=False):
-	if ignoreCase:
-		searchText = fullText.lower()
-		searchFind = findText.lower()
-	else:
-		searchText = fullText
-		searchFind = findText
-	i = startIndex
-	while True:
-		idx = searchText.find(searchFind, i)
-		if idx == -1:
+def _makeThumbnail(payload, width, height):
+	# Decoding is left to wx, which reads every kind of bitmap Windows puts on the clipboard.
+	noLog = wx.LogNull()
+	try:
+		image = wx.Image(io.BytesIO(dibToBmp(payload)), wx.BITMAP_TYPE_BMP)
+		if not image.IsOk():
 			return None
-		end = idx + len(findText)
-		if not wholeWordsOnly or _isWordBoundary(fullText, idx, end):
-			return idx, end
-		i = idx + 1
-
-
-def _findNext(fullText, findText, startIndex, matchCase, wholeWordsOnly):
-	if matchCase:
-		return _findNextMatch(fullText, findText, startIndex, wholeWordsOnly)
-	return _findNextMatch(
-		fullText,
-		findText,
-		startIndex,
-		wholeWordsOnly,
-		ignoreCase=True,
-	)
-
+		return image.Scale(width, height, wx.IMAGE_QUALITY_HIGH).ConvertToBitmap()
+	finally:
+		del noLog
 
-def _matches(selection, findText, matchCase):
-	if not matchCase:
-		return selection.lower() == findText.lower()
-	return selection == findText
 
-
-def _selectionMatches(fullText, start, end, selection, findText, matchCase, wholeWordsOnly):
-	if not selection:
-		return False
-	if not _matches(selection, findText, matchCase):
+def _compileFindPattern(findText, matchCase, wholeWordsOnly, useRegex):
+	try:
+		return compileSearchPattern(findText, matchCase, wholeWordsOnly, useRegex)
+	except re.error as e:
+		_playSound(330, 100)
+		ui.message(_("Invalid regular expression: {error}").format(error=e))
+		return None
+
+
+def _selectMatch(editor, textCtrl, pattern, backwards=False):
+	matchIndex = editor.getMatchIndex(pattern)
+	start, end = editor.getSelection()
+	if backwards:
+		position = matchIndex.findPrevious(start, end)
+	else:
+		position = matchIndex.findNext(start, end)
+	if position is None:
+		_playSound(330, 100)
+		ui.message(_("Text not found"))
 		return False
-	if not wholeWordsOnly:
-		return True
-	return _isWordBoundary(fullText, start, end)
-
-
-def _applyReplacementCase(selection, replaceText):
-	letters = [ch for ch in selection if ch.isalpha()]
-	if not letters:
-		return replaceText
-	if all(ch.isupper() for ch in letters):
-		return replaceText.upper()
-	if all(ch.islower() for ch in letters):
-		return replaceText.lower()
-	if letters[0].isupper():
-		if not replaceText:
-			return replaceText
-		return replaceText.lower().capitalize()
-	return replaceText
-
-
-def _replaceAll(fullText, findText, replaceText, matchCase, wholeWordsOnly):
-	if matchCase:
-		searchText = fullText
-		searchFind = findText
+	textCtrl.SetFocus()
+	editor.setSelection(*matchIndex.span(position))
+	_playSound(750, 40)
+	if matchIndex.complete:
+		message = _("Match {current} of {total}")
 	else:
-		searchText = fullText.lower()
-		searchFind = findText.lower()
-	parts = []
-	count = 0
-	i = 0
-	while True:
-		idx = searchText.find(searchFind, i)
-		if idx == -1:
-			parts.append(fullText[i:])
-			break
-		end = idx + len(findText)
-		if not wholeWordsOnly or _isWordBoundary(fullText, idx, end):
-			parts.append(fullText[i:idx])
-			parts.append(_applyReplacementCase(fullText[idx:end], replaceText))
-			count += 1
-			i = end
-		else:
-			parts.append(fullText[i : idx + 1])
-			i = idx + 1
-	return "".join(parts), count
+		message = _("Match {current} of more than {total}")
+	ui.message(message.format(current=position + 1, total=len(matchIndex)))
+	return True
 
 
 class ClipboardEditorDialog(wx.Dialog):
@@ -235,6 +369,7 @@ class ClipboardEditorDialog(wx.Dialog):
 		initialText,
 		onClose,
 		onSave=None,
+		onSpeak=None,
 	):
 		super().__init__(
 			parent,
@@ -243,21 +378,45 @@ class ClipboardEditorDialog(wx.Dialog):
 		)
 		self._onClose = onClose
 		self._onSave = onSave
+		self._onSpeak = onSpeak
 		self._initialText = initialText
 		self._resultMessage = None
 		self._resultKind = None
 		self._closing = False
 		self._findDialog = None
 		self._findOnlyDialog = None
+		# Bumped on every change to the text; match indexes are only reused within one revision.
+		self._textRevision = 0
+		self._matchIndex = None
+		self._matchIndexKey = None
+		# Statistics of the text as of _statsRevision, brought up to date shortly after each change.
+		self._stats = None
+		self._statsRevision = 0
+		self._statsTimer = None
+		self._undoStack = UndoStack()
+		# The operation running on a worker thread, if any; the text is read-only meanwhile.
+		self._job = None
+		self._jobTimer = None
+		# In large document mode the text is kept in _stats and the control holds the page from
+		# _viewStart to _viewEnd; otherwise the control holds all of it and _viewStart stays 0.
+		self._largeDocument = len(initialText) > LARGE_DOCUMENT_THRESHOLD
+		self._viewStart = 0
+		self._viewEnd = 0
 
 		mainSizer = wx.BoxSizer(wx.VERTICAL)
-		textLabel = wx.StaticText(self, label=_("Clipboard content:"))
+		if self._largeDocument:
+			textLabel = wx.StaticText(
+				self,
+				label=_("Clipboard content, one page at a time (Ctrl+Page Down and Ctrl+Page Up change pages):"),
+			)
+		else:
+			textLabel = wx.StaticText(self, label=_("Clipboard content:"))
 		mainSizer.Add(textLabel, flag=wx.ALL | wx.EXPAND, border=8)
 
 		textSizer = wx.BoxSizer(wx.HORIZONTAL)
 		self._textCtrl = wx.TextCtrl(
 			self,
-			value=initialText,
+			value="" if self._largeDocument else initialText,
 			style=wx.TE_MULTILINE | wx.TE_RICH2,
 		)
 		textSizer.Add(self._textCtrl, proportion=1, flag=wx.EXPAND)
@@ -287,20 +446,41 @@ class ClipboardEditorDialog(wx.Dialog):
 		self._saveAsButton.Bind(wx.EVT_BUTTON, self.onSaveAs)
 		self._cancelButton.Bind(wx.EVT_BUTTON, self.onCancel)
 		self._toolsButton.Bind(wx.EVT_BUTTON, self.onToolsMenu)
+		self._textCtrl.Bind(wx.EVT_TEXT, self.onTextChanged)
+		if self._largeDocument:
+			self._stats = IncrementalStats(initialText)
+			self._showPage(0)
+		else:
+			# Taken from the control, which may have changed the line breaks.
+			self._stats = IncrementalStats(self._textCtrl.GetValue())
 		self.Bind(wx.EVT_CLOSE, self.onClose)
 		self.Bind(wx.EVT_MENU, self.onSave, id=wx.ID_SAVE)
 		self.Bind(wx.EVT_MENU, self.onSaveAs, id=self._saveAsId)
 		self.Bind(wx.EVT_MENU, self.onCancel, id=wx.ID_CANCEL)
+		self.Bind(wx.EVT_MENU, self.onUndo, id=wx.ID_UNDO)
+		self.Bind(wx.EVT_MENU, self.onRedo, id=wx.ID_REDO)
 
 		accels = [
 			(wx.ACCEL_CTRL, ord("S"), wx.ID_SAVE),
 			(wx.ACCEL_CTRL | wx.ACCEL_SHIFT, ord("S"), self._saveAsId),
+			(wx.ACCEL_CTRL, ord("Z"), wx.ID_UNDO),
+			(wx.ACCEL_CTRL, ord("Y"), wx.ID_REDO),
+			(wx.ACCEL_CTRL | wx.ACCEL_SHIFT, ord("Z"), wx.ID_REDO),
 			(wx.ACCEL_NORMAL, wx.WXK_ESCAPE, wx.ID_CANCEL),
 		]
+		if self._largeDocument:
+			self._nextPageId = wx.NewIdRef()
+			self._previousPageId = wx.NewIdRef()
+			self.Bind(wx.EVT_MENU, self.onNextPage, id=self._nextPageId)
+			self.Bind(wx.EVT_MENU, self.onPreviousPage, id=self._previousPageId)
+			accels.append((wx.ACCEL_CTRL, wx.WXK_PAGEDOWN, self._nextPageId))
+			accels.append((wx.ACCEL_CTRL, wx.WXK_PAGEUP, self._previousPageId))
 		self.SetAcceleratorTable(wx.AcceleratorTable(accels))
 
 	def onSave(self, evt):
-		text = self._textCtrl.GetValue()
+		if self.isBusy():
+			return
+		text = self.getText()
 		if self._onSave:
 			self._onSave(self._initialText)
 		try:
@@ -316,29 +496,43 @@ class ClipboardEditorDialog(wx.Dialog):
 		self._announceAndClose()
 
 	def onSaveAs(self, evt):
+		if self.isBusy():
+			return
 		_playSound(500, 50)
-		text = self._textCtrl.GetValue()
+		text = self.getText()
 		with wx.FileDialog(
 			self,
 			_("Save as"),
-			wildcard=_("Text files (*.txt)|*.txt|All files (*.*)|*.*"),
+			wildcard=_("Text files (*.txt)|*.txt|Compressed text files (*.gz)|*.gz|All files (*.*)|*.*"),
 			style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT,
 		) as fileDialog:
 			if fileDialog.ShowModal() == wx.ID_CANCEL:
 				return
 			path = fileDialog.GetPath()
-			try:
-				with open(path, "w", encoding="utf-8") as f:
-					f.write(text)
-				self._resultMessage = _("File saved")
-				self._resultKind = "saved"
-				wx.CallAfter(self._announceAndClose)
-			except Exception as e:
-				self._resultMessage = _("Error saving file: {error}").format(error=str(e))
-				self._resultKind = "failed"
-				wx.CallAfter(self._announceAndClose)
+		encoding, lineEnding = _getSaveOptions()
+		compress = path.lower().endswith(".gz")
+
+		def onDone(result):
+			self._resultMessage = _("File saved")
+			self._resultKind = "saved"
+			wx.CallAfter(self._announceAndClose)
+
+		def onError(error):
+			self._resultMessage = _("Error saving file: {error}").format(error=str(error))
+			self._resultKind = "failed"
+			wx.CallAfter(self._announceAndClose)
+
+		self.runJob(
+			lambda progress: writeTextFile(path, text, encoding, lineEnding, compress, progress),
+			onDone,
+			len(text),
+			onError,
+			keepsResult=True,
+		)
 
 	def onToolsMenu(self, evt):
+		if self.isBusy():
+			return
 		menu = wx.Menu()
 		idSpeech = wx.NewIdRef()
 		idInfo = wx.NewIdRef()
@@ -363,8 +557,31 @@ class ClipboardEditorDialog(wx.Dialog):
 		menu.Append(idTrim, _("Trim &whitespace"))
 		menu.Append(idRemoveEmpty, _("Remove &empty lines"))
 		menu.Append(idStripHtml, _("Strip &HTML/Formatting"))
-
-		self.Bind(wx.EVT_MENU, lambda e: wx.CallLater(100, ui.message, self._textCtrl.GetValue()), id=idSpeech)
+		menu.AppendSeparator()
+		rulesMenu = wx.Menu()
+		for name in _getRuleSets():
+			idRuleSet = wx.NewIdRef()
+			rulesMenu.Append(idRuleSet, name)
+			self.Bind(wx.EVT_MENU, lambda e, name=name: self._applyRuleSet(name), id=idRuleSet)
+		if rulesMenu.GetMenuItemCount():
+			rulesMenu.AppendSeparator()
+		idManageRules = wx.NewIdRef()
+		rulesMenu.Append(idManageRules, _("&Manage rule sets..."))
+		self.Bind(wx.EVT_MENU, self.onManageRuleSets, id=idManageRules)
+		menu.AppendSubMenu(rulesMenu, _("Re&placement rule sets"))
+		presetsMenu = wx.Menu()
+		for name in _getTransformPresets():
+			idPreset = wx.NewIdRef()
+			presetsMenu.Append(idPreset, name)
+			self.Bind(wx.EVT_MENU, lambda e, name=name: self._applyPreset(name), id=idPreset)
+		if presetsMenu.GetMenuItemCount():
+			presetsMenu.AppendSeparator()
+		idManagePresets = wx.NewIdRef()
+		presetsMenu.Append(idManagePresets, _("&Manage presets..."))
+		self.Bind(wx.EVT_MENU, self.onManagePresets, id=idManagePresets)
+		menu.AppendSubMenu(presetsMenu, _("Tra&nsform presets"))
+
+		self.Bind(wx.EVT_MENU, self.onSpeech, id=idSpeech)
 		self.Bind(wx.EVT_MENU, self.onInformation, id=idInfo)
 		self.Bind(wx.EVT_MENU, self.onFindDialog, id=idFind)
 		self.Bind(wx.EVT_MENU, self.onReplaceDialog, id=idReplace)
@@ -379,41 +596,93 @@ class ClipboardEditorDialog(wx.Dialog):
 		menu.Destroy()
 
 	def _applyTextChange(self, action):
-		selStart, selEnd = self._textCtrl.GetSelection()
-		text = self._textCtrl.GetValue()
+		self._applyTransform((action,))
+
+	def _applyPreset(self, name):
+		steps = _getTransformPresets().get(name)
+		if not steps:
+			return
+		self._applyTransform(tuple(steps), _("Text unchanged"))
+
+	def onManagePresets(self, evt):
+		with TransformPresetsDialog(self, _getTransformPresets()) as dialog:
+			if dialog.ShowModal() == wx.ID_OK:
+				_saveTransformPresets(dialog.ruleSets)
+
+	def _applyTransform(self, steps, unchangedMessage=None):
+		# Runs the steps on the selection, or on all of the text; unchangedMessage is announced if nothing changed.
+		selStart, selEnd = self.getSelection()
+		text = self.getText()
 		hasSelection = selStart != selEnd
 
 		if hasSelection:
 			targetText = text[selStart:selEnd]
 		else:
 			targetText = text
+		pipeline = compilePipeline(steps)
 
-		if action == "upper":
-			newText = targetText.upper()
-		elif action == "lower":
-			newText = targetText.lower()
-		elif action == "title":
-			newText = targetText.title()
-		elif action == "trim":
-			newText = "\n".join([line.strip() for line in targetText.splitlines()])
-		elif action == "remove_empty":
-			newText = "\n".join([line for line in targetText.splitlines() if line.strip()])
-		elif action == "strip_html":
-			import re
-			newText = re.sub(r'<[^>]+>', '', targetText)
-		else:
-			return
+		def work(progress):
+			newText = pipeline.apply(targetText, progress)
+			return newText, diffTexts(targetText, newText, selStart if hasSelection else 0)
 
-		if newText != targetText:
+		def onDone(result):
+			newText, delta = result
+			if delta is None:
+				if unchangedMessage:
+					ui.message(unchangedMessage)
+				return
+			self.changeText([delta])
 			if hasSelection:
-				self._textCtrl.Replace(selStart, selEnd, newText)
-				self._textCtrl.SetSelection(selStart, selStart + len(newText))
-			else:
-				self._textCtrl.SetValue(newText)
+				self.setSelection(selStart, selStart + len(newText))
 			_playSound(500, 50)
 
+		self.runJob(work, onDone, len(targetText))
+
+	def _applyRuleSet(self, name):
+		rules = _getRuleSets().get(name)
+		if not rules:
+			return
+		selStart, selEnd = self.getSelection()
+		text = self.getText()
+		hasSelection = selStart != selEnd
+		targetText = text[selStart:selEnd] if hasSelection else text
+		replacer = compileRules(tuple(rules))
+
+		def work(progress):
+			newText, count = replacer.apply(targetText, progress)
+			return newText, count, diffTexts(targetText, newText, selStart if hasSelection else 0)
+
+		def onDone(result):
+			newText, count, delta = result
+			if not count:
+				_playSound(330, 100)
+				ui.message(_("Text not found"))
+				return
+			if delta is not None:
+				self.changeText([delta])
+			if hasSelection:
+				self.setSelection(selStart, selStart + len(newText))
+			_playSound(880, 70)
+			ui.message(_("{count} replacements").format(count=count))
+
+		self.runJob(work, onDone, len(targetText))
+
+	def onSpeech(self, evt):
+		text = self.getText()
+		if self._onSpeak:
+			wx.CallLater(100, self._onSpeak, text)
+		else:
+			wx.CallLater(100, ui.message, text)
+
+	def onManageRuleSets(self, evt):
+		with RuleSetsDialog(self, _getRuleSets()) as dialog:
+			if dialog.ShowModal() == wx.ID_OK:
+				_saveRuleSets(dialog.ruleSets)
+
 	def onCancel(self, evt):
-		if self._textCtrl.GetValue() == self._initialText:
+		if self.cancelJob():
+			return
+		if self.getText() == self._initialText:
 			self._resultMessage = None
 			self._resultKind = "canceled"
 			self._announceAndClose()
@@ -425,7 +694,8 @@ class ClipboardEditorDialog(wx.Dialog):
 		self._announceAndClose()
 
 	def onClose(self, evt):
-		if self._textCtrl.GetValue() == self._initialText:
+		self.cancelJob()
+		if self.getText() == self._initialText:
 			self._resultMessage = None
 			self._resultKind = "canceled"
 			self._announceAndClose()
@@ -437,17 +707,276 @@ class ClipboardEditorDialog(wx.Dialog):
 			self._resultKind = "canceled"
 		self._announceAndClose()
 
+	def onTextChanged(self, evt):
+		self._textRevision += 1
+		if self._statsTimer is None:
+			self._statsTimer = wx.CallLater(STATS_UPDATE_DELAY, self._refreshStats)
+		else:
+			self._statsTimer.Start(STATS_UPDATE_DELAY)
+		evt.Skip()
+
+	def _refreshStats(self):
+		if not self._closing and self._job is None:
+			self._syncText()
+
+	def _syncText(self, record=True):
+		# Only the blocks that differ from the current text are summarised again.
+		# Edits made in the control itself, such as typing, become one undo step per pause.
+		if self._statsRevision == self._textRevision:
+			return
+		if self._largeDocument:
+			page = self._textCtrl.GetValue()
+			delta = diffTexts(self._stats.slice(self._viewStart, self._viewEnd), page, self._viewStart)
+			self._viewEnd = self._viewStart + len(page)
+			if delta is not None:
+				self._stats.replace(delta.offset, delta.offset + len(delta.removed), delta.inserted)
+		else:
+			start, removed, inserted = self._stats.update(self._textCtrl.GetValue())
+			delta = diffTexts(removed, inserted, start)
+		self._statsRevision = self._textRevision
+		if record and delta is not None:
+			self._undoStack.push([delta])
+
+	def getStats(self):
+		self._syncText()
+		return self._stats
+
+	def getText(self):
+		# The whole text; in large document mode it is read from _stats rather than the control.
+		if not self._largeDocument:
+			return self._textCtrl.GetValue()
+		self._syncText()
+		return self._stats.text
+
+	def getSelection(self):
+		start, end = self._textCtrl.GetSelection()
+		return self._viewStart + start, self._viewStart + end
+
+	def setSelection(self, start, end):
+		# In large document mode the page holding start is shown first.
+		if self._largeDocument:
+			if not self._viewStart <= start <= self._viewEnd:
+				self._syncText()
+				self._showPage(self._pageStart(start - LARGE_DOCUMENT_PAGE_SIZE // 4))
+			end = min(end, self._viewEnd)
+		self._textCtrl.SetSelection(start - self._viewStart, end - self._viewStart)
+
+	def _pageStart(self, position):
+		# position moved back to the start of its line, unless the line is too long.
+		position = max(position, 0)
+		before = self._stats.slice(position - PAGE_BREAK_SEARCH, position)
+		lineBreak = before.rfind("\n")
+		if lineBreak < 0:
+			return position
+		return position - len(before) + lineBreak + 1
+
+	def _pageEnd(self, start):
+		limit = start + LARGE_DOCUMENT_PAGE_SIZE
+		if limit >= len(self._stats):
+			return len(self._stats)
+		lineBreak = self._stats.slice(limit, limit + PAGE_BREAK_SEARCH).find("\n")
+		return limit if lineBreak < 0 else limit + lineBreak + 1
+
+	def _showPage(self, start, end=None):
+		# Puts the text from start to end, or a page from start, in the control; edits there must be synced first.
+		start = min(start, len(self._stats))
+		self._viewStart = start
+		self._viewEnd = self._pageEnd(start) if end is None else end
+		self._textCtrl.ChangeValue(self._stats.slice(self._viewStart, self._viewEnd))
+		# The control may have changed the line breaks; what it shows becomes the text.
+		self._textRevision += 1
+		self._syncText(record=False)
+
+	def _announcePage(self):
+		ui.message(_("Characters {start} to {end} of {total}").format(
+			start=self._viewStart + 1,
+			end=self._viewEnd,
+			total=len(self._stats),
+		))
+
+	def onNextPage(self, evt):
+		if self.isBusy():
+			return
+		self._syncText()
+		if self._viewEnd >= len(self._stats):
+			_playSound(330, 100)
+			ui.message(_("Last page"))
+			return
+		self._showPage(self._viewEnd)
+		self._textCtrl.SetInsertionPoint(0)
+		self._announcePage()
+
+	def onPreviousPage(self, evt):
+		if self.isBusy():
+			return
+		self._syncText()
+		if not self._viewStart:
+			_playSound(330, 100)
+			ui.message(_("First page"))
+			return
+		self._showPage(self._pageStart(self._viewStart - LARGE_DOCUMENT_PAGE_SIZE), self._viewStart)
+		self._textCtrl.SetInsertionPointEnd()
+		self._announcePage()
+
+	def _applyStep(self, deltas, newText=None):
+		# A single delta is replaced in place; a step of many sets the whole text once.
+		if self._largeDocument:
+			self._applyStepToDocument(deltas, newText)
+			return
+		if len(deltas) == 1:
+			offset, removed, inserted = deltas[0]
+			self._textCtrl.Replace(offset, offset + len(removed), inserted)
+		else:
+			self._textCtrl.SetValue(newText if newText is not None else applyDeltas(self._stats.text, deltas))
+		self._textRevision += 1
+		self._syncText(record=False)
+
+	def _applyStepToDocument(self, deltas, newText):
+		# Large document mode: the text changes first, then the page in the control follows.
+		if len(deltas) == 1:
+			offset, removed, inserted = deltas[0]
+			self._stats.replace(offset, offset + len(removed), inserted)
+			if self._viewStart <= offset and offset + len(removed) <= self._viewEnd:
+				self._textCtrl.Replace(offset - self._viewStart, offset - self._viewStart + len(removed), inserted)
+				self._viewEnd += len(inserted) - len(removed)
+				self._textRevision += 1
+				self._syncText(record=False)
+				return
+		else:
+			self._stats.setText(newText if newText is not None else applyDeltas(self._stats.text, deltas))
+		self._showPage(self._viewStart)
+
+	def changeText(self, deltas, oldText=None, newText=None):
+		# Applies deltas as one undo step; oldText and newText let a step of many deltas be compacted.
+		self._syncText()
+		if oldText is not None and newText is not None:
+			deltas = compactStep(deltas, oldText, newText)
+		self._applyStep(deltas, newText)
+		self._undoStack.push(deltas)
+
+	def _undoOrRedo(self, deltas, message):
+		if deltas is None:
+			_playSound(330, 100)
+			ui.message(message)
+			return
+		self._applyStep(deltas)
+		offset, removed, inserted = deltas[0]
+		self.setSelection(offset, offset + len(inserted))
+		_playSound(500, 50)
+
+	def onUndo(self, evt):
+		if self.isBusy():
+			return
+		self._syncText()
+		self._undoOrRedo(self._undoStack.undo(), _("Nothing to undo"))
+
+	def onRedo(self, evt):
+		if self.isBusy():
+			return
+		self._syncText()
+		self._undoOrRedo(self._undoStack.redo(), _("Nothing to redo"))
+
+	def runJob(self, work, onDone, size, onError=None, keepsResult=False):
+		# Runs work(progress) and hands its result to onDone. Work on size characters or more runs on
+		# a worker thread while the text is read-only; an exception goes to onError, else it is raised.
+		# Set keepsResult for work with side effects, whose result still counts if it finishes after a cancel.
+		if size < JOB_THRESHOLD:
+			try:
+				result = work(None)
+			except Exception as error:
+				if onError is None:
+					raise
+				onError(error)
+				return
+			onDone(result)
+			return
+		self._textCtrl.SetEditable(False)
+		self._job = BackgroundJob(
+			work,
+			lambda result: self._finishJob(onDone, result),
+			lambda error: self._finishJob(onError or self._raiseJobError, error),
+			wx.CallAfter,
+			onCancelled=self._onJobCancelled,
+			keepsResult=keepsResult,
+		)
+		self._job.start()
+		self._jobTimer = wx.CallLater(JOB_PROGRESS_INTERVAL, self._announceJobProgress)
+		ui.message(_("Working, press Escape to cancel"))
+
+	def _announceJobProgress(self):
+		if self._job is None or self._job.cancelled:
+			return
+		ui.message(_("{percent}%").format(percent=int(self._job.fraction * 100)))
+		self._jobTimer.Start(JOB_PROGRESS_INTERVAL)
+
+	def _stopJobTimer(self):
+		if self._jobTimer is not None:
+			self._jobTimer.Stop()
+			self._jobTimer = None
+
+	def _endJob(self):
+		self._job = None
+		self._stopJobTimer()
+		self._textCtrl.SetEditable(True)
+
+	def _finishJob(self, callback, value):
+		self._endJob()
+		callback(value)
+
+	def _onJobCancelled(self):
+		self._endJob()
+		ui.message(_("Canceled"))
+
+	def _raiseJobError(self, error):
+		raise error
+
+	def cancelJob(self):
+		# Returns whether there was a job to cancel. The job stays current, and the text read-only,
+		# until its worker has stopped; _onJobCancelled or its own result then ends it.
+		if self._job is None:
+			return False
+		if not self._job.cancelled:
+			self._job.cancel()
+			self._stopJobTimer()
+			_playSound(440, 70)
+		return True
+
+	def isBusy(self):
+		# Whether a job is running, which is announced.
+		if self._job is None:
+			return False
+		_playSound(330, 100)
+		ui.message(_("Still working, press Escape to cancel"))
+		return True
+
+	def getMatchIndex(self, pattern):
+		key = (self._textRevision, pattern.pattern, pattern.flags)
+		if key != self._matchIndexKey:
+			self._matchIndex = MatchIndex(self.getText(), pattern)
+			self._matchIndexKey = key
+		return self._matchIndex
+
 	def onFindDialog(self, evt):
 		_playSound(500, 50)
 		self._showFind(focusEdit=True)
 
 	def onInformation(self, evt):
-		text = self._textCtrl.GetValue()
-		if not text:
+		stats = self.getStats()
+		if not len(stats):
 			wx.CallLater(100, _announceClipboardEmpty)
 			return
 		_playSound(660, 60)
-		wx.CallLater(100, ui.message, _buildInformationMessage(text))
+		pending = 0 if stats.summarised else len(stats)
+		self.runJob(stats.summarise, lambda result: self._announceInformation(stats), pending)
+
+	def _announceInformation(self, stats):
+		selStart, selEnd = self.getSelection()
+		line, column = stats.lineAndColumn(self._viewStart + self._textCtrl.GetInsertionPoint())
+		messages = [_("Line {line}, column {column}").format(line=line, column=column)]
+		if selStart != selEnd:
+			messages.append(_formatSelectionStatsMessage(stats.rangeStats(selStart, selEnd)))
+		messages.append(_formatStatsMessage(stats.total))
+		wx.CallLater(100, ui.message, ". ".join(messages))
 
 	def onReplaceDialog(self, evt):
 		_playSound(500, 50)
@@ -469,6 +998,12 @@ class ClipboardEditorDialog(wx.Dialog):
 		self._findDialog.focusReplace(focusReplace)
 
 	def _finalizeClose(self):
+		if self._job is not None:
+			self._job.abandon()
+			self._endJob()
+		if self._statsTimer is not None:
+			self._statsTimer.Stop()
+			self._statsTimer = None
 		if self._findDialog:
 			try:
 				self._findDialog.Destroy()
@@ -511,7 +1046,7 @@ class ClipboardEditorDialog(wx.Dialog):
 		self._finalizeClose()
 
 	def _confirmDiscard(self):
-		if self._textCtrl.GetValue() == self._initialText:
+		if self.getText() == self._initialText:
 			return True
 		result = gui.messageBox(
 			_("You have unsaved changes. Discard them?"),
@@ -529,22 +1064,60 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		super().__init__()
 		self._editorDialog = None
 		self._historyDialog = None
-		self._backupHistory = []
-		self._clipboardHistory = []
+		# The history export or import in progress, as a generator run a batch at a time.
+		self._transfer = None
+		# The BackgroundJob applying a preset to a large clipboard text.
+		self._presetJob = None
+		self._searchIndex = SearchIndex()
+		self._searchIndex.start()
+		self._textPacker = TextPacker()
+		try:
+			self._textPacker.spillDirectory = _getSpillDirectory()
+			removeStaleSpillFiles(self._textPacker.spillDirectory)
+		except OSError:
+			pass
+		self._clipboardHistory = ClipboardHistory(index=self._searchIndex)
+		self._clipboardHistory.packer = self._textPacker
+		self._clipboardHistory.payloads.spillDirectory = self._textPacker.spillDirectory
+		self._thumbnails = ThumbnailCache(_makeThumbnail)
+		# Older backups are kept as deltas against the newest one.
+		self._backupHistory = BackupHistory(self._textPacker)
+		self._backupStore = None
+		if config.conf["ClipboardContentEditor"].get("persistBackups", False):
+			self._openBackupStore()
+		self._applyPreviewSettings()
+		self._applyPackingSettings()
+		self._historyStore = None
+		if config.conf["ClipboardContentEditor"].get("persistHistory", False):
+			self._openHistoryStore()
 		self._appendModeEnabled = False
-		self._lastClipboardText = None
+		# Snippets collected since append mode was last used, and their history entry.
+		self._appendSession = None
+		self._appendEntry = None
+		# What the clipboard last held, packed like history bodies.
+		self._lastClipboardValue = None
+		self._clipMonitor = ClipboardMonitor(Win32ClipboardBackend(), self._onClipboardChanged)
 		self._evtHandler = wx.EvtHandler()
 		self._clipTimer = wx.Timer(self._evtHandler)
 		self._evtHandler.Bind(wx.EVT_TIMER, self._onClipTimer, self._clipTimer)
-		self._clipTimer.Start(1000)
+		self._clipTimer.Start(CLIP_POLL_INTERVAL)
+		self._speechReader = SpeechReader(_speakChunk, speech.cancelSpeech)
+		# Whether a read was going when the command layer was opened, before its key press silenced it.
+		self._readingWhenLayerOpened = False
+		pre_speechCanceled.register(self._speechReader.interrupt)
 		NVDASettingsDialog.categoryClasses.append(AddonSettingsPanel)
 
 		self.switch = False
 		self.commandLayerGestures = {
 			"kb:e": "openEditor",
 			"kb:r": "restorePrevious",
+			"kb:shift+r": "chooseBackup",
 			"kb:i": "informationClipboard",
 			"kb:s": "speakClipboard",
+			"kb:shift+s": "resumeSpeaking",
+			"kb:p": "pauseSpeaking",
+			"kb:x": "stopSpeaking",
+			"kb:t": "applyPreset",
 			"kb:h": "showHistory",
 			"kb:a": "toggleAppendMode",
 			"kb:f1": "showHelp",
@@ -553,6 +1126,18 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 
 	def terminate(self):
 		self._clipTimer.Stop()
+		pre_speechCanceled.unregister(self._speechReader.interrupt)
+		self._speechReader.stop()
+		if self._transfer is not None:
+			self._transfer.close()
+			self._transfer = None
+		if self._presetJob is not None:
+			self._presetJob.abandon()
+			self._presetJob = None
+		self._finishAppendSession()
+		self._closeHistoryStore()
+		self._closeBackupStore()
+		self._searchIndex.close()
 		if self._editorDialog:
 			try:
 				self._editorDialog.Destroy()
@@ -568,56 +1153,189 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		NVDASettingsDialog.categoryClasses.remove(AddonSettingsPanel)
 		super().terminate()
 
+	def _openHistoryStore(self):
+		try:
+			store = HistoryStore(os.path.join(_getDataDirectory(), HISTORY_STORE_FILENAME))
+			entries = store.load(self._clipboardHistory.residentCount)
+		except OSError:
+			return
+		self._clipboardHistory.attachStore(store, entries)
+		store.start()
+		self._historyStore = store
+		self._limitHistorySize()
+
+	def _closeHistoryStore(self, delete=False):
+		store = self._historyStore
+		if store is None:
+			return
+		if delete:
+			self._clipboardHistory.detachStore()
+		store.close()
+		self._historyStore = None
+		if delete:
+			try:
+				os.remove(store.path)
+			except OSError:
+				pass
+
+	def _openBackupStore(self):
+		store = BackupStore(os.path.join(_getDataDirectory(), BACKUP_STORE_FILENAME))
+		if self._backupHistory:
+			# Turned on while running: what is in memory replaces the file.
+			store.save(self._backupHistory.snapshot())
+		else:
+			self._backupHistory.restore(*store.load())
+		store.start()
+		self._backupStore = store
+
+	def _closeBackupStore(self, delete=False):
+		store = self._backupStore
+		if store is None:
+			return
+		store.close()
+		self._backupStore = None
+		if delete:
+			try:
+				os.remove(store.path)
+			except OSError:
+				pass
+
+	def _applyBackupPersistence(self):
+		enabled = config.conf["ClipboardContentEditor"].get("persistBackups", False)
+		if enabled and self._backupStore is None:
+			self._openBackupStore()
+		elif not enabled and self._backupStore is not None:
+			self._closeBackupStore(delete=True)
+
+	def _saveBackups(self):
+		if self._backupStore is not None:
+			self._backupStore.save(self._backupHistory.snapshot())
+
+	def _applyPreviewSettings(self):
+		# Previews are built once at capture time, so new settings apply to items copied afterwards.
+		self._clipboardHistory.previewLength = int(config.conf["ClipboardContentEditor"].get("previewLength", 80))
+		self._clipboardHistory.collapseWhitespace = config.conf["ClipboardContentEditor"].get("previewCollapseWhitespace", True)
+
+	def _applyPackingSettings(self):
+		# Thresholds are configured in KB and MB of text; 0 disables compression or spilling.
+		self._textPacker.compressThreshold = int(config.conf["ClipboardContentEditor"].get("compressThreshold", 64)) * 1024
+		self._textPacker.spillThreshold = int(config.conf["ClipboardContentEditor"].get("spillThreshold", 16)) * 1024 * 1024
+		self._clipboardHistory.payloads.spillThreshold = min(self._textPacker.spillThreshold, PAYLOAD_SPILL_THRESHOLD)
+
+	def _applyHistoryPersistence(self):
+		enabled = config.conf["ClipboardContentEditor"].get("persistHistory", False)
+		if enabled and self._historyStore is None:
+			self._openHistoryStore()
+		elif not enabled and self._historyStore is not None:
+			self._closeHistoryStore(delete=True)
+
 	def _onClipTimer(self, evt=None):
+		self._clipMonitor.poll()
+
+	def _noteClipboardWritten(self, text, entry=None):
+		# entry is the history entry text came from, whose body is shared rather than packed again.
+		self._finishAppendSession()
+		if entry is not None and entry.isResident:
+			self._lastClipboardValue = entry.packedText
+		elif self._appendModeEnabled:
+			self._lastClipboardValue = self._textPacker.pack(text)
+		else:
+			# Only append mode needs it; turning that on reads the clipboard instead.
+			self._lastClipboardValue = None
+		self._clipMonitor.noteWritten(text)
+
+	def _onClipboardChanged(self, currentText, initial, formats):
+		if initial:
+			self._captureClipboard(currentText, formats)
+			return
+
+		# The monitor only reports text that differs from what it last saw.
+		# Copies without text, such as files, are kept as their own items even in append mode.
+		if self._appendModeEnabled and currentText and self._lastClipboardValue is not None:
+			self._appendToSession(currentText)
+		else:
+			self._captureClipboard(currentText, formats)
+		self._limitHistorySize()
+		self._enforceMemoryBudget()
+		if self._historyDialog:
+			self._historyDialog.onHistoryChanged()
+
+	def _captureClipboard(self, text, formats):
+		if text:
+			entry = self._clipboardHistory.add(text, formats=formats)
+		else:
+			entry = self._clipboardHistory.addFormats(formats)
+			if entry is None:
+				return
+		# Text copied after an image starts afresh, even in append mode.
+		self._lastClipboardValue = entry.packedText if entry.image is None else None
+
+	def _getThumbnail(self, entry):
+		# Returns a thumbnail bitmap of an image entry, or None.
+		if entry.image is None or not entry.formats or FORMAT_IMAGE not in entry.formats:
+			return None
+		digest = entry.formats[FORMAT_IMAGE]
+		payloads = self._clipboardHistory.payloads
+		return self._thumbnails.get(digest, entry.image, lambda: readPayload(payloads.get(digest)))
+
+	def _appendToSession(self, text):
+		session = self._appendSession
+		if session is None:
+			session = AppendSession(unpackText(self._lastClipboardValue))
+		# The joined text is only built for the clipboard; history shares the session's segments.
+		combined = session.readWith(text)
 		try:
-			currentText = api.getClipData()
+			if not _copyTextToClipboard(combined):
+				return
 		except Exception:
 			return
-		
-		if not currentText:
-			return
-
-		if self._lastClipboardText is None:
-			self._lastClipboardText = currentText
-			if currentText not in self._clipboardHistory:
-				self._clipboardHistory.insert(0, currentText)
-			return
-
-		if currentText != self._lastClipboardText:
-			if self._appendModeEnabled:
-				combined = self._lastClipboardText + "\r\n" + currentText
-				try:
-					if _copyTextToClipboard(combined):
-						self._lastClipboardText = combined
-						ui.message(_("Appended"))
-						if combined not in self._clipboardHistory:
-							self._clipboardHistory.insert(0, combined)
-				except Exception:
-					pass
-			else:
-				self._lastClipboardText = currentText
-				if currentText in self._clipboardHistory:
-					self._clipboardHistory.remove(currentText)
-				self._clipboardHistory.insert(0, currentText)
-				
-				# Limit history size
-				size_limit_str = config.conf["ClipboardContentEditor"].get("historySize", "10")
-				if size_limit_str.lower() != "all":
-					try:
-						limit = int(size_limit_str)
-						if len(self._clipboardHistory) > limit:
-							self._clipboardHistory = self._clipboardHistory[:limit]
-					except ValueError:
-						pass
+		self._clipMonitor.noteWritten(combined, session.digestWith(text))
+		ui.message(_("Appended"))
+		session.append(text)
+		if self._appendSession is None:
+			self._appendSession = session
+			self._appendEntry = self._clipboardHistory.addSession(session)
+		else:
+			self._appendEntry = self._clipboardHistory.extendSession(self._appendEntry, text)
+
+	def _finishAppendSession(self):
+		if self._appendSession is None:
+			return
+		self._clipboardHistory.finishSession(self._appendEntry)
+		self._lastClipboardValue = self._appendEntry.packedText
+		self._appendSession = None
+		self._appendEntry = None
+
+	def _limitHistorySize(self):
+		size_limit_str = config.conf["ClipboardContentEditor"].get("historySize", "10")
+		if size_limit_str.lower() == "all":
+			return
+		try:
+			limit = int(size_limit_str)
+		except ValueError:
+			return
+		self._clipboardHistory.truncate(limit)
+
+	def _getBackupMemoryUsage(self):
+		return self._backupHistory.memorySize
+
+	def _enforceMemoryBudget(self):
+		budgetMB = int(config.conf["ClipboardContentEditor"].get("memoryBudget", 64))
+		if budgetMB <= 0:
+			return
+		budget = budgetMB * 1024 * 1024 - self._getBackupMemoryUsage()
+		self._clipboardHistory.evictToBudget(max(budget, 0))
 
 	def _backupClipboard(self, previousText):
 		if not config.conf["ClipboardContentEditor"].get("protectModeEnabled", True):
 			return
 		if previousText is None:
 			return
-		self._backupHistory.insert(0, previousText)
+		self._backupHistory.push(previousText)
 		maxLevels = max(1, int(config.conf["ClipboardContentEditor"].get("backupLevels", 1)))
-		self._backupHistory = self._backupHistory[:maxLevels]
+		self._backupHistory.truncate(maxLevels)
+		self._saveBackups()
+		self._enforceMemoryBudget()
 
 	def _openEditor(self):
 		if self._editorDialog and self._editorDialog.IsShown():
@@ -632,6 +1350,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			text,
 			onClose=self._onEditorClosed,
 			onSave=self._backupClipboard,
+			onSpeak=self._speakText,
 		)
 		self._editorDialog.Show()
 		self._editorDialog.Raise()
@@ -663,7 +1382,11 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			else:
 				self.closeCommandsLayer(speak=True)
 
-		return super().getScript(gesture)
+		script = super().getScript(gesture)
+		if script == self.script_activateCommandLayer:
+			# NVDA looks up the script of a key press before canceling speech for it.
+			self._readingWhenLayerOpened = self._speechReader.isReading
+		return script
 
 	def closeCommandsLayer(self, speak=True):
 		if self.switch:
@@ -715,29 +1438,247 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			_playSound(330, 100)
 			ui.message(_("No backup available"))
 			return
-		previousText = self._backupHistory.pop(0)
+		self._restoreBackup(0)
+
+	def _restoreBackup(self, level):
+		# Any level is rebuilt on demand; it leaves the backups once it is back on the clipboard.
+		previousText = self._backupHistory.text(level)
 		if api.copyToClip(previousText):
-			self._lastClipboardText = previousText
+			self._backupHistory.pop(level)
+			self._saveBackups()
+			self._noteClipboardWritten(previousText)
 			_playSound(880, 70)
 			ui.message(_("Previous clipboard restored"))
 		else:
 			_playSound(330, 100)
 			ui.message(_("Failed to restore clipboard"))
 
-	def script_speakClipboard(self, gesture):
+	def _chooseBackup(self):
+		previews = self._backupHistory.previews(BACKUP_PREVIEW_LENGTH * 4 + 16)
+		choices = [
+			_("Level {level}: {preview}").format(level=level, preview=makePreview(preview, BACKUP_PREVIEW_LENGTH))
+			for level, preview in enumerate(previews, 1)
+		]
+		gui.mainFrame.prePopup()
+		try:
+			dlg = wx.SingleChoiceDialog(gui.mainFrame, _("Backup to restore:"), _("Restore Editor Backup"), choices)
+			dlg.SetSelection(0)
+			res = dlg.ShowModal()
+			sel = dlg.GetSelection()
+			dlg.Destroy()
+		finally:
+			gui.mainFrame.postPopup()
+		if res == wx.ID_OK and sel < len(self._backupHistory):
+			self._restoreBackup(sel)
+
+	def script_chooseBackup(self, gesture):
+		if not config.conf["ClipboardContentEditor"].get("protectModeEnabled", True):
+			ui.message(_("Protect mode is disabled"))
+			return
+		if not self._backupHistory:
+			_playSound(330, 100)
+			ui.message(_("No backup available"))
+			return
+		wx.CallAfter(self._chooseBackup)
+
+	def _applyPresetToClipboard(self, name):
+		if self._presetJob is not None:
+			_playSound(330, 100)
+			ui.message(_("Still applying a preset"))
+			return
+		steps = _getTransformPresets().get(name)
 		text = self._getClipboardText()
 		if not text:
 			_announceClipboardEmpty()
 			return
-		ui.message(text)
+		pipeline = compilePipeline(tuple(steps or ()))
+		if len(text) < JOB_THRESHOLD:
+			self._writePresetResult(name, text, pipeline.apply(text))
+			return
+		# Large texts are transformed on a worker thread, as in the editor.
+		self._presetJob = BackgroundJob(
+			lambda progress: pipeline.apply(text, progress),
+			lambda newText: self._onPresetDone(name, text, newText),
+			self._onPresetFailed,
+			wx.CallAfter,
+		)
+		self._presetJob.start()
+		ui.message(_("Working"))
+
+	def _onPresetDone(self, name, text, newText):
+		self._presetJob = None
+		if self._getClipboardText() != text:
+			# Something else was copied meanwhile; it is not overwritten.
+			_playSound(330, 100)
+			ui.message(_("The clipboard changed, preset {name} not applied").format(name=name))
+			return
+		self._writePresetResult(name, text, newText)
+
+	def _onPresetFailed(self, error):
+		self._presetJob = None
+		_playSound(330, 100)
+		ui.message(_("Failed to apply the preset: {error}").format(error=error))
+
+	def _writePresetResult(self, name, text, newText):
+		if newText == text:
+			ui.message(_("Clipboard unchanged"))
+			return
+		if api.copyToClip(newText):
+			self._backupClipboard(text)
+			self._noteClipboardWritten(newText)
+			_playSound(880, 70)
+			ui.message(_("Preset {name} applied to the clipboard").format(name=name))
+		else:
+			_playSound(330, 100)
+			ui.message(_("Failed to update clipboard"))
+
+	def _choosePreset(self):
+		names = list(_getTransformPresets())
+		if len(names) == 1:
+			self._applyPresetToClipboard(names[0])
+			return
+		gui.mainFrame.prePopup()
+		try:
+			dlg = wx.SingleChoiceDialog(gui.mainFrame, _("Preset to apply to the clipboard:"), _("Transform presets"), names)
+			dlg.SetSelection(0)
+			res = dlg.ShowModal()
+			sel = dlg.GetSelection()
+			dlg.Destroy()
+		finally:
+			gui.mainFrame.postPopup()
+		if res == wx.ID_OK:
+			self._applyPresetToClipboard(names[sel])
+
+	def script_applyPreset(self, gesture):
+		if not _getTransformPresets():
+			_playSound(330, 100)
+			ui.message(_("No transform presets. Create them from the Tools menu of the editor."))
+			return
+		wx.CallAfter(self._choosePreset)
+
+	def _speakText(self, text, resume=False):
+		# Reading positions are remembered per text, keyed by its digest.
+		if not text:
+			_announceClipboardEmpty()
+			return
+		key = textDigest(text)
+		if resume and self._speechReader.position(key):
+			started = self._speechReader.resume(text, key)
+		else:
+			started = self._speechReader.start(text, key)
+		if not started:
+			_announceClipboardEmpty()
+
+	def script_speakClipboard(self, gesture):
+		self._speakText(self._getClipboardText())
+
+	def script_resumeSpeaking(self, gesture):
+		self._speakText(self._getClipboardText(), resume=True)
+
+	def script_pauseSpeaking(self, gesture):
+		# Opening the command layer has already interrupted the read; its position is kept.
+		if self._speechReader.isReading or self._readingWhenLayerOpened:
+			self._readingWhenLayerOpened = False
+			self._speechReader.stop()
+			ui.message(_("Reading paused"))
+		else:
+			self._speakText(self._getClipboardText(), resume=True)
+
+	def script_stopSpeaking(self, gesture):
+		self._speechReader.stop()
+		ui.message(_("Reading stopped"))
 
 	def script_toggleAppendMode(self, gesture):
 		self._appendModeEnabled = not self._appendModeEnabled
+		self._finishAppendSession()
 		if self._appendModeEnabled:
+			if self._lastClipboardValue is None:
+				text = self._getClipboardText()
+				if text:
+					self._lastClipboardValue = self._textPacker.pack(text)
 			ui.message(_("Append mode on"))
 		else:
 			ui.message(_("Append mode off"))
 
+	def _startTransfer(self, steps, onBatch, onDone):
+		# steps yields the size of each entry it handles; returns False if a transfer is already running.
+		if self._transfer is not None:
+			_playSound(330, 100)
+			ui.message(_("A history export or import is already running"))
+			return False
+		self._transfer = steps
+		ui.message(_("Working"))
+		self._runTransferBatch(onBatch, onDone)
+		return True
+
+	def _runTransferBatch(self, onBatch, onDone):
+		steps = self._transfer
+		if steps is None:
+			return
+		handled = 0
+		try:
+			while handled < TRANSFER_BATCH_SIZE:
+				handled += next(steps)
+		except StopIteration:
+			self._transfer = None
+			onBatch()
+			onDone()
+			return
+		except ArchiveError:
+			self._transfer = None
+			_playSound(330, 100)
+			ui.message(_("This file is not a clipboard history archive"))
+			return
+		except (OSError, ValueError) as e:
+			self._transfer = None
+			onBatch()
+			_playSound(330, 100)
+			ui.message(_("Error reading or writing the file: {error}").format(error=e))
+			return
+		onBatch()
+		wx.CallLater(TRANSFER_BATCH_DELAY, self._runTransferBatch, onBatch, onDone)
+
+	def _exportHistory(self, entries, path):
+		# entries are listed newest first and exported oldest first; any deleted before their turn are left out.
+		history = self._clipboardHistory
+		exported = 0
+
+		def steps():
+			nonlocal exported
+			live = (entry for entry in reversed(entries) if history.entryForKey(entry.key) is entry)
+			with contextlib.closing(exportEntries(path, live)) as written:
+				for size in written:
+					exported += 1
+					yield size
+
+		def onDone():
+			_playSound(880, 70)
+			ui.message(_("Exported {count} items").format(count=exported))
+
+		self._startTransfer(steps(), lambda: None, onDone)
+
+	def _importHistory(self, path):
+		added = 0
+
+		def steps():
+			nonlocal added
+			for text, timestamp, pinned in readArchive(path):
+				if self._clipboardHistory.importEntry(text, timestamp, pinned):
+					added += 1
+				yield len(text)
+
+		def onBatch():
+			self._limitHistorySize()
+			self._enforceMemoryBudget()
+			if self._historyDialog:
+				self._historyDialog.onHistoryChanged()
+
+		def onDone():
+			_playSound(880, 70)
+			ui.message(_("Imported {count} new items").format(count=added))
+
+		self._startTransfer(steps(), onBatch, onDone)
+
 	def _openHistoryDialog(self):
 		if self._historyDialog and self._historyDialog.IsShown():
 			self._historyDialog.Raise()
@@ -765,7 +1706,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			
 			if res == wx.ID_OK:
 				if sel == 0:
-					msg = _("Clipboard Content Editor Command List\n--------------------\nF1: Open Command List or Full Documentation\nA: On / Off Append Mode\nE: Open Clipboard Editor\nR: Restore Editor Backup\nI: Say Clipboard Information\nS: Speak Clipboard Content\nH: Open Clipboard History Manager")
+					msg = _("Clipboard Content Editor Command List\n--------------------\nF1: Open Command List or Full Documentation\nA: On / Off Append Mode\nE: Open Clipboard Editor\nR: Restore Editor Backup\nShift+R: Choose Editor Backup Level to Restore\nI: Say Clipboard Information\nS: Speak Clipboard Content\nShift+S: Resume Speaking Where It Stopped\nP: Pause or Resume Speaking\nX: Stop Speaking\nT: Apply a Transform Preset to the Clipboard\nH: Open Clipboard History Manager")
 					
 					gui.mainFrame.prePopup()
 					try:
@@ -819,13 +1760,16 @@ class FindReplaceDialog(wx.Dialog):
 			wx.CheckBox(self, label=_("Replace whole words only, not part of other words")),
 		)
 		self.matchWholeWordsCheckBox.SetValue(True)
+		self.useRegexCheckBox = sHelper.addItem(wx.CheckBox(self, label=_("Use regular expressions")))
 
 		buttonSizer = wx.StdDialogButtonSizer()
 		self.findNextButton = wx.Button(self, label=_("Find next"))
+		self.findPreviousButton = wx.Button(self, label=_("Find previous"))
 		self.replaceButton = wx.Button(self, label=_("Replace"))
 		self.replaceAllButton = wx.Button(self, label=_("Replace all"))
 		self.closeButton = wx.Button(self, wx.ID_CLOSE)
 		buttonSizer.AddButton(self.findNextButton)
+		buttonSizer.AddButton(self.findPreviousButton)
 		buttonSizer.AddButton(self.replaceButton)
 		buttonSizer.AddButton(self.replaceAllButton)
 		buttonSizer.AddButton(self.closeButton)
@@ -836,6 +1780,7 @@ class FindReplaceDialog(wx.Dialog):
 		self.Layout()
 
 		self.findNextButton.Bind(wx.EVT_BUTTON, self.onFindNext)
+		self.findPreviousButton.Bind(wx.EVT_BUTTON, self.onFindPrevious)
 		self.replaceButton.Bind(wx.EVT_BUTTON, self.onReplace)
 		self.replaceAllButton.Bind(wx.EVT_BUTTON, self.onReplaceAll)
 		self.closeButton.Bind(wx.EVT_BUTTON, self.onClose)
@@ -844,7 +1789,8 @@ class FindReplaceDialog(wx.Dialog):
 
 	def onCharHook(self, evt):
 		if evt.GetKeyCode() == wx.WXK_ESCAPE:
-			self.onClose(evt)
+			if not self.GetParent().cancelJob():
+				self.onClose(evt)
 			return
 		evt.Skip()
 
@@ -854,105 +1800,102 @@ class FindReplaceDialog(wx.Dialog):
 		else:
 			self.findEdit.SetFocus()
 
-	def onFindNext(self, evt):
+	def _getPattern(self):
 		findText = self.findEdit.GetValue()
 		if not findText:
 			ui.message(_("Find text is empty"))
+			return None
+		return _compileFindPattern(
+			findText,
+			self.matchCaseCheckBox.GetValue(),
+			self.matchWholeWordsCheckBox.GetValue(),
+			self.useRegexCheckBox.GetValue(),
+		)
+
+	def onFindNext(self, evt):
+		pattern = self._getPattern()
+		if pattern is None:
 			return False
-		matchCase = self.matchCaseCheckBox.GetValue()
-		wholeWordsOnly = self.matchWholeWordsCheckBox.GetValue()
-		fullText = self._textCtrl.GetValue()
-		start, end = self._textCtrl.GetSelection()
-		found = _findNext(fullText, findText, end, matchCase, wholeWordsOnly)
-		if found is None:
-			found = _findNext(fullText, findText, 0, matchCase, wholeWordsOnly)
-		if found is None:
-			_playSound(330, 100)
-			ui.message(_("Text not found"))
+		return _selectMatch(self.GetParent(), self._textCtrl, pattern)
+
+	def onFindPrevious(self, evt):
+		pattern = self._getPattern()
+		if pattern is None:
+			return False
+		return _selectMatch(self.GetParent(), self._textCtrl, pattern, backwards=True)
+
+	def _replaceSelection(self, pattern, replaceText):
+		editor = self.GetParent()
+		fullText = editor.getText()
+		start, end = editor.getSelection()
+		if start == end:
 			return False
-		self._textCtrl.SetFocus()
-		self._textCtrl.SetSelection(found[0], found[1])
+		match = matchAt(fullText, pattern, start, end)
+		if match is None:
+			return False
+		try:
+			replacement = expandReplacement(match, replaceText, self.useRegexCheckBox.GetValue())
+		except re.error as e:
+			_playSound(330, 100)
+			ui.message(_("Invalid replacement text: {error}").format(error=e))
+			return None
+		editor.changeText([TextDelta(start, fullText[start:end], replacement)])
+		editor.setSelection(start, start + len(replacement))
 		_playSound(750, 40)
 		return True
 
 	def onReplace(self, evt):
-		findText = self.findEdit.GetValue()
-		if not findText:
-			ui.message(_("Find text is empty"))
+		if self.GetParent().isBusy():
+			return
+		pattern = self._getPattern()
+		if pattern is None:
 			return
 		replaceText = self.replaceEdit.GetValue()
-		matchCase = self.matchCaseCheckBox.GetValue()
-		wholeWordsOnly = self.matchWholeWordsCheckBox.GetValue()
-		fullText = self._textCtrl.GetValue()
-		start, end = self._textCtrl.GetSelection()
-		selected = self._textCtrl.GetStringSelection()
-		replaced = False
-		if (
-			_selectionMatches(
-				fullText,
-				start,
-				end,
-				selected,
-				findText,
-				matchCase,
-				wholeWordsOnly,
-			)
-			and start != end
-		):
-			replacement = _applyReplacementCase(selected, replaceText)
-			self._textCtrl.Replace(start, end, replacement)
-			self._textCtrl.SetSelection(start, start + len(replacement))
-			replaced = True
-			_playSound(750, 40)
-		if not replaced:
-			self.onFindNext(evt)
-			start, end = self._textCtrl.GetSelection()
-			selected = self._textCtrl.GetStringSelection()
-			fullText = self._textCtrl.GetValue()
-			if (
-				_selectionMatches(
-					fullText,
-					start,
-					end,
-					selected,
-					findText,
-					matchCase,
-					wholeWordsOnly,
-				)
-				and start != end
-			):
-				replacement = _applyReplacementCase(selected, replaceText)
-				self._textCtrl.Replace(start, end, replacement)
-				self._textCtrl.SetSelection(start, start + len(replacement))
-				replaced = True
-				_playSound(750, 40)
+		replaced = self._replaceSelection(pattern, replaceText)
+		if replaced is False and self.onFindNext(evt):
+			replaced = self._replaceSelection(pattern, replaceText)
 		if replaced:
 			self._resetAndHide()
 
 	def onReplaceAll(self, evt):
-		findText = self.findEdit.GetValue()
-		if not findText:
-			ui.message(_("Find text is empty"))
+		editor = self.GetParent()
+		if editor.isBusy():
+			return
+		pattern = self._getPattern()
+		if pattern is None:
 			return
 		replaceText = self.replaceEdit.GetValue()
-		matchCase = self.matchCaseCheckBox.GetValue()
-		wholeWordsOnly = self.matchWholeWordsCheckBox.GetValue()
-		fullText = self._textCtrl.GetValue()
-		newText, count = _replaceAll(
-			fullText,
-			findText,
-			replaceText,
-			matchCase,
-			wholeWordsOnly,
-		)
-		if count == 0:
+		useRegex = self.useRegexCheckBox.GetValue()
+		fullText = editor.getText()
+
+		def work(progress):
+			newText, count = replaceAll(fullText, pattern, replaceText, useRegex, progress)
+			if count <= STEP_DELTA_LIMIT:
+				deltas = replacementDeltas(fullText, pattern, replaceText, useRegex)
+			else:
+				delta = diffTexts(fullText, newText)
+				deltas = [delta] if delta is not None else []
+			return newText, count, deltas
+
+		def onDone(result):
+			newText, count, deltas = result
+			if count == 0:
+				_playSound(330, 100)
+				ui.message(_("Text not found"))
+				return
+			if deltas:
+				editor.changeText(deltas, fullText, newText)
+			_playSound(880, 70)
+			ui.message(_("{count} replacements").format(count=count))
+			self._resetAndHide()
+
+		def onError(error):
+			if not isinstance(error, re.error):
+				raise error
 			_playSound(330, 100)
-			ui.message(_("Text not found"))
-			return
-		self._textCtrl.SetValue(newText)
-		_playSound(880, 70)
-		ui.message(_("{count} replacements").format(count=count))
-		self._resetAndHide()
+			ui.message(_("Invalid replacement text: {error}").format(error=error))
+
+		editor.runJob(work, onDone, len(fullText), onError)
 
 	def onClose(self, evt):
 		_playSound(440, 70)
@@ -981,11 +1924,14 @@ class FindDialog(wx.Dialog):
 			wx.CheckBox(self, label=_("Find whole words only, not part of other words")),
 		)
 		self.matchWholeWordsCheckBox.SetValue(True)
+		self.useRegexCheckBox = sHelper.addItem(wx.CheckBox(self, label=_("Use regular expressions")))
 
 		buttonSizer = wx.StdDialogButtonSizer()
 		self.findNextButton = wx.Button(self, label=_("Find next"))
+		self.findPreviousButton = wx.Button(self, label=_("Find previous"))
 		self.closeButton = wx.Button(self, wx.ID_CLOSE)
 		buttonSizer.AddButton(self.findNextButton)
+		buttonSizer.AddButton(self.findPreviousButton)
 		buttonSizer.AddButton(self.closeButton)
 		buttonSizer.Realize()
 		mainSizer.Add(buttonSizer, flag=wx.ALL | wx.ALIGN_RIGHT, border=8)
@@ -994,6 +1940,7 @@ class FindDialog(wx.Dialog):
 		self.Layout()
 
 		self.findNextButton.Bind(wx.EVT_BUTTON, self.onFindNext)
+		self.findPreviousButton.Bind(wx.EVT_BUTTON, self.onFindPrevious)
 		self.closeButton.Bind(wx.EVT_BUTTON, self.onClose)
 		self.Bind(wx.EVT_CLOSE, self.onClose)
 		self.Bind(wx.EVT_CHAR_HOOK, self.onCharHook)
@@ -1003,32 +1950,30 @@ class FindDialog(wx.Dialog):
 			self.onClose(evt)
 			return
 		if evt.GetKeyCode() in (wx.WXK_RETURN, wx.WXK_NUMPAD_ENTER):
-			self.onFindNext(evt)
+			self.onFindNext(evt, backwards=evt.ShiftDown())
 			return
 		evt.Skip()
 
 	def focusFind(self):
 		self.findEdit.SetFocus()
 
-	def onFindNext(self, evt):
+	def onFindNext(self, evt, backwards=False):
 		findText = self.findEdit.GetValue()
 		if not findText:
 			ui.message(_("Find text is empty"))
 			return
-		matchCase = self.matchCaseCheckBox.GetValue()
-		wholeWordsOnly = self.matchWholeWordsCheckBox.GetValue()
-		fullText = self._textCtrl.GetValue()
-		start, end = self._textCtrl.GetSelection()
-		found = _findNext(fullText, findText, end, matchCase, wholeWordsOnly)
-		if found is None:
-			found = _findNext(fullText, findText, 0, matchCase, wholeWordsOnly)
-		if found is None:
-			_playSound(330, 100)
-			ui.message(_("Text not found"))
+		pattern = _compileFindPattern(
+			findText,
+			self.matchCaseCheckBox.GetValue(),
+			self.matchWholeWordsCheckBox.GetValue(),
+			self.useRegexCheckBox.GetValue(),
+		)
+		if pattern is None:
 			return
-		self._textCtrl.SetFocus()
-		self._textCtrl.SetSelection(found[0], found[1])
-		_playSound(750, 40)
+		_selectMatch(self.GetParent(), self._textCtrl, pattern, backwards=backwards)
+
+	def onFindPrevious(self, evt):
+		self.onFindNext(evt, backwards=True)
 
 
 
@@ -1037,6 +1982,232 @@ class FindDialog(wx.Dialog):
 		self.Hide()
 
 
+class RuleSetsDialog(wx.Dialog):
+	# Named lists edited as text, one item per line; subclasses change what the items are.
+	def __init__(self, parent, ruleSets):
+		super().__init__(
+			parent,
+			title=self._getTitle(),
+			style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER,
+		)
+		self.ruleSets = dict(ruleSets)
+		self._currentName = None
+
+		mainSizer = wx.BoxSizer(wx.VERTICAL)
+		sHelper = guiHelper.BoxSizerHelper(self, sizer=mainSizer)
+		self.namesList = sHelper.addLabeledControl(self._getNamesLabel(), wx.ListBox, choices=list(self.ruleSets))
+		self.rulesEdit = sHelper.addLabeledControl(
+			self._getItemsLabel(),
+			wx.TextCtrl,
+			style=wx.TE_MULTILINE,
+			size=(400, 200),
+		)
+
+		buttonSizer = wx.BoxSizer(wx.HORIZONTAL)
+		self.newButton = wx.Button(self, label=_("&New..."))
+		self.deleteButton = wx.Button(self, label=_("&Delete"))
+		self.okButton = wx.Button(self, wx.ID_OK)
+		self.cancelButton = wx.Button(self, wx.ID_CANCEL)
+		buttonSizer.Add(self.newButton, flag=wx.RIGHT, border=5)
+		buttonSizer.Add(self.deleteButton, flag=wx.RIGHT, border=5)
+		buttonSizer.Add(self.okButton, flag=wx.RIGHT, border=5)
+		buttonSizer.Add(self.cancelButton)
+		mainSizer.Add(buttonSizer, flag=wx.ALL | wx.ALIGN_RIGHT, border=8)
+
+		self.SetSizer(mainSizer)
+		self.Layout()
+
+		self.namesList.Bind(wx.EVT_LISTBOX, self.onSelectRuleSet)
+		self.newButton.Bind(wx.EVT_BUTTON, self.onNew)
+		self.deleteButton.Bind(wx.EVT_BUTTON, self.onDelete)
+		self.okButton.Bind(wx.EVT_BUTTON, self.onOk)
+		if self.ruleSets:
+			self._selectName(next(iter(self.ruleSets)))
+		else:
+			self.rulesEdit.Disable()
+
+	def _getTitle(self):
+		return _("Replacement rule sets")
+
+	def _getNamesLabel(self):
+		return _("Rule &sets:")
+
+	def _getItemsLabel(self):
+		return _("&Rules, one per line as: find => replace")
+
+	def _getNewNamePrompt(self):
+		return _("Name of the new rule set:")
+
+	def _getNewTitle(self):
+		return _("New rule set")
+
+	def _getLineErrorMessage(self, lineNumber):
+		return _("Line {line} is not a rule. Write each rule as: find => replace").format(line=lineNumber)
+
+	def _format(self, items):
+		return formatRules(items)
+
+	def _parse(self, text):
+		# Raises an error with a lineNumber attribute for a line that cannot be parsed.
+		return parseRules(text)
+
+	def _selectName(self, name):
+		self._currentName = name
+		self.namesList.SetStringSelection(name)
+		self.rulesEdit.Enable()
+		self.rulesEdit.SetValue(self._format(self.ruleSets[name]))
+
+	def _storeCurrent(self):
+		# Returns False and points at the bad line if the rules being edited do not parse.
+		if self._currentName is None:
+			return True
+		text = self.rulesEdit.GetValue()
+		try:
+			self.ruleSets[self._currentName] = self._parse(text)
+		except (RuleSyntaxError, UnknownStepError) as e:
+			gui.messageBox(
+				self._getLineErrorMessage(e.lineNumber),
+				self._getTitle(),
+				wx.OK | wx.ICON_ERROR,
+				parent=self,
+			)
+			self.namesList.SetStringSelection(self._currentName)
+			lineStart = self.rulesEdit.XYToPosition(0, e.lineNumber - 1)
+			self.rulesEdit.SetFocus()
+			if lineStart != -1:
+				self.rulesEdit.SetInsertionPoint(lineStart)
+			return False
+		return True
+
+	def onSelectRuleSet(self, evt):
+		name = self.namesList.GetStringSelection()
+		if not name or name == self._currentName:
+			return
+		if self._storeCurrent():
+			self._selectName(name)
+
+	def onNew(self, evt):
+		if not self._storeCurrent():
+			return
+		with wx.TextEntryDialog(self, self._getNewNamePrompt(), self._getNewTitle()) as dialog:
+			if dialog.ShowModal() != wx.ID_OK:
+				return
+			name = dialog.GetValue().strip()
+		if not name:
+			return
+		if name not in self.ruleSets:
+			self.ruleSets[name] = []
+			self.namesList.Append(name)
+		self._selectName(name)
+		self.rulesEdit.SetFocus()
+
+	def onDelete(self, evt):
+		name = self._currentName
+		if name is None:
+			return
+		del self.ruleSets[name]
+		self.namesList.Delete(self.namesList.FindString(name))
+		self._currentName = None
+		if self.ruleSets:
+			self._selectName(next(iter(self.ruleSets)))
+		else:
+			self.rulesEdit.SetValue("")
+			self.rulesEdit.Disable()
+		self.namesList.SetFocus()
+
+	def onOk(self, evt):
+		if self._storeCurrent():
+			self.EndModal(wx.ID_OK)
+
+
+class TransformPresetsDialog(RuleSetsDialog):
+	def _getTitle(self):
+		return _("Transform presets")
+
+	def _getNamesLabel(self):
+		return _("&Presets:")
+
+	def _getItemsLabel(self):
+		return _("&Steps, one per line, run in order: {steps}").format(steps=", ".join(STEP_NAMES))
+
+	def _getNewNamePrompt(self):
+		return _("Name of the new preset:")
+
+	def _getNewTitle(self):
+		return _("New preset")
+
+	def _getLineErrorMessage(self, lineNumber):
+		return _("Line {line} is not a step. Use one of: {steps}").format(line=lineNumber, steps=", ".join(STEP_NAMES))
+
+	def _format(self, items):
+		return formatSteps(items)
+
+	def _parse(self, text):
+		return parseSteps(text)
+
+
+_FORMAT_LABELS = {
+	FORMAT_HTML: _("HTML"),
+	FORMAT_RTF: _("Rich text"),
+	FORMAT_FILES: _("Files"),
+	FORMAT_IMAGE: _("Image"),
+}
+
+
+class HistoryListCtrl(wx.ListCtrl):
+	# Virtual list: rows are only rendered when they become visible, so the
+	# cost of showing the history does not depend on how long it is.
+	def __init__(self, parent):
+		super().__init__(parent, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL)
+		self.InsertColumn(0, _("Content"))
+		self._items = []
+		self.Bind(wx.EVT_SIZE, self.onSize)
+
+	def setItems(self, items):
+		# items can be the history itself or a list of entries; both index by position.
+		self._items = items
+		self.refreshItems()
+
+	def refreshItems(self):
+		self.SetItemCount(len(self._items))
+		self.Refresh()
+
+	def getSelectedIndex(self):
+		return self.GetFirstSelected()
+
+	def selectIndex(self, index):
+		if not 0 <= index < self.GetItemCount():
+			return
+		self.Select(index)
+		self.Focus(index)
+
+	def OnGetItemText(self, item, column):
+		try:
+			entry = self._items[item]
+		except IndexError:
+			return ""
+		if entry.image is not None:
+			preview = _("Image, {width} by {height} pixels, {size}").format(
+				width=entry.image.width,
+				height=entry.image.height,
+				size=_formatSize(entry.size),
+			)
+		else:
+			preview = entry.getPreview()
+		# An image entry already says it is one.
+		formats = [name for name in entry.formats or () if name != FORMAT_IMAGE or entry.image is None]
+		if formats:
+			labels = [_FORMAT_LABELS[name] for name in formats]
+			preview = _("{preview} ({formats})").format(preview=preview, formats=", ".join(labels))
+		if entry.pinned:
+			return _("Pinned: {preview}").format(preview=preview)
+		return preview
+
+	def onSize(self, evt):
+		self.SetColumnWidth(0, max(self.GetClientSize().width, 100))
+		evt.Skip()
+
+
 class ClipboardHistoryDialog(wx.Dialog):
 	def __init__(self, parent, history, plugin_ref):
 		super().__init__(
@@ -1046,17 +2217,28 @@ class ClipboardHistoryDialog(wx.Dialog):
 		)
 		self.history = history
 		self.plugin = plugin_ref
+		# Entries currently listed: the whole history, or the search results.
+		self._items = history
 		self.Bind(wx.EVT_CLOSE, self.onCloseDialog)
 		
 		mainSizer = wx.BoxSizer(wx.VERTICAL)
 		
+		searchLabel = wx.StaticText(self, label=_("&Search:"))
+		mainSizer.Add(searchLabel, flag=wx.LEFT | wx.RIGHT | wx.TOP, border=8)
+		self.searchEdit = wx.TextCtrl(self)
+		mainSizer.Add(self.searchEdit, flag=wx.ALL | wx.EXPAND, border=8)
+		
 		label = wx.StaticText(self, label=_("Recent clipboard items:"))
 		mainSizer.Add(label, flag=wx.ALL, border=8)
 		
-		# Replace newlines with spaces for single-line display in listbox
-		display_choices = [(item[:80] + "..." if len(item)>80 else item).replace('\r\n', ' ').replace('\n', ' ') for item in history]
-		self.listBox = wx.ListBox(self, choices=display_choices)
-		mainSizer.Add(self.listBox, proportion=1, flag=wx.ALL | wx.EXPAND, border=8)
+		self.listCtrl = HistoryListCtrl(self)
+		self.listCtrl.setItems(self._items)
+		mainSizer.Add(self.listCtrl, proportion=1, flag=wx.ALL | wx.EXPAND, border=8)
+
+		# Shows a thumbnail while an image is selected.
+		self.imagePreview = wx.StaticBitmap(self)
+		self.imagePreview.Hide()
+		mainSizer.Add(self.imagePreview, flag=wx.LEFT | wx.RIGHT | wx.ALIGN_CENTER_HORIZONTAL, border=8)
 		
 		btnSizer = wx.BoxSizer(wx.HORIZONTAL)
 		self.btnOptions = wx.Button(self, label=_("&Action"))
@@ -1073,29 +2255,72 @@ class ClipboardHistoryDialog(wx.Dialog):
 		
 		self.btnOptions.Bind(wx.EVT_BUTTON, self.onOptionsBtn)
 		self.btnClose.Bind(wx.EVT_BUTTON, self.onCloseDialog)
+		self.searchEdit.Bind(wx.EVT_TEXT, self.onSearch)
+		self.listCtrl.Bind(wx.EVT_LIST_ITEM_SELECTED, self.onItemSelected)
 		self.Bind(wx.EVT_CHAR_HOOK, self.onCharHook)
 		
-		self.listBox.SetFocus()
-		if self.history:
-			self.listBox.SetSelection(0)
+		self.listCtrl.SetFocus()
+		self.listCtrl.selectIndex(0)
+
+	def onHistoryChanged(self):
+		if self._items is self.history:
+			self.listCtrl.refreshItems()
+
+	def onItemSelected(self, evt):
+		entry = self._getSelectedEntry()
+		thumbnail = self.plugin._getThumbnail(entry) if entry is not None else None
+		if thumbnail is None:
+			self.imagePreview.Hide()
+		else:
+			self.imagePreview.SetBitmap(thumbnail)
+			self.imagePreview.Show()
+		self.Layout()
+		evt.Skip()
+
+	def onSearch(self, evt):
+		query = self.searchEdit.GetValue().strip()
+		if query:
+			self._items = []
+			for key in self.plugin._searchIndex.search(query):
+				entry = self.history.entryForKey(key)
+				if entry is not None:
+					self._items.append(entry)
+		else:
+			self._items = self.history
+		self.listCtrl.setItems(self._items)
+		self.listCtrl.selectIndex(0)
 			
 	def onOptionsBtn(self, evt):
 		menu = wx.Menu()
 		idRestore = wx.NewIdRef()
 		idEdit = wx.NewIdRef()
+		idPin = wx.NewIdRef()
 		idDelete = wx.NewIdRef()
 		idClear = wx.NewIdRef()
+		idExport = wx.NewIdRef()
+		idImport = wx.NewIdRef()
 		
 		menu.Append(idRestore, _("&Restore"))
 		menu.Append(idEdit, _("&Edit"))
+		entry = self._getSelectedEntry()
+		if entry is not None and entry.pinned:
+			menu.Append(idPin, _("Un&pin"))
+		else:
+			menu.Append(idPin, _("&Pin"))
 		menu.AppendSeparator()
 		menu.Append(idDelete, _("&Delete"))
 		menu.Append(idClear, _("&Clear All"))
+		menu.AppendSeparator()
+		menu.Append(idExport, _("E&xport..."))
+		menu.Append(idImport, _("&Import..."))
 		
 		self.Bind(wx.EVT_MENU, self.onRestore, id=idRestore)
 		self.Bind(wx.EVT_MENU, self.onEdit, id=idEdit)
+		self.Bind(wx.EVT_MENU, self.onTogglePin, id=idPin)
 		self.Bind(wx.EVT_MENU, self.onDelete, id=idDelete)
 		self.Bind(wx.EVT_MENU, self.onClear, id=idClear)
+		self.Bind(wx.EVT_MENU, self.onExport, id=idExport)
+		self.Bind(wx.EVT_MENU, self.onImport, id=idImport)
 		
 		self.btnOptions.PopupMenu(menu)
 		menu.Destroy()
@@ -1114,26 +2339,49 @@ class ClipboardHistoryDialog(wx.Dialog):
 		self.Destroy()
 
 	def onRestore(self, evt):
-		idx = self.listBox.GetSelection()
+		idx = self.listCtrl.getSelectedIndex()
 		if idx != wx.NOT_FOUND:
-			text = self.history[idx]
-			if _copyTextToClipboard(text):
-				self.plugin._lastClipboardText = text
+			entry = self._items[idx]
+			text = entry.text
+			if _copyDataToClipboard(text, self.history.formatsOf(entry)):
+				self.plugin._noteClipboardWritten(text, entry)
 				ui.message(_("Clipboard updated"))
 				_playSound(880, 70)
 			self.onCloseDialog(evt)
 
 	def onEdit(self, evt):
-		idx = self.listBox.GetSelection()
+		idx = self.listCtrl.getSelectedIndex()
 		if idx != wx.NOT_FOUND:
-			text = self.history[idx]
+			if self._items[idx].image is not None:
+				_playSound(330, 100)
+				ui.message(_("Images cannot be opened in the editor"))
+				return
+			entry = self._items[idx]
+			text = entry.text
 			if _copyTextToClipboard(text):
-				self.plugin._lastClipboardText = text
+				self.plugin._noteClipboardWritten(text, entry)
 			self.onCloseDialog(evt)
 			wx.CallAfter(self.plugin._openEditor)
 
+	def _getSelectedEntry(self):
+		idx = self.listCtrl.getSelectedIndex()
+		if idx == wx.NOT_FOUND:
+			return None
+		return self._items[idx]
+
+	def onTogglePin(self, evt):
+		entry = self._getSelectedEntry()
+		if entry is None:
+			return
+		self.history.setPinned(entry, not entry.pinned)
+		self.listCtrl.refreshItems()
+		if entry.pinned:
+			ui.message(_("Pinned"))
+		else:
+			ui.message(_("Unpinned"))
+
 	def onDelete(self, evt):
-		idx = self.listBox.GetSelection()
+		idx = self.listCtrl.getSelectedIndex()
 		if idx != wx.NOT_FOUND:
 			if gui.messageBox(
 				_("Are you sure you want to delete this item?"),
@@ -1141,12 +2389,47 @@ class ClipboardHistoryDialog(wx.Dialog):
 				wx.YES_NO | wx.NO_DEFAULT | wx.ICON_QUESTION,
 				self
 			) == wx.YES:
-				del self.history[idx]
-				self.listBox.Delete(idx)
-				if self.history:
-					self.listBox.SetSelection(min(idx, len(self.history)-1))
+				entry = self._items[idx]
+				if self._items is not self.history:
+					del self._items[idx]
+				self.history.removeEntry(entry)
+				self.listCtrl.refreshItems()
+				if self._items:
+					self.listCtrl.selectIndex(min(idx, len(self._items)-1))
 				else:
-					self.listBox.SetFocus()
+					self.listCtrl.SetFocus()
+
+	def onExport(self, evt):
+		# Exports the items listed: the search results while searching, else the whole history.
+		if not self._items:
+			return
+		with wx.FileDialog(
+			self,
+			_("Export history"),
+			wildcard=_("History archives (*.jsonl)|*.jsonl|All files (*.*)|*.*"),
+			style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT,
+		) as fileDialog:
+			if fileDialog.ShowModal() == wx.ID_CANCEL:
+				return
+			path = fileDialog.GetPath()
+		self.plugin._exportHistory(list(self._items), path)
+
+	def onImport(self, evt):
+		with wx.FileDialog(
+			self,
+			_("Import history"),
+			wildcard=_("History archives (*.jsonl)|*.jsonl|All files (*.*)|*.*"),
+			style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST,
+		) as fileDialog:
+			if fileDialog.ShowModal() == wx.ID_CANCEL:
+				return
+			path = fileDialog.GetPath()
+		if self._items is not self.history:
+			# Imported items are shown with the rest of the history.
+			self.searchEdit.ChangeValue("")
+			self._items = self.history
+			self.listCtrl.setItems(self._items)
+		self.plugin._importHistory(path)
 
 	def onClear(self, evt):
 		if not self.history:
@@ -1158,7 +2441,8 @@ class ClipboardHistoryDialog(wx.Dialog):
 			self
 		) == wx.YES:
 			self.history.clear()
-			self.listBox.Clear()
+			self._items = self.history
+			self.listCtrl.setItems(self._items)
 
 
 class AddonSettingsPanel(SettingsPanel):
@@ -1229,9 +2513,18 @@ class AddonSettingsPanel(SettingsPanel):
 			backupLabel,
 			gui.nvdaControls.SelectOnFocusSpinCtrl,
 			min=1,
-			max=20,
+			max=500,
 			initial=backup_val,
 		)
+
+		self.persistBackupsCheckBox = sHelper.addItem(
+			wx.CheckBox(self, label=_("Keep editor &backups after restarting NVDA")),
+		)
+		try:
+			val = config.conf["ClipboardContentEditor"].get("persistBackups", False)
+			self.persistBackupsCheckBox.SetValue(val if isinstance(val, bool) else str(val).lower() == "true")
+		except Exception:
+			self.persistBackupsCheckBox.SetValue(False)
 		
 		# History Size Combobox
 		self.historyChoices = ["10", "25", "50", "100", "All"]
@@ -1251,12 +2544,126 @@ class AddonSettingsPanel(SettingsPanel):
 		except ValueError:
 			self.historyCombo.SetSelection(0)
 
+		try:
+			preview_val = int(config.conf["ClipboardContentEditor"].get("previewLength", 80))
+		except Exception:
+			preview_val = 80
+		self.previewLengthSpin = sHelper.addLabeledControl(
+			_("History &preview length (characters)"),
+			gui.nvdaControls.SelectOnFocusSpinCtrl,
+			min=10,
+			max=1000,
+			initial=preview_val,
+		)
+
+		self.collapseWhitespaceCheckBox = sHelper.addItem(
+			wx.CheckBox(self, label=_("&Collapse whitespace and control characters in history previews")),
+		)
+		try:
+			val = config.conf["ClipboardContentEditor"].get("previewCollapseWhitespace", True)
+			self.collapseWhitespaceCheckBox.SetValue(val if isinstance(val, bool) else str(val).lower() == "true")
+		except Exception:
+			self.collapseWhitespaceCheckBox.SetValue(True)
+
+		try:
+			budget_val = int(config.conf["ClipboardContentEditor"].get("memoryBudget", 64))
+		except Exception:
+			budget_val = 64
+		self.memoryBudgetSpin = sHelper.addLabeledControl(
+			_("&Memory limit for history and backups in MB (0 for no limit)"),
+			gui.nvdaControls.SelectOnFocusSpinCtrl,
+			min=0,
+			max=100000,
+			initial=budget_val,
+		)
+		try:
+			compress_val = int(config.conf["ClipboardContentEditor"].get("compressThreshold", 64))
+		except Exception:
+			compress_val = 64
+		self.compressThresholdSpin = sHelper.addLabeledControl(
+			_("Compress history and backup items larger than this many &KB (0 to disable)"),
+			gui.nvdaControls.SelectOnFocusSpinCtrl,
+			min=0,
+			max=1000000,
+			initial=compress_val,
+		)
+		try:
+			spill_val = int(config.conf["ClipboardContentEditor"].get("spillThreshold", 16))
+		except Exception:
+			spill_val = 16
+		self.spillThresholdSpin = sHelper.addLabeledControl(
+			_("Keep history and backup items larger than this many MB in temporary &files (0 to disable)"),
+			gui.nvdaControls.SelectOnFocusSpinCtrl,
+			min=0,
+			max=100000,
+			initial=spill_val,
+		)
+		plugin = _getRunningPlugin()
+		if plugin:
+			usage = _("Current memory use: {history} for {count} history items, {backups} for backups").format(
+				history=_formatSize(plugin._clipboardHistory.memoryUsage),
+				count=len(plugin._clipboardHistory),
+				backups=_formatSize(plugin._getBackupMemoryUsage()),
+			)
+			sHelper.addItem(wx.StaticText(self, label=usage))
+
+		self.persistHistoryCheckBox = sHelper.addItem(
+			wx.CheckBox(self, label=_("&Keep clipboard history after restarting NVDA")),
+		)
+		try:
+			val = config.conf["ClipboardContentEditor"].get("persistHistory", False)
+			self.persistHistoryCheckBox.SetValue(val if isinstance(val, bool) else str(val).lower() == "true")
+		except Exception:
+			self.persistHistoryCheckBox.SetValue(False)
+
+		self.encodingChoices = list(SAVE_ENCODINGS)
+		self.encodingLabels = [_("UTF-8"), _("UTF-8 with BOM"), _("UTF-16"), _("Windows ANSI")]
+		self.encodingCombo = sHelper.addLabeledControl(
+			_("&Encoding of files saved from the editor"),
+			wx.Choice,
+			choices=self.encodingLabels
+		)
+		current_encoding = config.conf["ClipboardContentEditor"].get("saveEncoding", "utf-8")
+		try:
+			self.encodingCombo.SetSelection(self.encodingChoices.index(current_encoding))
+		except ValueError:
+			self.encodingCombo.SetSelection(0)
+
+		self.lineEndingChoices = ["keep", "windows", "unix"]
+		self.lineEndingLabels = [_("Keep as they are"), _("Windows (CR LF)"), _("Unix (LF)")]
+		self.lineEndingCombo = sHelper.addLabeledControl(
+			_("Line e&ndings of files saved from the editor"),
+			wx.Choice,
+			choices=self.lineEndingLabels
+		)
+		current_line_ending = config.conf["ClipboardContentEditor"].get("saveLineEnding", "keep")
+		try:
+			self.lineEndingCombo.SetSelection(self.lineEndingChoices.index(current_line_ending))
+		except ValueError:
+			self.lineEndingCombo.SetSelection(0)
+
 	def onSave(self):
 		config.conf["ClipboardContentEditor"]["protectModeEnabled"] = self.protectModeCheckBox.GetValue()
 		config.conf["ClipboardContentEditor"]["soundEnabled"] = self.soundCheckBox.GetValue()
 		config.conf["ClipboardContentEditor"]["backupLevels"] = int(self.backupLevelsSpin.GetValue())
+		config.conf["ClipboardContentEditor"]["persistBackups"] = self.persistBackupsCheckBox.GetValue()
 		
 		config.conf["ClipboardContentEditor"]["historySize"] = self.historyChoices[self.historyCombo.GetSelection()]
+		config.conf["ClipboardContentEditor"]["previewLength"] = int(self.previewLengthSpin.GetValue())
+		config.conf["ClipboardContentEditor"]["previewCollapseWhitespace"] = self.collapseWhitespaceCheckBox.GetValue()
+		config.conf["ClipboardContentEditor"]["persistHistory"] = self.persistHistoryCheckBox.GetValue()
+		config.conf["ClipboardContentEditor"]["memoryBudget"] = int(self.memoryBudgetSpin.GetValue())
+		config.conf["ClipboardContentEditor"]["compressThreshold"] = int(self.compressThresholdSpin.GetValue())
+		config.conf["ClipboardContentEditor"]["spillThreshold"] = int(self.spillThresholdSpin.GetValue())
+		config.conf["ClipboardContentEditor"]["saveEncoding"] = self.encodingChoices[self.encodingCombo.GetSelection()]
+		config.conf["ClipboardContentEditor"]["saveLineEnding"] = self.lineEndingChoices[self.lineEndingCombo.GetSelection()]
+		plugin = _getRunningPlugin()
+		if plugin:
+			plugin._applyPreviewSettings()
+			plugin._applyPackingSettings()
+			plugin._applyHistoryPersistence()
+			plugin._applyBackupPersistence()
+			plugin._enforceMemoryBudget()
 		
 		selectedLanguage = self.languageChoices[self.languageCombo.GetSelection()]
 		oldLanguage = config.conf["ClipboardContentEditor"].get("language", "default")
@@ -0,0 +1,81 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Append-mode collection buffer.
+# Every snippet collected in append mode is stored once as a segment; the
+# joined text is only built when it is written to the clipboard. The digest
+# of the joined text is kept up to date incrementally, so recognising the
+# add-on's own clipboard write never hashes the whole collection again.
+# A session stands in for the body of its history entry until it finishes.
+
+import hashlib
+import sys
+
+SEPARATOR = "\r\n"
+
+
+def _encode(text):
+	return text.encode("utf-8", "surrogatepass")
+
+
+class AppendSession:
+	def __init__(self, text):
+		self._segments = [text]
+		self._hasher = hashlib.blake2b(_encode(text), digest_size=16)
+		self.length = len(text)
+		self.byteLength = len(_encode(text))
+		self._memorySize = sys.getsizeof(text)
+
+	def __len__(self):
+		return self.length
+
+	@property
+	def segmentCount(self):
+		return len(self._segments)
+
+	@property
+	def memorySize(self):
+		return self._memorySize + sys.getsizeof(self._segments)
+
+	def _hasherWith(self, text):
+		hasher = self._hasher.copy()
+		hasher.update(_encode(SEPARATOR + text))
+		return hasher
+
+	def digestWith(self, text):
+		# Digest the joined text would have with text appended, as clipboardMonitor.textDigest computes it.
+		return self._hasherWith(text).digest()
+
+	def readWith(self, text):
+		# The joined text with text appended, without changing the session.
+		return SEPARATOR.join(self._segments + [text])
+
+	def append(self, text):
+		self._hasher = self._hasherWith(text)
+		self._segments.append(text)
+		self.length += len(SEPARATOR) + len(text)
+		self.byteLength += len(_encode(SEPARATOR + text))
+		self._memorySize += sys.getsizeof(text)
+
+	@property
+	def digest(self):
+		return self._hasher.digest()
+
+	def read(self):
+		return SEPARATOR.join(self._segments)
+
+	def iterChunks(self):
+		for position, segment in enumerate(self._segments):
+			if position:
+				yield SEPARATOR
+			yield segment
+
+	def readPrefix(self, length):
+		parts = []
+		for chunk in self.iterChunks():
+			parts.append(chunk[:length])
+			length -= len(parts[-1])
+			if length <= 0:
+				break
+		return "".join(parts)
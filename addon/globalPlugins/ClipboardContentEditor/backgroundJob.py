@@ -0,0 +1,87 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Heavy editor operations off the GUI thread.
+# A BackgroundJob runs one function on a worker thread and hands its result
+# back through callAfter, which in the add-on is wx.CallAfter, so the result
+# is always applied on the GUI thread. The work reports how far it has got
+# as a fraction; that report is also where a cancelled job stops, by raising
+# JobCancelled. A cancelled job is only over once its worker has returned:
+# work with side effects may already be past the last point where it could
+# stop, and such a job still delivers its result then, so the caller never
+# claims work was canceled that was in fact done.
+
+import itertools
+import threading
+
+# Calls of a per-match callback between progress reports.
+PROGRESS_INTERVAL = 4096
+
+
+class JobCancelled(Exception):
+	pass
+
+
+def reportEvery(callback, progress, fraction, interval=PROGRESS_INTERVAL):
+	# Wraps a callback run once per match or item; every interval calls it first reports progress(fraction(argument)).
+	calls = itertools.count(1)
+
+	def reporting(argument):
+		if not next(calls) % interval:
+			progress(fraction(argument))
+		return callback(argument)
+	return reporting
+
+
+class BackgroundJob:
+	def __init__(self, work, onDone, onError, callAfter, onCancelled=None, keepsResult=False):
+		# work(progress) runs on the worker thread; onDone(result) and onError(exception) run through callAfter.
+		# Once cancelled, the job ends with onCancelled() instead, unless keepsResult is set and the work
+		# finished anyway, which still goes to onDone.
+		self._work = work
+		self._onDone = onDone
+		self._onError = onError
+		self._onCancelled = onCancelled
+		self._callAfter = callAfter
+		self.keepsResult = keepsResult
+		self.fraction = 0.0
+		self.cancelled = False
+		# Set on the GUI thread once the worker has returned.
+		self.finished = False
+
+	def start(self):
+		threading.Thread(target=self._run, name="ClipboardContentEditor job", daemon=True).start()
+
+	def cancel(self):
+		self.cancelled = True
+
+	def abandon(self):
+		# Cancels for an owner that is going away: nothing is delivered any more.
+		self.cancelled = True
+		self._onDone = self._onError = self._onCancelled = None
+
+	def progress(self, fraction):
+		if self.cancelled:
+			raise JobCancelled()
+		self.fraction = fraction
+
+	def _run(self):
+		try:
+			result = self._work(self.progress)
+		except JobCancelled:
+			self._callAfter(self._deliver, None, None)
+			return
+		except Exception as error:
+			self._callAfter(self._deliver, self._onError, error)
+			return
+		self._callAfter(self._deliver, self._onDone, result)
+
+	def _deliver(self, callback, value):
+		# callback is None when the work stopped because it was cancelled.
+		self.finished = True
+		if callback is None or (self.cancelled and not (self.keepsResult and callback is self._onDone)):
+			if self._onCancelled is not None:
+				self._onCancelled()
+			return
+		callback(value)
@@ -0,0 +1,245 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Editor backups as a base text plus reverse deltas.
+# Only the newest backup is kept in full, packed like history bodies; every
+# older level is the single delta turning the level before it into it, so a
+# level costs about as much memory as the edit that replaced it. Restoring a
+# level replays the deltas leading to it over the base held in chunks, so
+# each delta only copies the chunks it touches. BackupStore keeps a copy on
+# disk, written on a background thread.
+
+import itertools
+import os
+import queue
+import struct
+import threading
+from bisect import bisect_left, bisect_right
+
+from .compression import TextPacker, packedSize, unpackText
+from .undoStack import TextDelta, deltasSize, diffTexts
+
+FILE_MAGIC = b"CCEBAK01"
+
+# offset, removed length, inserted length; the texts follow as UTF-8.
+_RECORD = struct.Struct("<QQQ")
+
+_NO_CHANGE = TextDelta(0, "", "")
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkedText:
+	# Text held in chunks, so applying a delta only copies the chunks it touches.
+	def __init__(self, text):
+		self._chunks = [text[start:start + _CHUNK_SIZE] for start in range(0, len(text), _CHUNK_SIZE)] or [""]
+		self._reindex()
+
+	def _reindex(self):
+		self._starts = [0]
+		self._starts.extend(itertools.accumulate(map(len, self._chunks)))
+
+	def apply(self, delta):
+		offset, removed, inserted = delta
+		if not removed and not inserted:
+			return
+		end = offset + len(removed)
+		lastChunk = len(self._chunks) - 1
+		first = min(bisect_right(self._starts, offset) - 1, lastChunk)
+		last = min(max(bisect_left(self._starts, end) - 1, first), lastChunk)
+		chunkStart = self._starts[first]
+		joined = "".join(self._chunks[first:last + 1])
+		joined = joined[:offset - chunkStart] + inserted + joined[end - chunkStart:]
+		self._chunks[first:last + 1] = [joined[start:start + _CHUNK_SIZE] for start in range(0, len(joined), _CHUNK_SIZE)]
+		if not self._chunks:
+			self._chunks.append("")
+		self._reindex()
+
+	def read(self):
+		return "".join(self._chunks)
+
+	def readPrefix(self, length):
+		parts = []
+		for chunk in self._chunks:
+			parts.append(chunk[:length])
+			length -= len(parts[-1])
+			if length <= 0:
+				break
+		return "".join(parts)
+
+
+class BackupHistory:
+	def __init__(self, packer=None):
+		self.packer = packer or TextPacker()
+		self._base = None
+		# _deltas[i] turns level i into level i + 1; level 0 is the newest backup.
+		self._deltas = []
+		self._deltasSize = 0
+
+	def __len__(self):
+		return 0 if self._base is None else len(self._deltas) + 1
+
+	@property
+	def memorySize(self):
+		return packedSize(self._base) + self._deltasSize
+
+	def _setDeltas(self, deltas):
+		self._deltas = deltas
+		self._deltasSize = sum(deltasSize([delta]) for delta in deltas)
+
+	def push(self, text):
+		# Makes text the newest backup.
+		if self._base is not None:
+			delta = diffTexts(text, unpackText(self._base)) or _NO_CHANGE
+			self._deltas.insert(0, delta)
+			self._deltasSize += deltasSize([delta])
+		self._base = self.packer.pack(text)
+
+	def truncate(self, levels):
+		if len(self) > levels:
+			if levels <= 0:
+				self.clear()
+				return
+			for delta in self._deltas[levels - 1:]:
+				self._deltasSize -= deltasSize([delta])
+			del self._deltas[levels - 1:]
+
+	def clear(self):
+		self._base = None
+		self._setDeltas([])
+
+	def _chunkedText(self, level):
+		text = _ChunkedText(unpackText(self._base))
+		for delta in self._deltas[:level]:
+			text.apply(delta)
+		return text
+
+	def text(self, level=0):
+		if not 0 <= level < len(self):
+			raise IndexError(level)
+		return self._chunkedText(level).read()
+
+	def previews(self, length):
+		# The first length characters of every level, newest first, without building the texts.
+		if self._base is None:
+			return []
+		text = _ChunkedText(unpackText(self._base))
+		previews = [text.readPrefix(length)]
+		for delta in self._deltas:
+			text.apply(delta)
+			previews.append(text.readPrefix(length))
+		return previews
+
+	def pop(self, level=0):
+		# Removes a level and returns its text.
+		text = self.text(level)
+		if level == 0:
+			self._base = self.packer.pack(self.text(1)) if self._deltas else None
+			deltas = self._deltas[1:]
+		elif level == len(self._deltas):
+			deltas = self._deltas[:-1]
+		else:
+			bridge = diffTexts(self.text(level - 1), self.text(level + 1)) or _NO_CHANGE
+			deltas = self._deltas[:level - 1] + [bridge] + self._deltas[level + 1:]
+		self._setDeltas(deltas)
+		return text
+
+	def snapshot(self):
+		# What BackupStore.save needs; safe to hand to another thread.
+		return self._base, list(self._deltas)
+
+	def restore(self, base, deltas):
+		self._base = None if base is None else self.packer.pack(unpackText(base))
+		self._setDeltas(list(deltas))
+
+
+def _encodeText(text):
+	return text.encode("utf-8", "surrogatepass")
+
+
+def _decodeText(data):
+	return data.decode("utf-8", "surrogatepass")
+
+
+class BackupStore:
+	def __init__(self, path):
+		self.path = path
+		self._queue = queue.Queue()
+		self._thread = None
+
+	def start(self):
+		self._thread = threading.Thread(target=self._run, name="ClipboardContentEditor backup store", daemon=True)
+		self._thread.start()
+
+	def close(self):
+		if self._thread is not None:
+			self._queue.put(None)
+			self._thread.join()
+			self._thread = None
+
+	def save(self, snapshot):
+		self._queue.put(snapshot)
+
+	def load(self):
+		# Returns (base, deltas); an empty history if the file is missing or damaged.
+		try:
+			with open(self.path, "rb") as handle:
+				if handle.read(len(FILE_MAGIC)) != FILE_MAGIC:
+					return None, []
+				records = []
+				while True:
+					header = handle.read(_RECORD.size)
+					if not header:
+						break
+					if len(header) < _RECORD.size:
+						return None, []
+					offset, removedLength, insertedLength = _RECORD.unpack(header)
+					removed = handle.read(removedLength)
+					inserted = handle.read(insertedLength)
+					if len(removed) < removedLength or len(inserted) < insertedLength:
+						return None, []
+					records.append(TextDelta(offset, _decodeText(removed), _decodeText(inserted)))
+		except (OSError, UnicodeDecodeError):
+			return None, []
+		if not records:
+			return None, []
+		return records[0].inserted, records[1:]
+
+	def _run(self):
+		while True:
+			snapshot = self._queue.get()
+			closing = snapshot is None
+			# Only the latest snapshot matters.
+			while not self._queue.empty():
+				newer = self._queue.get()
+				if newer is None:
+					closing = True
+				else:
+					snapshot = newer
+			if snapshot is not None:
+				try:
+					self._write(*snapshot)
+				except OSError:
+					pass
+			snapshot = newer = None
+			if closing:
+				return
+
+	def _write(self, base, deltas):
+		if base is None:
+			try:
+				os.remove(self.path)
+			except OSError:
+				pass
+			return
+		temporaryPath = self.path + ".tmp"
+		with open(temporaryPath, "wb") as handle:
+			handle.write(FILE_MAGIC)
+			for offset, removed, inserted in [TextDelta(0, "", unpackText(base))] + deltas:
+				removed = _encodeText(removed)
+				inserted = _encodeText(inserted)
+				handle.write(_RECORD.pack(offset, len(removed), len(inserted)))
+				handle.write(removed)
+				handle.write(inserted)
+		os.replace(temporaryPath, self.path)
@@ -0,0 +1,303 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Clipboard formats besides plain text.
+# When something is copied, the raw payloads of HTML, RTF, file lists and
+# images are captured as bytes and kept once per distinct content in a
+# PayloadStore, however many history entries refer to them; large payloads
+# are moved to spill files. Turning a payload into text can be expensive,
+# for HTML in particular, so it is not done at capture: an entry that has no
+# text of its own gets a FormatText body, which converts its payload only
+# when something reads it. Images are device-independent bitmaps, whose
+# header gives their dimensions without decoding any pixels.
+
+import codecs
+import collections
+import hashlib
+import re
+import struct
+import sys
+
+from .htmlText import htmlToText
+from .spill import spillBytes
+
+FORMAT_HTML = "html"
+FORMAT_RTF = "rtf"
+FORMAT_FILES = "files"
+FORMAT_IMAGE = "image"
+RICH_FORMATS = (FORMAT_HTML, FORMAT_RTF, FORMAT_FILES, FORMAT_IMAGE)
+# Formats that have a text form, in the order an entry without text picks the one its text comes from.
+TEXT_FORMATS = (FORMAT_HTML, FORMAT_RTF, FORMAT_FILES)
+# Names under which Windows registers the formats that have no predefined identifier.
+REGISTERED_FORMAT_NAMES = {FORMAT_HTML: "HTML Format", FORMAT_RTF: "Rich Text Format"}
+
+
+def payloadDigest(payload):
+	return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def formatsDigest(formats):
+	# Identifies a capture without text by the formats it held and their content.
+	hasher = hashlib.blake2b(b"formats", digest_size=16)
+	for name in RICH_FORMATS:
+		payload = formats.get(name)
+		if payload:
+			hasher.update(name.encode("ascii") + b"\0" + payloadDigest(payload))
+	return hasher.digest()
+
+
+def encodeFileList(paths):
+	# File list payloads are the paths, one per line, as UTF-8.
+	return "\n".join(paths).encode("utf-8", "surrogatepass")
+
+
+def decodeFileList(payload):
+	return payload.decode("utf-8", "surrogatepass").split("\n") if payload else []
+
+
+ImageInfo = collections.namedtuple("ImageInfo", ("width", "height", "bitCount"))
+
+# BITMAPINFOHEADER up to biClrUsed: size, width, height, planes, bit count, compression,
+# image size, horizontal and vertical resolution, colours used.
+_DIB_HEADER = struct.Struct("<IiiHHIIiiI")
+_BITMAPINFOHEADER_SIZE = 40
+_BI_RGB = 0
+_BI_BITFIELDS = 3
+_BI_ALPHABITFIELDS = 6
+
+
+def imageInfo(payload):
+	# Returns the ImageInfo of a CF_DIB payload, or None if it is not one this add-on can read.
+	if len(payload) < _BITMAPINFOHEADER_SIZE:
+		return None
+	headerSize, width, height, planes, bitCount = _DIB_HEADER.unpack_from(payload)[:5]
+	if headerSize < _BITMAPINFOHEADER_SIZE or width <= 0 or not height or planes != 1 or bitCount not in (1, 4, 8, 16, 24, 32):
+		return None
+	return ImageInfo(width, abs(height), bitCount)
+
+
+def _dibLayout(payload):
+	# Returns the offset of the pixels and their length in bytes.
+	headerSize, width, height, planes, bitCount, compression, imageSize, _, _, colorsUsed = _DIB_HEADER.unpack_from(payload)
+	if not colorsUsed and bitCount <= 8:
+		colorsUsed = 1 << bitCount
+	masks = 0
+	if headerSize == _BITMAPINFOHEADER_SIZE:
+		# A plain BITMAPINFOHEADER is followed by the colour masks; later versions hold them.
+		masks = {_BI_BITFIELDS: 12, _BI_ALPHABITFIELDS: 16}.get(compression, 0)
+	offset = headerSize + masks + colorsUsed * 4
+	if compression in (_BI_RGB, _BI_BITFIELDS, _BI_ALPHABITFIELDS):
+		imageSize = (width * bitCount + 31) // 32 * 4 * abs(height)
+	return offset, imageSize
+
+
+def trimDib(payload):
+	# Clipboard memory blocks can be larger than the bitmap; the rest is not part of the image.
+	offset, imageSize = _dibLayout(payload)
+	return payload[:offset + imageSize]
+
+
+def dibToBmp(payload):
+	# A BMP file is a DIB behind a 14 byte file header pointing at the pixels.
+	offset = _dibLayout(payload)[0]
+	return b"BM" + struct.pack("<IHHI", 14 + len(payload), 0, 0, 14 + offset) + payload
+
+
+# CF_HTML starts with a header of byte offsets into the payload.
+_CF_HTML_OFFSET_RE = re.compile(rb"^(StartHTML|EndHTML|StartFragment|EndFragment):(-?\d+)", re.M)
+_CF_HTML_HEADER_LIMIT = 1024
+
+
+def htmlFragment(payload):
+	# Returns the copied part of a CF_HTML payload, or the whole document if the header lacks it.
+	offsets = {
+		name: int(value)
+		for name, value in _CF_HTML_OFFSET_RE.findall(payload[:_CF_HTML_HEADER_LIMIT])
+	}
+	for startName, endName in ((b"StartFragment", b"EndFragment"), (b"StartHTML", b"EndHTML")):
+		start = offsets.get(startName, -1)
+		end = offsets.get(endName, -1)
+		if 0 <= start <= end <= len(payload):
+			return payload[start:end].decode("utf-8", "replace")
+	return payload.decode("utf-8", "replace")
+
+
+# Control words, hex escapes, control symbols, braces, line breaks (which RTF ignores) and text.
+_RTF_TOKEN_RE = re.compile(
+	r"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-fA-F]{2})|\\(.)|([{}])|[\r\n]+|([^\\{}\r\n]+)",
+	re.S,
+)
+_RTF_CODEPAGE_RE = re.compile(r"\\ansicpg(\d+)")
+# Destinations that hold no document text.
+_RTF_SKIPPED_DESTINATIONS = {
+	"fonttbl", "colortbl", "stylesheet", "info", "pict", "object", "header", "headerl", "headerr",
+	"headerf", "footer", "footerl", "footerr", "footerf", "listtable", "listoverridetable",
+	"rsidtbl", "generator", "xmlnstbl", "themedata", "colorschememapping", "latentstyles",
+	"datastore", "fldinst", "filetbl", "revtbl", "pgdsctbl",
+}
+_RTF_WORD_TEXT = {
+	"par": "\n", "line": "\n", "row": "\n", "page": "\n", "sect": "\n\n", "tab": "\t", "cell": "\t",
+	"emdash": "\u2014", "endash": "\u2013", "bullet": "\u2022", "emspace": "\u2003", "enspace": "\u2002",
+	"lquote": "\u2018", "rquote": "\u2019", "ldblquote": "\u201c", "rdblquote": "\u201d",
+}
+_RTF_SYMBOL_TEXT = {"~": "\u00a0", "_": "\u2011", "-": "", "\\": "\\", "{": "{", "}": "}", "\n": "\n", "\r": "\n"}
+
+
+def rtfToText(payload):
+	source = payload.decode("latin-1").rstrip("\0")
+	match = _RTF_CODEPAGE_RE.search(source)
+	codepage = "cp1252"
+	if match:
+		try:
+			codepage = codecs.lookup("cp" + match.group(1)).name
+		except LookupError:
+			pass
+	parts = []
+	# Bytes from consecutive hex escapes, decoded together so double-byte code pages work.
+	pending = bytearray()
+	stack = []
+	ignorable = False
+	# Characters that stand in for the last \u character and must be dropped, and how many each \u has.
+	skip = 0
+	unicodeSkip = 1
+	for match in _RTF_TOKEN_RE.finditer(source):
+		word, argument, hexCode, symbol, brace, text = match.groups()
+		if hexCode is not None:
+			if skip:
+				skip -= 1
+			elif not ignorable:
+				pending.append(int(hexCode, 16))
+			continue
+		if pending:
+			parts.append(pending.decode(codepage, "replace"))
+			pending.clear()
+		if text is not None:
+			if skip:
+				dropped = min(skip, len(text))
+				skip -= dropped
+				text = text[dropped:]
+			if not ignorable:
+				parts.append(text)
+			continue
+		if word is None and symbol is None and brace is None:
+			# A raw line break.
+			continue
+		skip = 0
+		if brace == "{":
+			stack.append((ignorable, unicodeSkip))
+		elif brace == "}":
+			if stack:
+				ignorable, unicodeSkip = stack.pop()
+		elif symbol is not None:
+			if symbol == "*":
+				ignorable = True
+			elif not ignorable:
+				parts.append(_RTF_SYMBOL_TEXT.get(symbol, ""))
+		elif word in _RTF_SKIPPED_DESTINATIONS:
+			ignorable = True
+		elif word == "uc":
+			unicodeSkip = int(argument or 1)
+		elif word == "u":
+			if not ignorable and argument:
+				parts.append(chr(int(argument) % 0x10000))
+			skip = unicodeSkip
+		elif not ignorable:
+			parts.append(_RTF_WORD_TEXT.get(word, ""))
+	if pending:
+		parts.append(pending.decode(codepage, "replace"))
+	# Characters outside the BMP arrive as two \u surrogates; joining them through UTF-16 pairs them up.
+	return "".join(parts).encode("utf-16-le", "surrogatepass").decode("utf-16-le", "replace")
+
+
+def formatToText(name, payload):
+	if name == FORMAT_HTML:
+		return htmlToText(htmlFragment(payload))
+	if name == FORMAT_RTF:
+		return rtfToText(payload)
+	if name == FORMAT_FILES:
+		return "\n".join(decodeFileList(payload))
+	return ""
+
+
+def readPayload(value):
+	# Payloads are held as bytes, or as SpilledBytes once moved to a spill file.
+	if value is None or isinstance(value, bytes):
+		return value
+	return value.read()
+
+
+def _payloadMemorySize(value):
+	if isinstance(value, bytes):
+		return sys.getsizeof(value)
+	return value.memorySize
+
+
+class FormatText:
+	# An entry body standing for the text of a payload, converted each time it is read.
+	__slots__ = ("name", "payload")
+
+	def __init__(self, name, payload):
+		self.name = name
+		self.payload = payload
+
+	@property
+	def memorySize(self):
+		# The payload is counted by the PayloadStore that shares it.
+		return sys.getsizeof(self)
+
+	def read(self):
+		return formatToText(self.name, readPayload(self.payload))
+
+	def iterChunks(self, chunkSize=1024 * 1024):
+		text = self.read()
+		for start in range(0, len(text), chunkSize):
+			yield text[start:start + chunkSize]
+
+
+class PayloadStore:
+	# Payloads by digest with a reference count, so identical content is held once.
+	def __init__(self):
+		self._payloads = {}
+		# Bytes of payloads held in memory; spilled ones only count their handle.
+		self.size = 0
+		# Payloads of at least spillThreshold bytes go to spill files in spillDirectory; 0 disables this.
+		self.spillThreshold = 0
+		self.spillDirectory = None
+
+	def __len__(self):
+		return len(self._payloads)
+
+	def add(self, payload):
+		# Returns the digest of payload; content already held is only counted once more.
+		digest = payloadDigest(payload)
+		slot = self._payloads.get(digest)
+		if slot is None:
+			value = payload
+			if self.spillThreshold and self.spillDirectory and len(payload) >= self.spillThreshold:
+				try:
+					value = spillBytes(self.spillDirectory, payload)
+				except OSError:
+					pass
+			slot = self._payloads[digest] = [value, 0]
+			self.size += _payloadMemorySize(value)
+		slot[1] += 1
+		return digest
+
+	def get(self, digest):
+		# The payload as held: bytes or SpilledBytes; readPayload turns either into bytes.
+		slot = self._payloads.get(digest)
+		return None if slot is None else slot[0]
+
+	def release(self, digest):
+		slot = self._payloads.get(digest)
+		if slot is None:
+			return
+		slot[1] -= 1
+		if slot[1] <= 0:
+			del self._payloads[digest]
+			self.size -= _payloadMemorySize(slot[0])
+
+	def clear(self):
+		self._payloads.clear()
+		self.size = 0
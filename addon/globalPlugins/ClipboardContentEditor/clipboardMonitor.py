@@ -0,0 +1,218 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Clipboard change detection.
+# The monitor asks its backend for a cheap change counter on every poll and
+# only fetches the clipboard text when that counter has moved, so an idle
+# clipboard costs one integer read per tick regardless of its size.
+# Together with the text it fetches the raw payloads of the rich formats
+# present, so copies with HTML, RTF or files are recorded, including copies
+# that have no text at all. Images are only fetched for copies without text,
+# such as screenshots; programs like spreadsheets add a picture of every
+# text they copy, which would only cost time and memory.
+
+import hashlib
+import types
+
+from .clipboardFormats import (
+	FORMAT_FILES,
+	FORMAT_IMAGE,
+	REGISTERED_FORMAT_NAMES,
+	encodeFileList,
+	formatsDigest,
+	imageInfo,
+	trimDib,
+)
+
+
+def textDigest(text):
+	return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+_CF_DIB = 8
+_CF_HDROP = 15
+
+_win32 = None
+
+
+def _getWin32():
+	# Private prototypes of the Windows functions used here, made once. The shared ctypes.windll
+	# functions belong to NVDA and every add-on, so their argtypes and restype are left alone.
+	global _win32
+	if _win32 is None:
+		import ctypes
+		from ctypes import wintypes
+
+		def prototype(library, name, restype, *argtypes):
+			return ctypes.WINFUNCTYPE(restype, *argtypes)((name, library))
+
+		user32 = ctypes.WinDLL("user32")
+		kernel32 = ctypes.WinDLL("kernel32")
+		shell32 = ctypes.WinDLL("shell32")
+		_win32 = types.SimpleNamespace(
+			GetClipboardSequenceNumber=prototype(user32, "GetClipboardSequenceNumber", wintypes.DWORD),
+			RegisterClipboardFormatW=prototype(user32, "RegisterClipboardFormatW", wintypes.UINT, wintypes.LPCWSTR),
+			OpenClipboard=prototype(user32, "OpenClipboard", wintypes.BOOL, wintypes.HWND),
+			CloseClipboard=prototype(user32, "CloseClipboard", wintypes.BOOL),
+			IsClipboardFormatAvailable=prototype(user32, "IsClipboardFormatAvailable", wintypes.BOOL, wintypes.UINT),
+			GetClipboardData=prototype(user32, "GetClipboardData", wintypes.HANDLE, wintypes.UINT),
+			GlobalLock=prototype(kernel32, "GlobalLock", ctypes.c_void_p, wintypes.HGLOBAL),
+			GlobalUnlock=prototype(kernel32, "GlobalUnlock", wintypes.BOOL, wintypes.HGLOBAL),
+			GlobalSize=prototype(kernel32, "GlobalSize", ctypes.c_size_t, wintypes.HGLOBAL),
+			DragQueryFileW=prototype(
+				shell32, "DragQueryFileW", wintypes.UINT, wintypes.HANDLE, wintypes.UINT, wintypes.LPWSTR, wintypes.UINT,
+			),
+		)
+	return _win32
+
+
+# Windows increments the clipboard sequence number on every clipboard change.
+class Win32ClipboardBackend:
+	def __init__(self):
+		self._win32 = win32 = _getWin32()
+		self._formatIds = {
+			name: win32.RegisterClipboardFormatW(formatName)
+			for name, formatName in REGISTERED_FORMAT_NAMES.items()
+		}
+		self._formatIds[FORMAT_FILES] = _CF_HDROP
+		self._formatIds[FORMAT_IMAGE] = _CF_DIB
+
+	def getSequenceNumber(self):
+		return self._win32.GetClipboardSequenceNumber()
+
+	def getText(self):
+		import api
+		return api.getClipData()
+
+	def getFormats(self, images=True):
+		# Returns {format name: payload bytes} for the rich formats on the clipboard.
+		win32 = self._win32
+		if not win32.OpenClipboard(None):
+			raise OSError("the clipboard is in use")
+		try:
+			formats = {}
+			for name, formatId in self._formatIds.items():
+				if name == FORMAT_IMAGE and not images:
+					continue
+				if not formatId or not win32.IsClipboardFormatAvailable(formatId):
+					continue
+				handle = win32.GetClipboardData(formatId)
+				if not handle:
+					continue
+				if name == FORMAT_FILES:
+					payload = encodeFileList(_readFileList(win32, handle))
+				elif name == FORMAT_IMAGE:
+					payload = _readGlobal(win32, handle)
+					payload = trimDib(payload) if imageInfo(payload) else b""
+				else:
+					# HTML and RTF end at a NUL within a block that may be larger.
+					payload = _readGlobal(win32, handle).split(b"\0", 1)[0]
+				if payload:
+					formats[name] = payload
+			return formats
+		finally:
+			win32.CloseClipboard()
+
+
+def _readGlobal(win32, handle):
+	import ctypes
+	pointer = win32.GlobalLock(handle)
+	if not pointer:
+		return b""
+	try:
+		return ctypes.string_at(pointer, win32.GlobalSize(handle))
+	finally:
+		win32.GlobalUnlock(handle)
+
+
+def _readFileList(win32, handle):
+	import ctypes
+	paths = []
+	for index in range(win32.DragQueryFileW(handle, 0xFFFFFFFF, None, 0)):
+		length = win32.DragQueryFileW(handle, index, None, 0)
+		buffer = ctypes.create_unicode_buffer(length + 1)
+		win32.DragQueryFileW(handle, index, buffer, length + 1)
+		paths.append(buffer.value)
+	return paths
+
+
+# In-memory clipboard for driving and benchmarking the monitor without Windows or NVDA.
+class FakeClipboardBackend:
+	def __init__(self, text=None, formats=None):
+		self._text = text
+		self._formats = dict(formats or {})
+		self._sequence = 0
+		self.sequenceReads = 0
+		self.textReads = 0
+		self.formatReads = 0
+
+	def setText(self, text):
+		self.setData(text)
+
+	def setData(self, text=None, formats=None):
+		# formats maps format names from clipboardFormats to payload bytes.
+		self._text = text
+		self._formats = dict(formats or {})
+		self._sequence += 1
+
+	def getSequenceNumber(self):
+		self.sequenceReads += 1
+		return self._sequence
+
+	def getText(self):
+		self.textReads += 1
+		return self._text or ""
+
+	def getFormats(self, images=True):
+		self.formatReads += 1
+		return {name: payload for name, payload in self._formats.items() if images or name != FORMAT_IMAGE}
+
+
+class ClipboardMonitor:
+	def __init__(self, backend, onChange):
+		self._backend = backend
+		self._onChange = onChange
+		self._lastSequence = None
+		self._lastDigest = None
+		self._seenText = False
+
+	def poll(self):
+		# Calls onChange(text, initial, formats) when the clipboard changed since the last poll.
+		# formats maps the rich formats present to their payloads; text is empty if there was none.
+		try:
+			sequence = self._backend.getSequenceNumber()
+		except Exception:
+			# Without a counter we fall back to comparing digests on every poll.
+			sequence = None
+		if sequence is not None and sequence == self._lastSequence:
+			return False
+		try:
+			text = self._backend.getText()
+			formats = self._backend.getFormats(images=not text)
+		except Exception:
+			return False
+		self._lastSequence = sequence
+		if text:
+			digest = textDigest(text)
+		elif formats:
+			digest = formatsDigest(formats)
+		else:
+			return False
+		if digest == self._lastDigest:
+			return False
+		self._lastDigest = digest
+		initial = not self._seenText
+		self._seenText = True
+		self._onChange(text or "", initial, formats)
+		return True
+
+	def noteWritten(self, text, digest=None):
+		# Text the add-on put on the clipboard itself must not come back as a new copy.
+		# Callers that already know the digest of text can pass it to skip hashing.
+		if not text:
+			digest = None
+		elif digest is None:
+			digest = textDigest(text)
+		self._lastDigest = digest
+		self._seenText = True
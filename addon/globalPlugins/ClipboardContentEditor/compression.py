@@ -0,0 +1,88 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Transparent compression for large texts held in memory.
+# Text above a threshold is kept as zlib-compressed UTF-8 and only expanded
+# when something needs the characters. A Python str can take up to four bytes
+# per character once it holds a single non-Latin-1 character, while typical
+# logs, code and prose compress to a fraction of their UTF-8 size.
+# TextPacker picks the representation for a text: huge payloads go to spill
+# files, large ones are compressed and the rest stay plain str.
+
+import sys
+import zlib
+
+from .spill import spillText
+
+# Level 1 compresses a few hundred MB/s; higher levels gain little on text.
+COMPRESSION_LEVEL = 1
+
+# Texts whose compressed form is not at least this much smaller than the str are kept as they are.
+_MIN_SAVING_RATIO = 0.9
+
+
+class CompressedText:
+	__slots__ = ("data", "length")
+
+	def __init__(self, data, length):
+		self.data = data
+		# Length of the original text in characters.
+		self.length = length
+
+	def __len__(self):
+		return self.length
+
+	@property
+	def memorySize(self):
+		return sys.getsizeof(self.data) + sys.getsizeof(self)
+
+	def read(self):
+		return zlib.decompress(self.data).decode("utf-8", "surrogatepass")
+
+	def iterChunks(self, chunkSize=1024 * 1024):
+		text = self.read()
+		for start in range(0, len(text), chunkSize):
+			yield text[start:start + chunkSize]
+
+
+def packText(text, threshold):
+	# Returns text itself or a CompressedText, whichever is worth keeping.
+	if not threshold or text is None or len(text) < threshold:
+		return text
+	raw = text.encode("utf-8", "surrogatepass")
+	data = zlib.compress(raw, COMPRESSION_LEVEL)
+	if len(data) > sys.getsizeof(text) * _MIN_SAVING_RATIO:
+		return text
+	return CompressedText(data, len(text))
+
+
+def unpackText(value):
+	# Accepts a str, CompressedText or SpilledText.
+	if value is None or isinstance(value, str):
+		return value
+	return value.read()
+
+
+def packedSize(value):
+	if value is None:
+		return 0
+	if isinstance(value, str):
+		return sys.getsizeof(value)
+	return value.memorySize
+
+
+class TextPacker:
+	def __init__(self):
+		# Thresholds in characters; 0 disables that representation.
+		self.compressThreshold = 0
+		self.spillThreshold = 0
+		self.spillDirectory = None
+
+	def pack(self, text):
+		if text and self.spillThreshold and self.spillDirectory and len(text) >= self.spillThreshold:
+			try:
+				return spillText(self.spillDirectory, text)
+			except (OSError, ValueError):
+				pass
+		return packText(text, self.compressThreshold)
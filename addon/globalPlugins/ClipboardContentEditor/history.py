@@ -0,0 +1,567 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Ordered, deduplicating clipboard history.
+# Entries are looked up by a digest of their text, and their order is kept
+# as increasing sequence numbers in a Fenwick tree, so adding, moving to the
+# front, deleting by position and evicting the oldest items never compares
+# item texts and costs at most O(log n).
+# When a store is attached every change is forwarded to it, and bodies of
+# older entries that the store has written are dropped from memory and read
+# back on demand. An attached search index is kept in step the same way.
+# A memory budget is enforced with GreedyDual-Size eviction: large items and
+# items not used for a while go first, pinned items never. The eviction heap
+# refers to entries weakly, so it never keeps a removed entry's body alive.
+# Bodies above the compression threshold are held compressed and expanded
+# only when read, and huge ones live in spill files; the index and store then
+# read the packed body themselves so the captured string can be freed.
+# An append-mode session is one entry whose body is the session's segment
+# list. It is re-keyed as segments arrive and only packed and written to the
+# store once the session finishes.
+# Rich formats captured with an entry (HTML, RTF, file lists) are held in a
+# shared PayloadStore by content hash. A capture without text is keyed by
+# its formats and its body is a FormatText, converted only when read. Under
+# memory pressure an entry the store holds gives up its formats with its body.
+# A copied image has no text; its entry records the image's dimensions and
+# lives for the session only, as the store keeps nothing but text.
+
+import heapq
+import re
+import time
+import weakref
+
+from .appendSession import AppendSession
+from .clipboardFormats import (
+	FORMAT_IMAGE,
+	RICH_FORMATS,
+	TEXT_FORMATS,
+	FormatText,
+	PayloadStore,
+	formatsDigest,
+	imageInfo,
+	readPayload,
+)
+from .clipboardMonitor import textDigest
+from .compression import TextPacker, packedSize, unpackText
+
+# Whitespace and C0/C1 control characters.
+_COLLAPSIBLE_RUN_RE = re.compile(r"[\s\x00-\x1f\x7f-\x9f]+")
+
+
+def makePreview(text, length=80, collapseWhitespace=True):
+	# Single-line preview built from the start of text only, however long text is.
+	if collapseWhitespace:
+		# Collapsing can shrink the window a lot, so look further than length.
+		window = text[:length * 4 + 16]
+		preview = _COLLAPSIBLE_RUN_RE.sub(" ", window).strip()
+	else:
+		window = text[:length]
+		preview = window.replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
+	if len(preview) > length or len(window) < len(text):
+		return preview[:length] + "..."
+	return preview
+
+
+def utf8Length(text):
+	if text.isascii():
+		return len(text)
+	return len(text.encode("utf-8", "surrogatepass"))
+
+
+class HistoryEntry:
+	__slots__ = (
+		"key", "_text", "preview", "timestamp", "size", "pinned",
+		"location", "_store", "_seq", "_charged", "_priority", "formats", "image", "__weakref__",
+	)
+
+	def __init__(self, key, text, timestamp=None, preview=None, size=None):
+		self.key = key
+		self._text = text
+		self.preview = preview
+		self.timestamp = time.time() if timestamp is None else timestamp
+		# Encoded size of the text, known even when the body is not in memory.
+		self.size = utf8Length(text) if size is None else size
+		self.pinned = False
+		# (offset, length) of the body in the store, set once it has been written.
+		self.location = None
+		self._store = None
+		self._seq = 0
+		# Bytes this entry currently counts for in the history's memory usage.
+		self._charged = 0
+		self._priority = 0.0
+		# {format name: payload digest} of the rich formats captured with the entry, or None.
+		self.formats = None
+		# ImageInfo of a copied image, read from it once at capture, or None.
+		self.image = None
+
+	@property
+	def text(self):
+		text = self._text
+		if text is None and self._store is not None:
+			return self._store.readText(self)
+		return unpackText(text)
+
+	@property
+	def packedText(self):
+		# The body as held in memory: a str, CompressedText, SpilledText, FormatText, AppendSession or None.
+		return self._text
+
+	@property
+	def isSession(self):
+		return isinstance(self._text, AppendSession)
+
+	@property
+	def isResident(self):
+		return self._text is not None
+
+	@property
+	def residentSize(self):
+		return packedSize(self._text)
+
+	def getPreview(self):
+		# Entries saved without a preview get one built from their body the first time.
+		if self.preview is None:
+			self.preview = makePreview(self.text or "")
+		return self.preview
+
+	def release(self):
+		if self.location is not None and self._store is not None:
+			self._text = None
+
+
+class ClipboardHistory:
+	_MIN_CAPACITY = 16
+
+	def __init__(self, residentCount=25, index=None):
+		self._byKey = {}
+		self._store = None
+		self._index = index
+		# Only this many of the newest entries keep their body in memory while a store is attached.
+		self.residentCount = residentCount
+		self.previewLength = 80
+		self.collapseWhitespace = True
+		# Decides how bodies are held: plain, compressed or spilled to disk.
+		self.packer = TextPacker()
+		# Payloads of the rich formats of all entries, each held once.
+		self.payloads = PayloadStore()
+		self._residentBytes = 0
+		# GreedyDual-Size state: a min-heap of (priority, tie breaker, weak reference to the entry) and the inflation value.
+		self._evictionHeap = []
+		self._evictionCounter = 0
+		self._inflation = 0.0
+		self._resetSlots(self._MIN_CAPACITY)
+
+	def _resetSlots(self, capacity):
+		self._capacity = capacity
+		self._slots = [None] * (capacity + 1)
+		self._tree = [0] * (capacity + 1)
+		self._nextSeq = 1
+		self._topBit = 1
+		while self._topBit * 2 <= capacity:
+			self._topBit *= 2
+
+	def _treeAdd(self, seq, delta):
+		tree = self._tree
+		capacity = self._capacity
+		while seq <= capacity:
+			tree[seq] += delta
+			seq += seq & -seq
+
+	def _treePrefix(self, seq):
+		tree = self._tree
+		total = 0
+		while seq > 0:
+			total += tree[seq]
+			seq -= seq & -seq
+		return total
+
+	def _treeFind(self, rank):
+		# Smallest sequence number whose prefix count reaches rank (1-based).
+		tree = self._tree
+		seq = 0
+		step = self._topBit
+		while step:
+			nextSeq = seq + step
+			if nextSeq <= self._capacity and tree[nextSeq] < rank:
+				seq = nextSeq
+				rank -= tree[nextSeq]
+			step //= 2
+		return seq + 1
+
+	def _compact(self):
+		live = [entry for entry in self._slots if entry is not None]
+		self._resetSlots(max(self._MIN_CAPACITY, 2 * len(live)))
+		for entry in live:
+			self._place(entry)
+
+	def _place(self, entry):
+		if self._nextSeq > self._capacity:
+			self._compact()
+		seq = self._nextSeq
+		self._nextSeq += 1
+		entry._seq = seq
+		self._slots[seq] = entry
+		self._treeAdd(seq, 1)
+
+	def _unplace(self, entry):
+		self._slots[entry._seq] = None
+		self._treeAdd(entry._seq, -1)
+		entry._seq = 0
+
+	def __len__(self):
+		return len(self._byKey)
+
+	def __bool__(self):
+		return bool(self._byKey)
+
+	def __contains__(self, text):
+		return textDigest(text) in self._byKey
+
+	def __iter__(self):
+		# Newest first.
+		for seq in range(self._nextSeq - 1, 0, -1):
+			entry = self._slots[seq]
+			if entry is not None:
+				yield entry
+
+	def __getitem__(self, index):
+		count = len(self._byKey)
+		if index < 0:
+			index += count
+		if not 0 <= index < count:
+			raise IndexError("history index out of range")
+		return self._slots[self._treeFind(count - index)]
+
+	def __delitem__(self, index):
+		self.removeEntry(self[index])
+
+	@property
+	def memoryUsage(self):
+		return self._residentBytes + self.payloads.size
+
+	def _charge(self, entry):
+		size = entry.residentSize
+		self._residentBytes += size - entry._charged
+		entry._charged = size
+
+	def _touchPriority(self, entry):
+		# GreedyDual-Size with equal costs: recently used and small entries score higher.
+		entry._priority = self._inflation + 1.0 / max(entry.size, 1)
+		if not entry._charged:
+			return
+		self._evictionCounter += 1
+		heapq.heappush(self._evictionHeap, (entry._priority, self._evictionCounter, weakref.ref(entry)))
+		if len(self._evictionHeap) > 2 * len(self._byKey) + 64:
+			self._rebuildEvictionHeap()
+
+	def _rebuildEvictionHeap(self):
+		heap = []
+		for entry in self._byKey.values():
+			if entry._charged:
+				self._evictionCounter += 1
+				heap.append((entry._priority, self._evictionCounter, weakref.ref(entry)))
+		heapq.heapify(heap)
+		self._evictionHeap = heap
+
+	def evictToBudget(self, budget):
+		# Frees memory until usage fits budget. Entries the store holds only lose
+		# their in-memory body; others are removed and returned.
+		removed = []
+		skipped = []
+		front = self[0] if self._byKey else None
+		heap = self._evictionHeap
+		while self.memoryUsage > budget and heap:
+			item = heapq.heappop(heap)
+			priority, counter, ref = item
+			entry = ref()
+			if entry is None or entry._seq == 0 or entry._priority != priority or not entry._charged:
+				continue
+			if entry.pinned or entry is front or entry.isSession:
+				skipped.append(item)
+				continue
+			self._inflation = priority
+			if entry.location is not None and self._store is not None:
+				entry.release()
+				self._setFormats(entry, None)
+				self._charge(entry)
+			else:
+				self.removeEntry(entry)
+				removed.append(entry)
+		for item in skipped:
+			heapq.heappush(heap, item)
+		return removed
+
+	def setPinned(self, entry, pinned):
+		entry.pinned = pinned
+		if self._stores(entry):
+			self._store.recordPin(entry)
+
+	def get(self, text):
+		return self._byKey.get(textDigest(text))
+
+	def entryForKey(self, key):
+		return self._byKey.get(key)
+
+	def _stores(self, entry):
+		# Whether entry is kept in the attached store; images are not.
+		return self._store is not None and entry.image is None
+
+	def formatsOf(self, entry):
+		# Returns {format name: payload} for the rich formats kept with entry.
+		if not entry.formats:
+			return {}
+		formats = {}
+		for name, digest in entry.formats.items():
+			payload = readPayload(self.payloads.get(digest))
+			if payload is not None:
+				formats[name] = payload
+		return formats
+
+	def _storeFormats(self, formats):
+		# Returns the digests of the rich formats among formats, adding their payloads.
+		# An image this add-on cannot read is left out.
+		if not formats:
+			return None
+		digests = {}
+		for name in RICH_FORMATS:
+			payload = formats.get(name)
+			if not payload or (name == FORMAT_IMAGE and imageInfo(payload) is None):
+				continue
+			digests[name] = self.payloads.add(payload)
+		return digests or None
+
+	def _setFormats(self, entry, digests):
+		if entry.formats:
+			for digest in entry.formats.values():
+				self.payloads.release(digest)
+		entry.formats = digests
+
+	def attachStore(self, store, entries=()):
+		# entries are the ones the store loaded, newest first; they go behind anything already captured.
+		current = list(self)
+		current.reverse()
+		self._store = store
+		for entry in reversed(entries):
+			if entry.key in self._byKey:
+				continue
+			entry._store = store
+			entry._text = self.packer.pack(entry._text)
+			self._byKey[entry.key] = entry
+			self._place(entry)
+			self._charge(entry)
+			self._touchPriority(entry)
+			if self._index is not None:
+				self._index.add(entry.key, lambda entry=entry: entry.text)
+		for entry in current:
+			self._unplace(entry)
+			self._place(entry)
+			if not self._stores(entry):
+				continue
+			entry._store = store
+			if not entry.isSession:
+				store.recordAdd(entry, entry._text)
+		self._releaseOverflow()
+
+	def detachStore(self):
+		# Pulls every body back into memory so nothing depends on the store any more.
+		for entry in self:
+			if entry._text is None:
+				entry._text = self.packer.pack(entry.text)
+			entry._store = None
+			entry.location = None
+			self._charge(entry)
+			self._touchPriority(entry)
+		self._store = None
+
+	def indexOf(self, entry):
+		return len(self._byKey) - self._treePrefix(entry._seq)
+
+	def add(self, text, timestamp=None, formats=None):
+		# Returns the entry for text, moved to the front if it was already present.
+		# timestamp, if given, is the time a new entry was captured. formats, if given, are
+		# the payloads captured with text and replace those the entry had.
+		key = textDigest(text)
+		entry = self._byKey.get(key)
+		if entry is not None:
+			if entry._text is None:
+				entry._text = self.packer.pack(text)
+				self._charge(entry)
+			if formats is not None:
+				self._setFormats(entry, self._storeFormats(formats))
+			self.moveToFront(entry)
+			self._releaseOverflow()
+			return entry
+		entry = HistoryEntry(key, text, timestamp, makePreview(text, self.previewLength, self.collapseWhitespace))
+		entry._text = self.packer.pack(text)
+		entry.formats = self._storeFormats(formats)
+		self._insert(entry)
+		return entry
+
+	def addFormats(self, formats, timestamp=None):
+		# Adds a capture that had rich formats but no text; its text is converted from them when read.
+		# A capture with an image is an image entry, which has no text.
+		digests = self._storeFormats(formats)
+		if digests is None:
+			return None
+		key = formatsDigest(formats)
+		entry = self._byKey.get(key)
+		if entry is not None:
+			if entry.formats is None:
+				# They were dropped under memory pressure.
+				entry.formats = digests
+			else:
+				for digest in digests.values():
+					self.payloads.release(digest)
+			self.moveToFront(entry)
+			self._releaseOverflow()
+			return entry
+		size = sum(len(self.payloads.get(digest)) for digest in digests.values())
+		if FORMAT_IMAGE in digests:
+			entry = HistoryEntry(key, "", timestamp, preview="", size=size)
+			entry.image = imageInfo(formats[FORMAT_IMAGE])
+		else:
+			name = next(name for name in TEXT_FORMATS if name in digests)
+			entry = HistoryEntry(key, FormatText(name, self.payloads.get(digests[name])), timestamp, size=size)
+		entry.formats = digests
+		self._insert(entry)
+		return entry
+
+	def _insert(self, entry):
+		self._byKey[entry.key] = entry
+		self._place(entry)
+		self._charge(entry)
+		self._touchPriority(entry)
+		if self._index is not None:
+			self._index.add(entry.key, entry._text)
+		if self._stores(entry):
+			entry._store = self._store
+			self._store.recordAdd(entry, entry._text)
+			self._releaseOverflow()
+
+	def importEntry(self, text, timestamp=None, pinned=False):
+		# Adds an archived entry at the front with its own time; one already present stays where it is.
+		# A pin carries over either way. Returns whether the text was new.
+		entry = self._byKey.get(textDigest(text))
+		added = entry is None
+		if added:
+			entry = self.add(text, timestamp)
+		if pinned and not entry.pinned:
+			self.setPinned(entry, True)
+		return added
+
+	def _sessionPreview(self, session):
+		# makePreview looks at most length * 4 + 16 characters; one more tells it whether the text goes on.
+		prefix = session.readPrefix(self.previewLength * 4 + 17)
+		return makePreview(prefix, self.previewLength, self.collapseWhitespace)
+
+	def addSession(self, session):
+		# Adds an append session as a new front entry sharing the session's segments.
+		key = session.digest
+		existing = self._byKey.get(key)
+		if existing is not None:
+			self.removeEntry(existing)
+		entry = HistoryEntry(key, session, preview=self._sessionPreview(session), size=session.byteLength)
+		self._byKey[key] = entry
+		self._place(entry)
+		self._charge(entry)
+		self._touchPriority(entry)
+		if self._index is not None:
+			self._index.add(key, session.read())
+		return entry
+
+	def extendSession(self, entry, text):
+		# Call after text was appended to the entry's session; returns the entry now holding it.
+		session = entry._text
+		if self._byKey.get(entry.key) is not entry:
+			# The entry was deleted or evicted meanwhile.
+			return self.addSession(session)
+		oldKey = entry.key
+		newKey = session.digest
+		other = self._byKey.get(newKey)
+		if other is not None and other is not entry:
+			self.removeEntry(other)
+		del self._byKey[oldKey]
+		entry.key = newKey
+		self._byKey[newKey] = entry
+		entry.size = session.byteLength
+		entry.preview = self._sessionPreview(session)
+		entry.timestamp = time.time()
+		self._charge(entry)
+		self._touchPriority(entry)
+		if entry._seq != self._nextSeq - 1:
+			self._unplace(entry)
+			self._place(entry)
+		if self._index is not None:
+			self._index.extend(oldKey, newKey, text)
+		return entry
+
+	def finishSession(self, entry):
+		# Turns the session body into a regular one and hands it to the store.
+		if not entry.isSession:
+			return
+		entry._text = self.packer.pack(entry._text.read())
+		if self._byKey.get(entry.key) is not entry:
+			return
+		self._charge(entry)
+		self._touchPriority(entry)
+		if self._store is not None:
+			entry._store = self._store
+			self._store.recordAdd(entry, entry._text)
+			self._releaseOverflow()
+
+	def _releaseOverflow(self):
+		# Each capture pushes at most one entry out of the resident window.
+		if self._store is not None and len(self._byKey) > self.residentCount:
+			entry = self[self.residentCount]
+			entry.release()
+			self._charge(entry)
+
+	def moveToFront(self, entry):
+		entry.timestamp = time.time()
+		self._touchPriority(entry)
+		if self._stores(entry):
+			self._store.recordTouch(entry)
+		if entry._seq == self._nextSeq - 1:
+			return
+		self._unplace(entry)
+		self._place(entry)
+
+	def removeEntry(self, entry):
+		if self._byKey.get(entry.key) is not entry:
+			return
+		del self._byKey[entry.key]
+		self._unplace(entry)
+		self._residentBytes -= entry._charged
+		entry._charged = 0
+		self._setFormats(entry, None)
+		if self._index is not None:
+			self._index.remove(entry.key)
+		if self._stores(entry):
+			self._store.recordRemove(entry)
+
+	def truncate(self, limit):
+		# Evicts the oldest unpinned entries until at most limit remain; returns the evicted entries.
+		evicted = []
+		rank = 1
+		while len(self._byKey) > limit and rank <= len(self._byKey):
+			entry = self._slots[self._treeFind(rank)]
+			if entry.pinned:
+				rank += 1
+				continue
+			self.removeEntry(entry)
+			evicted.append(entry)
+		return evicted
+
+	def clear(self):
+		for entry in self._byKey.values():
+			entry.formats = None
+		self._byKey.clear()
+		self._resetSlots(self._MIN_CAPACITY)
+		self._residentBytes = 0
+		self.payloads.clear()
+		self._evictionHeap = []
+		if self._index is not None:
+			self._index.clear()
+		if self._store is not None:
+			self._store.recordClear()
@@ -0,0 +1,77 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# History archives for moving the history between machines.
+# An archive is a JSON Lines file: a header line naming the format, then one
+# line per entry holding its text, time and pin, oldest first, so importing
+# the entries in order rebuilds the same order. Both directions work one
+# entry at a time through generators, which the caller can run in batches,
+# and an export only replaces its target once it is complete.
+
+import json
+import os
+
+ARCHIVE_FORMAT = "ClipboardContentEditor history"
+ARCHIVE_VERSION = 1
+
+
+class ArchiveError(ValueError):
+	pass
+
+
+def _encodeLine(record):
+	# Line breaks in the text are escaped, so each record stays on one line.
+	return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def exportEntries(path, entries):
+	# Writes the entries, oldest first, and yields the size of each once it is written.
+	temporaryPath = path + ".tmp"
+	try:
+		with open(temporaryPath, "w", encoding="utf-8", errors="surrogatepass", newline="\n") as handle:
+			handle.write(_encodeLine({"format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION}))
+			for entry in entries:
+				text = entry.text
+				if not text:
+					# Nothing to move for entries without text, such as images.
+					continue
+				handle.write(_encodeLine({"text": text, "timestamp": entry.timestamp, "pinned": entry.pinned}))
+				yield entry.size
+			handle.flush()
+			os.fsync(handle.fileno())
+		os.replace(temporaryPath, path)
+	except BaseException:
+		# Also reached when the generator is closed before it finishes.
+		try:
+			os.remove(temporaryPath)
+		except OSError:
+			pass
+		raise
+
+
+def readArchive(path):
+	# Yields (text, timestamp, pinned) for each entry, oldest first; damaged lines are skipped.
+	# Raises ArchiveError if the file is not an archive, or is one from a newer version.
+	# Lines are decoded one at a time, so bytes that are not UTF-8 only cost the line holding them.
+	with open(path, "rb") as handle:
+		try:
+			header = json.loads(handle.readline().decode("utf-8", "surrogatepass"))
+		except ValueError:
+			header = None
+		if not isinstance(header, dict) or header.get("format") != ARCHIVE_FORMAT:
+			raise ArchiveError(path)
+		version = header.get("version")
+		if not isinstance(version, int) or version > ARCHIVE_VERSION:
+			raise ArchiveError(path)
+		for line in handle:
+			try:
+				record = json.loads(line.decode("utf-8", "surrogatepass"))
+			except ValueError:
+				continue
+			if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+				continue
+			timestamp = record.get("timestamp")
+			if not isinstance(timestamp, (int, float)) or isinstance(timestamp, bool):
+				timestamp = None
+			yield record["text"], timestamp, record.get("pinned") is True
@@ -0,0 +1,302 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# On-disk clipboard history.
+# The history is kept as an append-only log of records: add (with the body),
+# touch (moved to the front), pin, remove and clear. Loading only scans record
+# headers to rebuild an offset index, so bodies are read when something asks
+# for them. All writes happen on a background thread; the log is rewritten
+# without dead records once they outweigh the live ones.
+
+import collections
+import json
+import os
+import queue
+import struct
+import threading
+
+from .compression import unpackText
+from .history import HistoryEntry
+
+FILE_MAGIC = b"CCEHIST1"
+
+OP_ADD = 1
+OP_TOUCH = 2
+OP_REMOVE = 3
+OP_CLEAR = 4
+OP_PIN = 5
+
+# op, timestamp, key, meta length, body length; meta is a JSON object such as the preview.
+_HEADER = struct.Struct("<Bd16sII")
+
+_COMPACT_MIN_DEAD_BYTES = 4 * 1024 * 1024
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _encodeText(text):
+	return text.encode("utf-8", "surrogatepass")
+
+
+def _encodeBody(value):
+	# Returns the body as a sequence of byte chunks and its length.
+	# Spilled bodies are copied from their mapping without building the string.
+	if hasattr(value, "iterBytes"):
+		return value.iterBytes(_COPY_CHUNK_SIZE), value.byteLength
+	data = _encodeText(unpackText(value))
+	return (data,), len(data)
+
+
+def _decodeText(data):
+	return data.decode("utf-8", "surrogatepass")
+
+
+def _decodeMeta(data):
+	if not data:
+		return {}
+	try:
+		return json.loads(data.decode("utf-8"))
+	except ValueError:
+		return {}
+
+
+class _LiveRecord:
+	__slots__ = ("entry", "timestamp", "start", "size", "meta", "bodyOffset", "bodyLength")
+
+	def __init__(self, timestamp, start, size, meta, bodyOffset, bodyLength):
+		self.entry = None
+		self.timestamp = timestamp
+		self.start = start
+		self.size = size
+		self.meta = meta
+		self.bodyOffset = bodyOffset
+		self.bodyLength = bodyLength
+
+
+class HistoryStore:
+	def __init__(self, path):
+		self.path = path
+		# Held while reading bodies so compaction can swap the file safely.
+		self._lock = threading.Lock()
+		self._queue = queue.Queue()
+		self._thread = None
+		# Owned by the writer thread once it has started; oldest first.
+		self._live = collections.OrderedDict()
+		self._liveBytes = 0
+		self._deadBytes = 0
+
+	def load(self, residentCount):
+		# Rebuilds the offset index and returns the stored entries, newest first.
+		# Only the newest residentCount bodies are read now.
+		try:
+			handle = open(self.path, "rb")
+		except FileNotFoundError:
+			return []
+		goodEnd = 0
+		with handle:
+			fileSize = os.fstat(handle.fileno()).st_size
+			if not fileSize:
+				return []
+			if handle.read(len(FILE_MAGIC)) != FILE_MAGIC:
+				handle.close()
+				os.replace(self.path, self.path + ".bad")
+				return []
+			goodEnd = handle.tell()
+			while True:
+				start = handle.tell()
+				header = handle.read(_HEADER.size)
+				if len(header) < _HEADER.size:
+					break
+				op, timestamp, key, metaLength, bodyLength = _HEADER.unpack(header)
+				meta = handle.read(metaLength)
+				bodyOffset = handle.tell()
+				end = bodyOffset + bodyLength
+				if len(meta) < metaLength or end > fileSize:
+					break
+				handle.seek(end)
+				goodEnd = end
+				self._applyRecord(op, timestamp, key, meta, start, end - start, bodyOffset, bodyLength)
+			entries = []
+			for key, record in reversed(self._live.items()):
+				meta = _decodeMeta(record.meta)
+				entry = HistoryEntry(key, None, record.timestamp, meta.get("preview"), record.bodyLength)
+				entry.pinned = bool(meta.get("pinned", False))
+				entry.location = (record.bodyOffset, record.bodyLength)
+				entry._store = self
+				if len(entries) < residentCount:
+					handle.seek(record.bodyOffset)
+					entry._text = _decodeText(handle.read(record.bodyLength))
+				record.entry = entry
+				entries.append(entry)
+		if goodEnd < fileSize:
+			# A crash cut the last record short; drop it so new records line up.
+			with open(self.path, "r+b") as handle:
+				handle.truncate(goodEnd)
+		return entries
+
+	def _applyRecord(self, op, timestamp, key, meta, start, size, bodyOffset, bodyLength):
+		live = self._live
+		if op == OP_ADD:
+			old = live.pop(key, None)
+			if old is not None:
+				self._liveBytes -= old.size
+				self._deadBytes += old.size
+			record = _LiveRecord(timestamp, start, size, meta, bodyOffset, bodyLength)
+			live[key] = record
+			self._liveBytes += size
+			return record
+		self._deadBytes += size
+		if op == OP_TOUCH:
+			record = live.get(key)
+			if record is not None:
+				record.timestamp = timestamp
+				live.move_to_end(key)
+		elif op == OP_PIN:
+			record = live.get(key)
+			if record is not None:
+				recordMeta = _decodeMeta(record.meta)
+				recordMeta.update(_decodeMeta(meta))
+				record.meta = json.dumps(recordMeta).encode("utf-8")
+		elif op == OP_REMOVE:
+			record = live.pop(key, None)
+			if record is not None:
+				self._liveBytes -= record.size
+				self._deadBytes += record.size
+		elif op == OP_CLEAR:
+			self._deadBytes += self._liveBytes
+			self._liveBytes = 0
+			live.clear()
+		return None
+
+	def start(self):
+		self._thread = threading.Thread(target=self._run, name="ClipboardContentEditor history store", daemon=True)
+		self._thread.start()
+
+	def close(self):
+		if self._thread is None:
+			return
+		self._queue.put(None)
+		self._thread.join()
+		self._thread = None
+
+	def recordAdd(self, entry, text):
+		self._queue.put((OP_ADD, entry, text))
+
+	def recordTouch(self, entry):
+		self._queue.put((OP_TOUCH, entry, None))
+
+	def recordPin(self, entry):
+		self._queue.put((OP_PIN, entry, None))
+
+	def recordRemove(self, entry):
+		self._queue.put((OP_REMOVE, entry, None))
+
+	def recordClear(self):
+		self._queue.put((OP_CLEAR, None, None))
+
+	def readText(self, entry):
+		with self._lock:
+			location = entry.location
+			if location is None:
+				return None
+			offset, length = location
+			with open(self.path, "rb") as handle:
+				handle.seek(offset)
+				return _decodeText(handle.read(length))
+
+	def _run(self):
+		handle = self._maybeCompact(self._openForAppend())
+		try:
+			while True:
+				item = self._queue.get()
+				if item is None:
+					break
+				try:
+					self._write(handle, *item)
+				except OSError:
+					continue
+				finally:
+					# Do not keep the last entry and its body alive while waiting.
+					del item
+				if self._queue.empty():
+					handle = self._maybeCompact(handle)
+		finally:
+			handle.close()
+
+	def _maybeCompact(self, handle):
+		if self._deadBytes <= max(self._liveBytes, _COMPACT_MIN_DEAD_BYTES):
+			return handle
+		handle.close()
+		try:
+			self._compact()
+		except OSError:
+			try:
+				os.remove(self.path + ".tmp")
+			except OSError:
+				pass
+		return self._openForAppend()
+
+	def _openForAppend(self):
+		handle = open(self.path, "ab")
+		if handle.tell() == 0:
+			handle.write(FILE_MAGIC)
+			handle.flush()
+		return handle
+
+	def _write(self, handle, op, entry, text):
+		if op == OP_CLEAR:
+			key = bytes(16)
+			timestamp = 0.0
+		else:
+			key = entry.key
+			timestamp = entry.timestamp
+		body = ()
+		bodyLength = 0
+		meta = b""
+		if op == OP_ADD:
+			body, bodyLength = _encodeBody(text)
+			meta = json.dumps({"preview": entry.preview, "pinned": entry.pinned}).encode("utf-8")
+		elif op == OP_PIN:
+			meta = json.dumps({"pinned": entry.pinned}).encode("utf-8")
+		start = handle.tell()
+		handle.write(_HEADER.pack(op, timestamp, key, len(meta), bodyLength))
+		handle.write(meta)
+		bodyOffset = handle.tell()
+		for chunk in body:
+			handle.write(chunk)
+		handle.flush()
+		record = self._applyRecord(op, timestamp, key, meta, start, handle.tell() - start, bodyOffset, bodyLength)
+		if record is not None:
+			record.entry = entry
+			entry.location = (bodyOffset, bodyLength)
+
+	def _compact(self):
+		tempPath = self.path + ".tmp"
+		moved = []
+		with open(self.path, "rb") as source, open(tempPath, "wb") as target:
+			target.write(FILE_MAGIC)
+			for key, record in self._live.items():
+				start = target.tell()
+				target.write(_HEADER.pack(OP_ADD, record.timestamp, key, len(record.meta), record.bodyLength))
+				target.write(record.meta)
+				bodyOffset = target.tell()
+				source.seek(record.bodyOffset)
+				remaining = record.bodyLength
+				while remaining:
+					chunk = source.read(min(remaining, _COPY_CHUNK_SIZE))
+					if not chunk:
+						raise OSError("history log is shorter than its index")
+					target.write(chunk)
+					remaining -= len(chunk)
+				moved.append((record, start, target.tell() - start, bodyOffset))
+		with self._lock:
+			os.replace(tempPath, self.path)
+			self._liveBytes = 0
+			for record, start, size, bodyOffset in moved:
+				record.start = start
+				record.size = size
+				record.bodyOffset = bodyOffset
+				self._liveBytes += size
+				if record.entry is not None:
+					record.entry.location = (bodyOffset, record.bodyLength)
+			self._deadBytes = 0
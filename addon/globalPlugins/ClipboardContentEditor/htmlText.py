@@ -0,0 +1,121 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Markup to plain text.
+# The markup is fed to html.parser a chunk at a time and the text comes out
+# the way a browser lays it out: entities decoded, script and style dropped,
+# whitespace collapsed outside pre, block elements on lines of their own and
+# table cells separated by tabs. When the parser is holding back an
+# unfinished construct, such as a tag or comment that never closes, the next
+# chunk is at least as large as what it holds, and whatever is still held at
+# the end is flushed at once, so the work stays linear in the markup's length.
+
+import html
+import re
+from html.parser import HTMLParser
+
+HTML_CHUNK_SIZE = 64 * 1024
+
+# Elements whose content is not text.
+_SKIPPED_ELEMENTS = {"script", "style"}
+# Elements set apart by a blank line.
+_PARAGRAPH_ELEMENTS = {
+	"p", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "table", "ul", "ol", "dl", "hr",
+}
+# Elements that start on a line of their own.
+_BLOCK_ELEMENTS = _PARAGRAPH_ELEMENTS | {
+	"address", "article", "aside", "body", "caption", "dd", "details", "div", "dt", "fieldset",
+	"figcaption", "figure", "footer", "form", "header", "html", "li", "main", "nav", "section",
+	"summary", "tbody", "tfoot", "thead", "title", "tr",
+}
+_CELL_ELEMENTS = {"td", "th"}
+
+# Something html.parser would treat as markup: a tag, end tag, comment or declaration.
+_MARKUP_RE = re.compile(r"<[a-zA-Z/!?]")
+
+
+class _TextExtractor(HTMLParser):
+	def __init__(self):
+		super().__init__(convert_charrefs=True)
+		self.parts = []
+		self._skipDepth = 0
+		self._preDepth = 0
+		# Line breaks, or else the separator, owed before the next text.
+		self._breaks = 0
+		self._separator = ""
+		self._started = False
+
+	def _owe(self, tag, closing):
+		if tag == "br" and not closing:
+			self._breaks += 1
+		elif tag in _PARAGRAPH_ELEMENTS:
+			self._breaks = max(self._breaks, 2)
+		elif tag in _BLOCK_ELEMENTS:
+			self._breaks = max(self._breaks, 1)
+		elif tag in _CELL_ELEMENTS and not closing:
+			self._separator = "\t"
+
+	def handle_starttag(self, tag, attrs):
+		if tag in _SKIPPED_ELEMENTS:
+			self._skipDepth += 1
+			return
+		if tag == "pre":
+			self._preDepth += 1
+		self._owe(tag, False)
+
+	def handle_endtag(self, tag):
+		if tag in _SKIPPED_ELEMENTS:
+			self._skipDepth = max(self._skipDepth - 1, 0)
+			return
+		if tag == "pre":
+			self._preDepth = max(self._preDepth - 1, 0)
+		self._owe(tag, True)
+
+	def handle_data(self, data):
+		if self._skipDepth or not data:
+			return
+		if self._preDepth:
+			self._emit(data)
+			return
+		text = " ".join(data.split())
+		if data[0].isspace() and not self._separator:
+			self._separator = " "
+		if text:
+			self._emit(text)
+			if data[-1].isspace():
+				self._separator = " "
+
+	def _emit(self, text):
+		if self._started:
+			if self._breaks:
+				self.parts.append("\n" * self._breaks)
+			elif self._separator:
+				self.parts.append(self._separator)
+		self._breaks = 0
+		self._separator = ""
+		self._started = True
+		self.parts.append(text)
+
+
+def htmlToText(markup, progress=None, chunkSize=HTML_CHUNK_SIZE):
+	# progress, if given, is called with the fraction of the markup read so far.
+	if _MARKUP_RE.search(markup) is None:
+		# Plain text keeps its lines; only entities are decoded.
+		return html.unescape(markup)
+	parser = _TextExtractor()
+	position = 0
+	while position < len(markup):
+		end = position + max(chunkSize, len(parser.rawdata))
+		parser.feed(markup[position:end])
+		position = min(end, len(markup))
+		if progress is not None:
+			progress(position / len(markup))
+	# HTMLParser.close() would retry what is still held one tag at a time, rescanning to the end
+	# each time. It is a construct that never finished: an open comment or declaration swallows
+	# the rest of the markup, as in a browser; anything else is text.
+	leftover = parser.rawdata
+	parser.rawdata = ""
+	if not leftover.startswith("<!"):
+		parser.handle_data(html.unescape(leftover))
+	return "".join(parser.parts)
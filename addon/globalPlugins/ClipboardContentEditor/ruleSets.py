@@ -0,0 +1,108 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Saved sets of literal find => replace rules.
+# All rules of a set are applied together in one left-to-right pass over the
+# text: they are compiled once into a single alternation, longest find text
+# first, so at every position the longest matching rule wins and replaced
+# text is never scanned again. Rule sets are kept as JSON in the add-on's
+# configuration and edited as one "find => replace" rule per line.
+
+import functools
+import json
+import re
+
+from .backgroundJob import reportEvery
+
+RULE_SEPARATOR = "=>"
+
+# Escapes usable on both sides of a rule; fields are otherwise stripped.
+_ESCAPES = {"n": "\n", "t": "\t", "s": " ", "\\": "\\"}
+_ESCAPE_RE = re.compile(r"\\(.)")
+
+
+class RuleSyntaxError(ValueError):
+	def __init__(self, lineNumber):
+		super().__init__(lineNumber)
+		self.lineNumber = lineNumber
+
+
+def _unescape(text):
+	return _ESCAPE_RE.sub(lambda match: _ESCAPES.get(match.group(1), match.group(0)), text)
+
+
+def _escape(text):
+	text = text.replace("\\", "\\\\").replace("\n", "\\n").replace("\t", "\\t")
+	stripped = text.strip(" ")
+	if stripped == text:
+		return text
+	start = text.index(stripped) if stripped else len(text)
+	end = start + len(stripped)
+	return "\\s" * start + stripped + "\\s" * (len(text) - end)
+
+
+def parseRules(text):
+	# Returns (find, replace) pairs; blank lines and lines starting with # are skipped.
+	rules = []
+	for lineNumber, line in enumerate(text.splitlines(), 1):
+		if not line.strip() or line.lstrip().startswith("#"):
+			continue
+		find, separator, replace = line.partition(RULE_SEPARATOR)
+		find = _unescape(find.strip())
+		if not separator or not find:
+			raise RuleSyntaxError(lineNumber)
+		rules.append((find, _unescape(replace.strip())))
+	return rules
+
+
+def formatRules(rules):
+	return "\n".join("{} {} {}".format(_escape(find), RULE_SEPARATOR, _escape(replace)) for find, replace in rules)
+
+
+def loadRuleSets(data):
+	# Returns {name: [(find, replace), ...]} from the stored JSON, ignoring anything malformed.
+	try:
+		stored = json.loads(data) if data else {}
+	except ValueError:
+		return {}
+	if not isinstance(stored, dict):
+		return {}
+	ruleSets = {}
+	for name, rules in stored.items():
+		if not isinstance(rules, list):
+			continue
+		ruleSets[name] = [
+			(rule[0], rule[1]) for rule in rules
+			if isinstance(rule, list) and len(rule) == 2 and all(isinstance(field, str) for field in rule) and rule[0]
+		]
+	return ruleSets
+
+
+def dumpRuleSets(ruleSets):
+	# ASCII-only JSON stays on one line, which keeps the configuration file happy.
+	return json.dumps({name: [list(rule) for rule in rules] for name, rules in ruleSets.items()})
+
+
+class RuleReplacer:
+	def __init__(self, rules):
+		# A later rule with the same find text overrides an earlier one.
+		self._replacements = dict(rules)
+		finds = sorted(self._replacements, key=len, reverse=True)
+		self._pattern = re.compile("|".join(map(re.escape, finds))) if finds else None
+
+	def apply(self, text, progress=None):
+		# Returns the new text and the number of replacements; progress, if given, hears how far the matches have got.
+		if self._pattern is None:
+			return text, 0
+		replacements = self._replacements
+		replacement = lambda match: replacements[match.group()]
+		if progress is not None:
+			replacement = reportEvery(replacement, progress, lambda match: match.end() / len(text))
+		return self._pattern.subn(replacement, text)
+
+
+@functools.lru_cache(maxsize=16)
+def compileRules(rules):
+	# rules must be a tuple of (find, replace) pairs so it can key the cache.
+	return RuleReplacer(rules)
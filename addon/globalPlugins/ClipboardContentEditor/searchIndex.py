@@ -0,0 +1,286 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Full-text search over clipboard history.
+# An in-process inverted index maps every case-folded word to the entries
+# containing it and how often. Documents are tokenized on a background thread
+# so capturing a large item never stalls the clipboard timer, and queries are
+# answered from the postings alone, ranked with BM25. The last query word also
+# matches as a prefix so results narrow while the user types; a prefix stands
+# for at most the _PREFIX_TERM_LIMIT terms in the most entries, and a single
+# letter only matches itself, so a short prefix cannot fan out over the index.
+
+import collections
+import heapq
+import math
+import queue
+import re
+import threading
+from bisect import bisect_left
+
+_TOKEN_RE = re.compile(r"\w+")
+_NON_WORD_RE = re.compile(r"\W")
+# Everything up to and including the last non-word character, matched from the start only.
+_THROUGH_LAST_NON_WORD_RE = re.compile(r".*\W", re.S)
+_TOKENIZE_CHUNK_SIZE = 1024 * 1024
+
+# BM25 tuning constants.
+_K1 = 1.2
+_B = 0.75
+
+DEFAULT_RESULT_LIMIT = 500
+_MIN_PREFIX_LENGTH = 2
+_PREFIX_TERM_LIMIT = 64
+
+
+def tokenize(text):
+	return _TOKEN_RE.findall(text.casefold())
+
+
+def _countTerms(text):
+	# Works through large texts in slices so the token list never covers the whole body.
+	if not isinstance(text, str):
+		return _countChunkTerms(text.iterChunks())
+	counts = collections.Counter()
+	length = len(text)
+	start = 0
+	while start < length:
+		end = start + _TOKENIZE_CHUNK_SIZE
+		if end < length:
+			# Extend to the end of the current word so it is not split in two.
+			match = _NON_WORD_RE.search(text, end)
+			end = match.start() if match else length
+		counts.update(tokenize(text[start:end]))
+		start = end
+	return counts
+
+
+def _countChunkTerms(chunks):
+	# Same as _countTerms for a body that is only available in pieces, such as a spill file.
+	counts = collections.Counter()
+	# Pieces of a trailing partial word, held back until a later piece completes it.
+	carry = []
+	for chunk in chunks:
+		match = _THROUGH_LAST_NON_WORD_RE.match(chunk)
+		if match is None:
+			carry.append(chunk)
+			continue
+		split = match.end()
+		carry.append(chunk[:split])
+		counts.update(tokenize("".join(carry)))
+		carry = [chunk[split:]]
+	counts.update(tokenize("".join(carry)))
+	return counts
+
+
+class SearchIndex:
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._postings = {}
+		# key -> (token count, distinct tokens)
+		self._documents = {}
+		self._totalLength = 0
+		# Sorted terms for prefix lookups, plus terms indexed since it was last sorted. Terms that
+		# lost their last document stay until they outnumber the live ones; _deadTerms counts them.
+		self._vocabulary = []
+		self._newTerms = set()
+		self._deadTerms = 0
+		self._queue = queue.Queue()
+		self._thread = None
+
+	def __len__(self):
+		return len(self._documents)
+
+	def start(self):
+		self._thread = threading.Thread(target=self._run, name="ClipboardContentEditor search index", daemon=True)
+		self._thread.start()
+
+	def close(self):
+		if self._thread is None:
+			return
+		self._queue.put(None)
+		self._thread.join()
+		self._thread = None
+
+	def add(self, key, source):
+		# source is the text or a callable returning it, called on the indexing thread.
+		self._queue.put((self._addDocument, key, source))
+
+	def extend(self, oldKey, newKey, text):
+		# Renames a document and adds the terms of text to it, for bodies that grow at the end.
+		self._queue.put((self._extendDocument, (oldKey, newKey), text))
+
+	def remove(self, key):
+		self._queue.put((self._removeDocument, key, None))
+
+	def clear(self):
+		self._queue.put((self._clearDocuments, None, None))
+
+	def waitIdle(self):
+		self._queue.join()
+
+	def _run(self):
+		while True:
+			item = self._queue.get()
+			try:
+				if item is None:
+					break
+				func, key, source = item
+				try:
+					func(key, source)
+				except Exception:
+					pass
+				# Do not keep the last body alive while waiting.
+				item = source = None
+			finally:
+				self._queue.task_done()
+
+	def _addDocument(self, key, source):
+		# source may also be a packed body (CompressedText or SpilledText).
+		text = source() if callable(source) else source
+		if text is None:
+			return
+		counts = _countTerms(text)
+		with self._lock:
+			self._dropDocument(key)
+			postings = self._postings
+			for term, frequency in counts.items():
+				posting = postings.get(term)
+				if posting is None:
+					postings[term] = {key: frequency}
+					self._addTerm(term)
+				else:
+					posting[key] = frequency
+			length = sum(counts.values())
+			self._documents[key] = (length, tuple(counts))
+			self._totalLength += length
+
+	def _extendDocument(self, keys, text):
+		oldKey, newKey = keys
+		counts = _countTerms(text)
+		with self._lock:
+			document = self._documents.pop(oldKey, None)
+			if document is None:
+				return
+			length, terms = document
+			postings = self._postings
+			if newKey != oldKey:
+				self._dropDocument(newKey)
+				for term in terms:
+					posting = postings[term]
+					posting[newKey] = posting.pop(oldKey)
+			for term, frequency in counts.items():
+				posting = postings.get(term)
+				if posting is None:
+					postings[term] = {newKey: frequency}
+					self._addTerm(term)
+				else:
+					posting[newKey] = posting.get(newKey, 0) + frequency
+			added = sum(counts.values())
+			self._documents[newKey] = (length + added, tuple(set(terms).union(counts)))
+			self._totalLength += added
+
+	def _addTerm(self, term):
+		# Caller holds the lock; term has just got its first document.
+		vocabulary = self._vocabulary
+		position = bisect_left(vocabulary, term)
+		if term in self._newTerms or (position < len(vocabulary) and vocabulary[position] == term):
+			# A dead term back in use; it is already listed.
+			self._deadTerms -= 1
+		else:
+			self._newTerms.add(term)
+
+	def _removeDocument(self, key, source):
+		with self._lock:
+			self._dropDocument(key)
+
+	def _dropDocument(self, key):
+		# Caller holds the lock.
+		document = self._documents.pop(key, None)
+		if document is None:
+			return
+		length, terms = document
+		self._totalLength -= length
+		postings = self._postings
+		for term in terms:
+			posting = postings.get(term)
+			if posting is None:
+				continue
+			posting.pop(key, None)
+			if not posting:
+				del postings[term]
+				self._deadTerms += 1
+		if self._deadTerms > len(postings):
+			self._vocabulary = sorted(postings)
+			self._newTerms.clear()
+			self._deadTerms = 0
+
+	def _clearDocuments(self, key, source):
+		with self._lock:
+			self._postings.clear()
+			self._documents.clear()
+			self._totalLength = 0
+			self._vocabulary = []
+			self._newTerms.clear()
+			self._deadTerms = 0
+
+	def _expandPrefix(self, prefix):
+		# Caller holds the lock.
+		if self._newTerms:
+			self._vocabulary.extend(self._newTerms)
+			self._newTerms.clear()
+			self._vocabulary.sort()
+		vocabulary = self._vocabulary
+		postings = self._postings
+		terms = []
+		position = bisect_left(vocabulary, prefix)
+		while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+			term = vocabulary[position]
+			if term in postings:
+				terms.append(term)
+			position += 1
+		if len(terms) > _PREFIX_TERM_LIMIT:
+			terms = heapq.nlargest(_PREFIX_TERM_LIMIT, terms, key=lambda term: len(postings[term]))
+		return terms
+
+	def search(self, query, limit=DEFAULT_RESULT_LIMIT):
+		# Returns keys of documents containing every query word, best match first.
+		words = tokenize(query)
+		if not words:
+			return []
+		with self._lock:
+			documentCount = len(self._documents)
+			if not documentCount:
+				return []
+			averageLength = self._totalLength / documentCount or 1
+			# Each query word becomes a group of index terms; only the last may be a prefix.
+			groups = []
+			for position, word in enumerate(words):
+				if position == len(words) - 1 and len(word) >= _MIN_PREFIX_LENGTH:
+					terms = self._expandPrefix(word)
+				else:
+					terms = [word] if word in self._postings else []
+				if not terms:
+					return []
+				groups.append(terms)
+			candidates = None
+			for terms in sorted(groups, key=lambda terms: sum(len(self._postings[term]) for term in terms)):
+				keys = set()
+				for term in terms:
+					keys.update(self._postings[term])
+				candidates = keys if candidates is None else candidates & keys
+				if not candidates:
+					return []
+			scores = dict.fromkeys(candidates, 0.0)
+			documents = self._documents
+			for terms in groups:
+				for term in terms:
+					posting = self._postings[term]
+					idf = math.log(1 + (documentCount - len(posting) + 0.5) / (len(posting) + 0.5))
+					for key in candidates.intersection(posting):
+						frequency = posting[key]
+						norm = _K1 * (1 - _B + _B * documents[key][0] / averageLength)
+						scores[key] += idf * frequency * (_K1 + 1) / (frequency + norm)
+		return heapq.nlargest(limit, scores, key=scores.__getitem__)
+
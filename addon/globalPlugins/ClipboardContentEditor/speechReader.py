@@ -0,0 +1,136 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Reading long text aloud in chunks.
+# The text is cut lazily into sentences and lines, each at most
+# CHUNK_LENGTH characters, and only a couple of chunks are queued with the
+# synthesizer at a time: each chunk reports back when it has been spoken and
+# the next one is queued then. The position reached is remembered per text,
+# so reading can stop at any time and resume at the first chunk that was not
+# finished. Speech canceled by anything else, such as a key press, never
+# reports back, so the owner calls interrupt then and reading stops as well.
+
+import re
+from collections import OrderedDict, deque
+
+CHUNK_LENGTH = 500
+# Chunks queued ahead of the one being spoken, so the synthesizer never waits.
+CHUNKS_AHEAD = 2
+# Texts whose reading position is remembered.
+POSITION_MEMORY = 64
+
+_CHUNK_END_RE = re.compile(r"[\r\n]\s*|[.!?…][\"')\]}’”»]*\s+")
+_SPACE_RE = re.compile(r"\s")
+
+
+def chunkEnd(text, start, maxLength=CHUNK_LENGTH):
+	# End of the chunk starting at start: after the first sentence end or line break,
+	# else after the last whitespace within maxLength, else at maxLength.
+	limit = min(len(text), start + maxLength)
+	match = _CHUNK_END_RE.search(text, start, limit)
+	if match is not None:
+		return match.end()
+	if limit == len(text):
+		return limit
+	for position in range(limit - 1, start, -1):
+		if _SPACE_RE.match(text, position):
+			return position + 1
+	return limit
+
+
+def iterChunks(text, start=0, maxLength=CHUNK_LENGTH):
+	# (start, end) of each chunk holding something to say.
+	while start < len(text):
+		end = chunkEnd(text, start, maxLength)
+		if not text[start:end].isspace():
+			yield start, end
+		start = end
+
+
+class SpeechReader:
+	def __init__(self, speakChunk, cancelSpeech):
+		# speakChunk(text, onDone) queues text and calls onDone once it has been spoken.
+		self._speakChunk = speakChunk
+		self._cancelSpeech = cancelSpeech
+		self._positions = OrderedDict()
+		self._text = ""
+		self._key = None
+		self._chunks = None
+		self._queued = deque()
+		# Bumped whenever reading starts or stops, so reports from an earlier run are ignored.
+		self._run = 0
+
+	@property
+	def isReading(self):
+		return bool(self._queued)
+
+	def position(self, key):
+		return self._positions.get(key, 0)
+
+	def _remember(self, key, position):
+		if position:
+			self._positions[key] = position
+			self._positions.move_to_end(key)
+			while len(self._positions) > POSITION_MEMORY:
+				self._positions.popitem(last=False)
+		else:
+			self._positions.pop(key, None)
+
+	def start(self, text, key, position=0):
+		# Returns False if there is nothing left to read from position.
+		self.stop()
+		self._run += 1
+		self._text = text
+		self._key = key
+		self._chunks = iterChunks(text, position)
+		for _i in range(CHUNKS_AHEAD):
+			self._queueNext()
+		if not self._queued:
+			self._remember(key, 0)
+			return False
+		return True
+
+	def resume(self, text, key):
+		return self.start(text, key, self.position(key))
+
+	def stop(self):
+		# Stops reading; the first chunk not spoken in full is where resume starts.
+		if self._halt():
+			self._cancelSpeech()
+
+	def interrupt(self):
+		# Speech was canceled elsewhere, so no chunk will report back; stops like stop without canceling again.
+		self._halt()
+
+	def _halt(self):
+		# Returns False if nothing was being read.
+		if not self._queued:
+			return False
+		self._run += 1
+		self._remember(self._key, self._queued[0][0])
+		self._queued.clear()
+		self._chunks = None
+		self._text = ""
+		return True
+
+	def _queueNext(self):
+		chunk = next(self._chunks, None)
+		if chunk is None:
+			return
+		self._queued.append(chunk)
+		run = self._run
+		start, end = chunk
+		self._speakChunk(self._text[start:end], lambda: self._onChunkSpoken(run))
+
+	def _onChunkSpoken(self, run):
+		if run != self._run or not self._queued:
+			return
+		start, end = self._queued.popleft()
+		self._remember(self._key, end)
+		self._queueNext()
+		if not self._queued:
+			# Read to the end: the next reading starts over.
+			self._remember(self._key, 0)
+			self._chunks = None
+			self._text = ""
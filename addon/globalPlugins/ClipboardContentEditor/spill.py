@@ -0,0 +1,150 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Spill files for huge clipboard payloads.
+# A text above the spill threshold is written once as UTF-8 to its own file
+# and read back through a read-only memory mapping. Previews, the search
+# index and statistics walk the mapping in chunks, so no full Python string
+# has to stay alive for it. The file is deleted when its handle is collected.
+# Binary payloads, such as copied images, are spilled the same way but read
+# back whole, since they are only needed when restored or shown.
+
+import codecs
+import mmap
+import os
+import sys
+import uuid
+import weakref
+
+SPILL_SUFFIX = ".spill"
+_WRITE_CHUNK_SIZE = 1024 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def _release(fileHandle, mapping, path):
+	try:
+		mapping.close()
+	except (BufferError, ValueError):
+		pass
+	fileHandle.close()
+	try:
+		os.remove(path)
+	except OSError:
+		pass
+
+
+class SpilledText:
+	__slots__ = ("path", "length", "byteLength", "_file", "_map", "_finalizer", "__weakref__")
+
+	def __init__(self, path, length):
+		self.path = path
+		# Length of the original text in characters.
+		self.length = length
+		self._file = open(path, "rb")
+		self.byteLength = os.fstat(self._file.fileno()).st_size
+		self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		self._finalizer = weakref.finalize(self, _release, self._file, self._map, path)
+
+	def __len__(self):
+		return self.length
+
+	@property
+	def memorySize(self):
+		# The mapping lives in the page cache, not on NVDA's heap.
+		return sys.getsizeof(self)
+
+	def read(self):
+		with memoryview(self._map) as view:
+			return str(view, "utf-8", "surrogatepass")
+
+	def iterBytes(self, chunkSize=DEFAULT_CHUNK_SIZE):
+		for start in range(0, self.byteLength, chunkSize):
+			yield self._map[start:start + chunkSize]
+
+	def iterChunks(self, chunkSize=DEFAULT_CHUNK_SIZE):
+		decoder = codecs.getincrementaldecoder("utf-8")("surrogatepass")
+		for data in self.iterBytes(chunkSize):
+			chunk = decoder.decode(data)
+			if chunk:
+				yield chunk
+		tail = decoder.decode(b"", final=True)
+		if tail:
+			yield tail
+
+	def readPrefix(self, length):
+		# At most four bytes per character; a character cut in half is dropped.
+		return self._map[:length * 4].decode("utf-8", "ignore")[:length]
+
+	def delete(self):
+		self._finalizer()
+
+
+def spillText(directory, text):
+	path = os.path.join(directory, uuid.uuid4().hex + SPILL_SUFFIX)
+	try:
+		with open(path, "wb") as handle:
+			for start in range(0, len(text), _WRITE_CHUNK_SIZE):
+				handle.write(text[start:start + _WRITE_CHUNK_SIZE].encode("utf-8", "surrogatepass"))
+		return SpilledText(path, len(text))
+	except (OSError, ValueError):
+		try:
+			os.remove(path)
+		except OSError:
+			pass
+		raise
+
+
+def _removeFile(path):
+	try:
+		os.remove(path)
+	except OSError:
+		pass
+
+
+class SpilledBytes:
+	__slots__ = ("path", "byteLength", "_finalizer", "__weakref__")
+
+	def __init__(self, path, byteLength):
+		self.path = path
+		self.byteLength = byteLength
+		self._finalizer = weakref.finalize(self, _removeFile, path)
+
+	def __len__(self):
+		return self.byteLength
+
+	@property
+	def memorySize(self):
+		return sys.getsizeof(self)
+
+	def read(self):
+		with open(self.path, "rb") as handle:
+			return handle.read()
+
+	def delete(self):
+		self._finalizer()
+
+
+def spillBytes(directory, data):
+	path = os.path.join(directory, uuid.uuid4().hex + SPILL_SUFFIX)
+	try:
+		with open(path, "wb") as handle:
+			handle.write(data)
+		return SpilledBytes(path, len(data))
+	except OSError:
+		_removeFile(path)
+		raise
+
+
+def removeStaleSpillFiles(directory):
+	# Spill files never outlive the NVDA session that wrote them.
+	try:
+		names = os.listdir(directory)
+	except OSError:
+		return
+	for name in names:
+		if name.endswith(SPILL_SUFFIX):
+			try:
+				os.remove(os.path.join(directory, name))
+			except OSError:
+				pass
@@ -0,0 +1,61 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Saving text to a file.
+# The text is encoded and written a chunk at a time to a temporary file
+# beside the target, which then takes the target's place in one rename, so a
+# save that fails or is canceled part way leaves any existing file as it
+# was. Line breaks can be normalised on the way and the output can be
+# gzip-compressed.
+
+import codecs
+import gzip
+import os
+import re
+
+SAVE_CHUNK_SIZE = 1024 * 1024
+
+# Encodings offered for saving, by codec name; mbcs is the Windows ANSI code page.
+SAVE_ENCODINGS = ("utf-8", "utf-8-sig", "utf-16", "mbcs")
+# The line break written for each choice; None keeps line breaks as they are.
+LINE_ENDINGS = {"keep": None, "windows": "\r\n", "unix": "\n"}
+
+_LINE_BREAK_RE = re.compile(r"\r\n?|\n")
+
+
+def writeTextFile(path, text, encoding="utf-8", lineEnding=None, compress=False, progress=None, chunkSize=SAVE_CHUNK_SIZE):
+	# Raises OSError, LookupError for an unknown encoding or UnicodeEncodeError for text it cannot hold;
+	# progress, if given, is called with the fraction written so far.
+	encoder = codecs.getincrementalencoder(encoding)()
+	temporaryPath = path + ".tmp"
+	try:
+		with open(temporaryPath, "wb") as handle:
+			output = gzip.GzipFile(filename=path, mode="wb", fileobj=handle) if compress else handle
+			carried = ""
+			for start in range(0, len(text), chunkSize):
+				if progress is not None:
+					progress(start / len(text))
+				chunk = carried + text[start:start + chunkSize]
+				carried = ""
+				if lineEnding is not None:
+					if chunk.endswith("\r") and start + chunkSize < len(text):
+						# Perhaps the first half of a Windows line break; decided with the next chunk.
+						chunk, carried = chunk[:-1], "\r"
+					chunk = _LINE_BREAK_RE.sub(lineEnding, chunk)
+				output.write(encoder.encode(chunk))
+			output.write(encoder.encode("", True))
+			if compress:
+				output.close()
+			handle.flush()
+			os.fsync(handle.fileno())
+		if progress is not None:
+			# The last chance to cancel before the target is replaced.
+			progress(1.0)
+		os.replace(temporaryPath, path)
+	except BaseException:
+		try:
+			os.remove(temporaryPath)
+		except OSError:
+			pass
+		raise
@@ -0,0 +1,162 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Find and replace in the editor.
+# Literal and regular expression searches both run through compiled patterns:
+# literal text is escaped, whole-word matching wraps the pattern in word
+# lookarounds and case-insensitive matching uses re.IGNORECASE, so match
+# offsets always refer to the text itself. Compiled patterns are cached by
+# (pattern, flags) and Replace All is a single subn pass. Find next and
+# previous move through a MatchIndex built once per text revision and
+# pattern, so stepping through matches is a binary search.
+
+import functools
+import itertools
+import re
+from bisect import bisect_left
+
+from .backgroundJob import reportEvery
+from .undoStack import TextDelta
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(source, flags):
+	return re.compile(source, flags)
+
+
+def compileSearchPattern(findText, matchCase, wholeWordsOnly, useRegex):
+	# Raises re.error for an invalid regular expression.
+	source = findText if useRegex else re.escape(findText)
+	if wholeWordsOnly:
+		source = r"(?<!\w)(?:" + source + r")(?!\w)"
+	flags = 0 if matchCase else re.IGNORECASE
+	if useRegex:
+		flags |= re.MULTILINE
+	return _compile(source, flags)
+
+
+def matchAt(fullText, pattern, start, end):
+	# The match covering exactly start to end, if there is one.
+	match = pattern.match(fullText, start)
+	if match is not None and match.end() == end:
+		return match
+	return None
+
+
+def applyReplacementCase(selection, replaceText):
+	letters = [ch for ch in selection if ch.isalpha()]
+	if not letters:
+		return replaceText
+	if all(ch.isupper() for ch in letters):
+		return replaceText.upper()
+	if all(ch.islower() for ch in letters):
+		return replaceText.lower()
+	if letters[0].isupper():
+		if not replaceText:
+			return replaceText
+		return replaceText.lower().capitalize()
+	return replaceText
+
+
+def expandReplacement(match, replaceText, useRegex):
+	# Regex replacements may use group references such as \1 or \g<name>; raises re.error if one is invalid.
+	if useRegex:
+		return match.expand(replaceText)
+	return applyReplacementCase(match.group(), replaceText)
+
+
+def replaceAll(fullText, pattern, replaceText, useRegex, progress=None):
+	# Returns the new text and the number of replacements.
+	# progress, if given, is told every so many matches how far through the text they have got.
+	if useRegex:
+		if progress is None:
+			return pattern.subn(replaceText, fullText)
+		# Checked up front, as subn would, so an invalid template raises re.error before any match.
+		pattern.sub(replaceText, "")
+		replacement = lambda match: match.expand(replaceText)
+	else:
+		replacement = lambda match: applyReplacementCase(match.group(), replaceText)
+	if progress is not None:
+		replacement = reportEvery(replacement, progress, lambda match: match.end() / len(fullText))
+	return pattern.subn(replacement, fullText)
+
+
+def replacementDeltas(fullText, pattern, replaceText, useRegex):
+	# What replaceAll changes, as one TextDelta per replacement in order.
+	deltas = []
+	# Equal strings share one object, which keeps the deltas small.
+	strings = {}
+	shift = 0
+	for match in pattern.finditer(fullText):
+		removed = match.group()
+		removed = strings.setdefault(removed, removed)
+		inserted = expandReplacement(match, replaceText, useRegex)
+		inserted = strings.setdefault(inserted, inserted)
+		deltas.append(TextDelta(match.start() + shift, removed, inserted))
+		shift += len(inserted) - len(removed)
+	return deltas
+
+
+# Matches indexed up front; beyond this the index grows as navigation reaches further.
+MATCH_INDEX_LIMIT = 100000
+
+
+class MatchIndex:
+	# Non-overlapping match positions of one pattern in one text revision.
+	def __init__(self, fullText, pattern, limit=MATCH_INDEX_LIMIT):
+		self._starts = []
+		self._ends = []
+		self._matches = pattern.finditer(fullText)
+		self._extend(limit)
+
+	def __len__(self):
+		return len(self._starts)
+
+	@property
+	def complete(self):
+		return self._matches is None
+
+	def _extend(self, count=None):
+		# Pulls up to count more matches, or all of them; drops the iterator once it runs out.
+		if self._matches is None:
+			return
+		added = 0
+		for match in itertools.islice(self._matches, count):
+			self._starts.append(match.start())
+			self._ends.append(match.end())
+			added += 1
+		if count is None or added < count:
+			self._matches = None
+
+	def span(self, position):
+		return self._starts[position], self._ends[position]
+
+	def findNext(self, selStart, selEnd):
+		# Position in the index of the first match after the selection, wrapping around; None without matches.
+		starts = self._starts
+		ends = self._ends
+		while True:
+			position = bisect_left(starts, selEnd)
+			if position < len(starts) and starts[position] == ends[position] == selStart == selEnd:
+				# An empty match at the caret was already found; step past it.
+				position += 1
+			if position < len(starts) or self.complete:
+				break
+			self._extend(MATCH_INDEX_LIMIT)
+		if not starts:
+			return None
+		return position if position < len(starts) else 0
+
+	def findPrevious(self, selStart, selEnd):
+		# Position in the index of the last match starting before the selection, wrapping around.
+		starts = self._starts
+		while not self.complete and (not starts or starts[-1] < selStart):
+			self._extend(MATCH_INDEX_LIMIT)
+		position = bisect_left(starts, selStart) - 1
+		if position < 0:
+			self._extend()
+			position = len(starts) - 1
+		if position < 0:
+			return None
+		return position
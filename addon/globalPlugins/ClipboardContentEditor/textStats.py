@@ -0,0 +1,302 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Text statistics in one pass.
+# A TextStats summarises a piece of text: its counts plus just enough about
+# its first and last characters to combine it with the summary of the piece
+# that follows. Large texts are summarised slice by slice and the summaries
+# added together, so memory use does not grow with the text. Within a slice
+# every count comes from C-level str and regex operations.
+# Words are runs of non-whitespace, as str.split() sees them; lines are
+# counted as str.splitlines() does; paragraphs are separated by whitespace
+# holding at least two line feeds; a sentence ends with a word whose last
+# character, ignoring closing quotes and brackets, is . ! ? or an ellipsis.
+
+import itertools
+import re
+from bisect import bisect_left, bisect_right
+
+# Slices are split into words, so this bounds the temporary word list too.
+STATS_CHUNK_SIZE = 256 * 1024
+
+_TERMINATORS = ".!?…"
+_CLOSERS = "\"')]}’”»"
+_RARE_LINE_BREAKS = "\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+_LINE_BREAK_CHARS = "\n\r" + _RARE_LINE_BREAKS
+
+_PARAGRAPH_START_RE = re.compile(r"\n\s*\n\s*(?=\S)")
+# One pattern per terminator, so each search can skip ahead to its literal first character.
+_SENTENCE_END_RES = tuple(
+	re.compile(re.escape(terminator) + "[" + re.escape(_CLOSERS) + r"]*(?!\S)")
+	for terminator in _TERMINATORS
+)
+
+
+def _endsSentence(text):
+	last = text.rstrip(_CLOSERS)[-1:]
+	return bool(last) and last in _TERMINATORS
+
+
+class TextStats:
+	__slots__ = (
+		"chars", "nonSpace", "words", "lineBreaks", "sentenceEnds",
+		"_innerParagraphs", "_firstChar", "_lastChar", "_leadNewlines", "_trailNewlines",
+		"_firstEndsSentence", "_lastEndsSentence", "_firstIsClosers",
+	)
+
+	def __init__(self):
+		self.chars = 0
+		self.nonSpace = 0
+		self.words = 0
+		self.lineBreaks = 0
+		# Words ending a sentence; a word cut at the end of the piece is judged by what is there.
+		self.sentenceEnds = 0
+		# Words starting a paragraph, not counting the first word.
+		self._innerParagraphs = 0
+		self._firstChar = ""
+		self._lastChar = ""
+		# Line feeds in the leading and trailing whitespace, capped at two.
+		self._leadNewlines = 0
+		self._trailNewlines = 0
+		self._firstEndsSentence = False
+		self._lastEndsSentence = False
+		self._firstIsClosers = False
+
+	@classmethod
+	def fromText(cls, text):
+		stats = cls()
+		if not text:
+			return stats
+		stats.chars = len(text)
+		stats._firstChar = text[0]
+		stats._lastChar = text[-1]
+		words = text.split()
+		stats.words = len(words)
+		stats.nonSpace = sum(map(len, words))
+		stats.lineBreaks = text.count("\n") + text.count("\r") - text.count("\r\n")
+		for lineBreak in _RARE_LINE_BREAKS:
+			stats.lineBreaks += text.count(lineBreak)
+		if words:
+			leadLength = len(text) - len(text.lstrip())
+			stats._leadNewlines = min(text.count("\n", 0, leadLength), 2)
+			stats._trailNewlines = min(text.count("\n", len(text.rstrip())), 2)
+			stats._innerParagraphs = len(_PARAGRAPH_START_RE.findall(text)) - (stats._leadNewlines == 2)
+			stats.sentenceEnds = sum(len(pattern.findall(text)) for pattern in _SENTENCE_END_RES)
+			stats._firstEndsSentence = _endsSentence(words[0])
+			stats._firstIsClosers = not words[0].strip(_CLOSERS)
+			stats._lastEndsSentence = _endsSentence(words[-1])
+		else:
+			stats._leadNewlines = stats._trailNewlines = min(text.count("\n"), 2)
+		return stats
+
+	@property
+	def lines(self):
+		if not self.chars:
+			return 0
+		return self.lineBreaks + (self._lastChar not in _LINE_BREAK_CHARS)
+
+	@property
+	def paragraphs(self):
+		return self._innerParagraphs + (self.words > 0)
+
+	@property
+	def sentences(self):
+		return self.sentenceEnds + (self.words > 0 and not self._lastEndsSentence)
+
+	def __add__(self, other):
+		# Summary of this piece followed directly by other.
+		if not other.chars:
+			return self
+		if not self.chars:
+			return other
+		merged = TextStats()
+		merged.chars = self.chars + other.chars
+		merged.nonSpace = self.nonSpace + other.nonSpace
+		merged._firstChar = self._firstChar
+		merged._lastChar = other._lastChar
+		# A word cut in two is counted by both pieces.
+		joined = not self._lastChar.isspace() and not other._firstChar.isspace()
+		merged.words = self.words + other.words - joined
+		merged.lineBreaks = self.lineBreaks + other.lineBreaks - (self._lastChar == "\r" and other._firstChar == "\n")
+		merged._innerParagraphs = self._innerParagraphs + other._innerParagraphs
+		if self.words and other.words and not joined and self._trailNewlines + other._leadNewlines >= 2:
+			merged._innerParagraphs += 1
+		merged._leadNewlines = self._leadNewlines if self.words else min(self._leadNewlines + other._leadNewlines, 2)
+		merged._trailNewlines = other._trailNewlines if other.words else min(self._trailNewlines + other._trailNewlines, 2)
+		merged.sentenceEnds = self.sentenceEnds + other.sentenceEnds
+		merged._firstEndsSentence = self._firstEndsSentence if self.words else other._firstEndsSentence
+		merged._firstIsClosers = self._firstIsClosers if self.words else other._firstIsClosers
+		merged._lastEndsSentence = other._lastEndsSentence if other.words else self._lastEndsSentence
+		if joined:
+			# Judge the rejoined word as a whole: closers at the start of other may follow a terminator.
+			endsSentence = other._firstEndsSentence or (other._firstIsClosers and self._lastEndsSentence)
+			merged.sentenceEnds += endsSentence - self._lastEndsSentence - other._firstEndsSentence
+			if self.words == 1:
+				merged._firstEndsSentence = endsSentence
+				merged._firstIsClosers = self._firstIsClosers and other._firstIsClosers
+			if other.words == 1:
+				merged._lastEndsSentence = endsSentence
+		return merged
+
+
+def computeStats(text, chunkSize=STATS_CHUNK_SIZE):
+	stats = TextStats()
+	for start in range(0, len(text), chunkSize):
+		stats += TextStats.fromText(text[start:start + chunkSize])
+	return stats
+
+
+# Size of the blocks IncrementalStats keeps a summary for.
+STATS_BLOCK_SIZE = 16 * 1024
+
+
+class IncrementalStats:
+	# Statistics for a text that is edited in place. The text is held in
+	# blocks, each summarised the first time statistics are asked for; after
+	# an edit only the blocks that differ from the new text lose their
+	# summary. summarise() fills in missing summaries ahead of time, for
+	# instance on another thread. The blocks can also be read and edited
+	# directly, which makes this the editor's copy of a text too large to
+	# keep in the control.
+	def __init__(self, text=""):
+		self._blocks = []
+		self._blockStats = []
+		self._offsets = [0]
+		self._total = None
+		# The blocks joined, until the next change.
+		self._text = None
+		self.setText(text)
+
+	def __len__(self):
+		return self._offsets[-1]
+
+	@property
+	def text(self):
+		if self._text is None:
+			self._text = "".join(self._blocks)
+		return self._text
+
+	def setText(self, text):
+		self._blocks = self._split(text, 0, len(text))
+		self._blockStats = [None] * len(self._blocks)
+		self._reindex()
+		self._text = text
+
+	def slice(self, start, end):
+		# text[start:end], joining only the blocks it spans.
+		start = max(start, 0)
+		end = min(end, len(self))
+		if start >= end:
+			return ""
+		if self._text is not None:
+			return self._text[start:end]
+		first = bisect_right(self._offsets, start) - 1
+		last = bisect_left(self._offsets, end)
+		blockStart = self._offsets[first]
+		return "".join(self._blocks[first:last])[start - blockStart:end - blockStart]
+
+	def replace(self, start, end, inserted):
+		# Replaces text[start:end] with inserted; only the blocks it spans are split again.
+		blocks = self._blocks
+		offsets = self._offsets
+		first = max(min(bisect_right(offsets, start) - 1, len(blocks) - 1), 0)
+		last = max(bisect_left(offsets, end), first + 1) if blocks else 0
+		blockStart = offsets[first]
+		joined = "".join(blocks[first:last])
+		joined = joined[:start - blockStart] + inserted + joined[end - blockStart:]
+		newBlocks = self._split(joined, 0, len(joined))
+		blocks[first:last] = newBlocks
+		self._blockStats[first:last] = [None] * len(newBlocks)
+		self._reindex()
+
+	def _split(self, text, start, end):
+		return [text[offset:min(offset + STATS_BLOCK_SIZE, end)] for offset in range(start, end, STATS_BLOCK_SIZE)]
+
+	@property
+	def summarised(self):
+		return None not in self._blockStats
+
+	def summarise(self, progress=None):
+		# Summarises the blocks that have no summary yet; progress, if given, hears the fraction done.
+		blockStats = self._blockStats
+		pending = [index for index, stats in enumerate(blockStats) if stats is None]
+		for done, index in enumerate(pending):
+			if progress is not None and not done % 64:
+				progress(done / len(pending))
+			blockStats[index] = TextStats.fromText(self._blocks[index])
+
+	def _reindex(self):
+		self._offsets = [0]
+		self._offsets.extend(itertools.accumulate(map(len, self._blocks)))
+		self._total = None
+		self._text = None
+
+	def update(self, text):
+		# Brings the blocks in line with text and returns (start, removed, inserted):
+		# inserted replaced removed at start, both rounded out to whole blocks.
+		blocks = self._blocks
+		offsets = self._offsets
+		delta = len(text) - len(self)
+		first = 0
+		while first < len(blocks) and text.startswith(blocks[first], offsets[first]):
+			first += 1
+		if first == len(blocks) and not delta:
+			return (len(text), "", "")
+		last = len(blocks)
+		while last > first and offsets[last - 1] + delta >= offsets[first] and text.startswith(
+			blocks[last - 1], offsets[last - 1] + delta,
+		):
+			last -= 1
+		start = offsets[first]
+		oldEnd = offsets[last]
+		newEnd = oldEnd + delta
+		removed = "".join(blocks[first:last])
+		newBlocks = self._split(text, start, newEnd)
+		blocks[first:last] = newBlocks
+		self._blockStats[first:last] = [None] * len(newBlocks)
+		self._reindex()
+		return (start, removed, "".join(newBlocks))
+
+	@property
+	def total(self):
+		if self._total is None:
+			self.summarise()
+			self._total = sum(self._blockStats, TextStats())
+		return self._total
+
+	def rangeStats(self, start, end):
+		# Statistics of text[start:end] as if it stood alone.
+		offsets = self._offsets
+		stats = TextStats()
+		if start >= end:
+			return stats
+		first = bisect_right(offsets, start) - 1
+		for index in range(first, len(self._blocks)):
+			blockStart = offsets[index]
+			if blockStart >= end:
+				break
+			blockEnd = offsets[index + 1]
+			if start <= blockStart and blockEnd <= end:
+				if self._blockStats[index] is None:
+					self._blockStats[index] = TextStats.fromText(self._blocks[index])
+				stats += self._blockStats[index]
+			else:
+				stats += TextStats.fromText(self._blocks[index][max(start - blockStart, 0):end - blockStart])
+		return stats
+
+	def lineAndColumn(self, position):
+		# 1-based line and column of position; lines break as str.splitlines() breaks them.
+		position = max(0, min(position, len(self)))
+		line = self.rangeStats(0, position).lineBreaks + 1
+		index = bisect_right(self._offsets, position) - 1
+		lineStart = 0
+		while index >= 0:
+			blockStart = self._offsets[index]
+			block = self._blocks[index] if index < len(self._blocks) else ""
+			lastBreak = max(block.rfind(lineBreak, 0, position - blockStart) for lineBreak in _LINE_BREAK_CHARS)
+			if lastBreak >= 0:
+				lineStart = blockStart + lastBreak + 1
+				break
+			index -= 1
+		return line, position - lineStart + 1
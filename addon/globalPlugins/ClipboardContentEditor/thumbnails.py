@@ -0,0 +1,57 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Thumbnails of history images.
+# A thumbnail is only made when its image is shown, and is kept by the
+# digest of the image's payload, so an image copied again shares it. The
+# cache is bounded by the size of the thumbnails it holds and drops the one
+# shown least recently first; the full image is only read to make one.
+
+from collections import OrderedDict
+
+THUMBNAIL_SIZE = 160
+THUMBNAIL_CACHE_BYTES = 8 * 1024 * 1024
+
+
+def thumbnailSize(width, height, maxSize=THUMBNAIL_SIZE):
+	# Fits width by height into a maxSize square, keeping its proportions; small images keep their size.
+	scale = min(1.0, maxSize / max(width, height, 1))
+	return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class ThumbnailCache:
+	def __init__(self, makeThumbnail, maxBytes=THUMBNAIL_CACHE_BYTES):
+		# makeThumbnail(payload, width, height) returns the thumbnail, or None if the image cannot be read.
+		self._makeThumbnail = makeThumbnail
+		self.maxBytes = maxBytes
+		self._thumbnails = OrderedDict()
+		self.size = 0
+
+	def __len__(self):
+		return len(self._thumbnails)
+
+	def get(self, digest, info, readPayload):
+		# info is the image's ImageInfo; readPayload() is only called when the thumbnail has to be made.
+		item = self._thumbnails.get(digest)
+		if item is not None:
+			self._thumbnails.move_to_end(digest)
+			return item[0]
+		width, height = thumbnailSize(info.width, info.height)
+		payload = readPayload()
+		if payload is None:
+			return None
+		thumbnail = self._makeThumbnail(payload, width, height)
+		if thumbnail is None:
+			return None
+		# Thumbnails are held as 32-bit bitmaps.
+		cost = width * height * 4
+		self._thumbnails[digest] = (thumbnail, cost)
+		self.size += cost
+		while self.size > self.maxBytes and len(self._thumbnails) > 1:
+			self.size -= self._thumbnails.popitem(last=False)[1][1]
+		return thumbnail
+
+	def clear(self):
+		self._thumbnails.clear()
+		self.size = 0
@@ -0,0 +1,152 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Text transforms of the Tools menu, alone or chained in saved presets.
+# A pipeline runs its steps in order, but consecutive line-wise steps are
+# fused: the text is split into lines once, slab by slab, and the lines flow
+# through a chain of map and filter calls, so the whole run is one pass with
+# no Python code per line. Steps that work on whole texts run on their own.
+# Progress is reported between stages and, within a run of lines, per slab.
+# Presets are kept as JSON in the add-on's configuration and edited as one
+# step name per line.
+
+import functools
+import json
+
+from .htmlText import htmlToText
+
+STEP_NAMES = ("upper", "lower", "title", "trim", "remove_empty", "strip_html")
+
+# How each line-wise step treats a line.
+_LINE_STEPS = {
+	"upper": (map, str.upper),
+	"lower": (map, str.lower),
+	"title": (map, str.title),
+	"trim": (map, str.strip),
+	"remove_empty": (filter, str.strip),
+}
+# Line-wise steps that change line breaks; a fused run without one of these
+# keeps the text whole so its line breaks survive.
+_SPLITTING_STEPS = {"trim", "remove_empty"}
+
+# Text split into lines this many characters at a time.
+LINE_SLAB_SIZE = 1024 * 1024
+
+
+def _wholeText(function):
+	return lambda text, progress: function(text)
+
+
+# How each step treats the whole text; each takes the text and a progress callback.
+_TEXT_STEPS = {
+	"upper": _wholeText(str.upper),
+	"lower": _wholeText(str.lower),
+	"title": _wholeText(str.title),
+	"strip_html": htmlToText,
+}
+
+
+class UnknownStepError(ValueError):
+	def __init__(self, lineNumber):
+		super().__init__(lineNumber)
+		self.lineNumber = lineNumber
+
+
+def iterLines(text, slabSize=LINE_SLAB_SIZE, progress=None):
+	# The lines of str.splitlines(), split a slab at a time; slabs end after a line feed.
+	start = 0
+	while start < len(text):
+		if progress is not None:
+			progress(start / len(text))
+		end = text.find("\n", start + slabSize) + 1 or len(text)
+		yield from text[start:end].splitlines()
+		start = end
+
+
+class Pipeline:
+	def __init__(self, steps):
+		self.steps = tuple(steps)
+		self._stages = []
+		run = []
+		for step in self.steps:
+			if step not in _LINE_STEPS:
+				self._addRun(run)
+				run = []
+				self._stages.append(_TEXT_STEPS[step])
+				continue
+			if step == "trim" and _SPLITTING_STEPS.intersection(run):
+				# Run one at a time, a second split drops a trailing empty line; a new pass does the same.
+				self._addRun(run)
+				run = []
+			run.append(step)
+		self._addRun(run)
+
+	def _addRun(self, run):
+		if _SPLITTING_STEPS.intersection(run):
+			self._stages.append(functools.partial(_runLines, tuple(_LINE_STEPS[step] for step in run)))
+		else:
+			self._stages.extend(_TEXT_STEPS[step] for step in run)
+
+	def apply(self, text, progress=None):
+		# progress, if given, is called with the fraction of the whole pipeline done so far.
+		for index, stage in enumerate(self._stages):
+			stageProgress = None
+			if progress is not None:
+				progress(index / len(self._stages))
+				stageProgress = functools.partial(_scaleProgress, progress, index, len(self._stages))
+			text = stage(text, stageProgress)
+		return text
+
+
+def _scaleProgress(progress, index, count, fraction):
+	progress((index + fraction) / count)
+
+
+def _runLines(lineSteps, text, progress):
+	lines = iterLines(text, progress=progress)
+	for combinator, function in lineSteps:
+		lines = combinator(function, lines)
+	return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=16)
+def compilePipeline(steps):
+	# steps must be a tuple of step names so it can key the cache.
+	return Pipeline(steps)
+
+
+def parseSteps(text):
+	# Returns the step names, one per line; blank lines and lines starting with # are skipped.
+	steps = []
+	for lineNumber, line in enumerate(text.splitlines(), 1):
+		step = line.strip()
+		if not step or step.startswith("#"):
+			continue
+		if step not in STEP_NAMES:
+			raise UnknownStepError(lineNumber)
+		steps.append(step)
+	return steps
+
+
+def formatSteps(steps):
+	return "\n".join(steps)
+
+
+def loadPresets(data):
+	# Returns {name: [step, ...]} from the stored JSON, ignoring anything malformed.
+	try:
+		stored = json.loads(data) if data else {}
+	except ValueError:
+		return {}
+	if not isinstance(stored, dict):
+		return {}
+	return {
+		name: [step for step in steps if step in STEP_NAMES]
+		for name, steps in stored.items()
+		if isinstance(steps, list)
+	}
+
+
+def dumpPresets(presets):
+	return json.dumps(presets)
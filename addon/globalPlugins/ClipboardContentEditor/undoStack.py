@@ -0,0 +1,174 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# Undo and redo for the editor.
+# A step is a list of TextDelta records rather than a copy of the text. Each
+# delta replaces removed with inserted at offset, offsets counting in the
+# text as left by the deltas before it, and the deltas of a step run from
+# the start of the text to its end. So a step costs memory in proportion to
+# what it changed, and undoing it is a single pass over the text.
+
+import sys
+from collections import deque, namedtuple
+
+TextDelta = namedtuple("TextDelta", ("offset", "removed", "inserted"))
+
+UNDO_LEVELS = 500
+# Bytes of deltas kept; the oldest steps are forgotten first.
+UNDO_MEMORY_LIMIT = 32 * 1024 * 1024
+# Replacements recorded one by one; a larger step is kept as one delta spanning them all.
+STEP_DELTA_LIMIT = 10000
+
+# Compared at a time while looking for the common start and end of two texts.
+_COMPARE_BLOCK = 4096
+
+
+def _commonPrefixLength(first, second, limit):
+	position = 0
+	while position < limit:
+		end = min(position + _COMPARE_BLOCK, limit)
+		if not first.startswith(second[position:end], position):
+			break
+		position = end
+	else:
+		return limit
+	low, high = position, end - 1
+	while low < high:
+		middle = (low + high + 1) // 2
+		if first.startswith(second[position:middle], position):
+			low = middle
+		else:
+			high = middle - 1
+	return low
+
+
+def _commonSuffixLength(first, second, limit):
+	length = 0
+	while length < limit:
+		end = min(length + _COMPARE_BLOCK, limit)
+		if not first.endswith(second[len(second) - end:len(second) - length], 0, len(first) - length):
+			break
+		length = end
+	else:
+		return limit
+	low, high = length, end - 1
+	while low < high:
+		middle = (low + high + 1) // 2
+		if first.endswith(second[len(second) - middle:len(second) - length], 0, len(first) - length):
+			low = middle
+		else:
+			high = middle - 1
+	return low
+
+
+def diffTexts(old, new, offset=0):
+	# The single delta turning old into new, trimmed to what differs; None if they are equal.
+	prefix = _commonPrefixLength(old, new, min(len(old), len(new)))
+	if prefix == len(old) == len(new):
+		return None
+	suffix = _commonSuffixLength(old, new, min(len(old), len(new)) - prefix)
+	return TextDelta(offset + prefix, old[prefix:len(old) - suffix], new[prefix:len(new) - suffix])
+
+
+def applyDeltas(text, deltas):
+	pieces = []
+	position = 0
+	shift = 0
+	for offset, removed, inserted in deltas:
+		start = offset - shift
+		pieces.append(text[position:start])
+		pieces.append(inserted)
+		position = start + len(removed)
+		shift += len(inserted) - len(removed)
+	pieces.append(text[position:])
+	return "".join(pieces)
+
+
+def invertDeltas(deltas):
+	# The step undoing deltas; it also runs from the start of the text to its end.
+	inverse = []
+	shift = 0
+	for offset, removed, inserted in deltas:
+		inverse.append(TextDelta(offset - shift, inserted, removed))
+		shift += len(inserted) - len(removed)
+	return inverse
+
+
+def deltasSize(deltas):
+	# Repeated strings are shared, so each distinct one is counted once.
+	strings = {}
+	for delta in deltas:
+		strings[id(delta.removed)] = delta.removed
+		strings[id(delta.inserted)] = delta.inserted
+	return sys.getsizeof(deltas) + len(deltas) * sys.getsizeof(TextDelta(0, "", "")) + sum(
+		map(sys.getsizeof, strings.values())
+	)
+
+
+def compactStep(deltas, old, new):
+	# Many small deltas can outweigh the one delta spanning all of them; keeps whichever is smaller.
+	if len(deltas) < 2:
+		return deltas
+	shift = sum(len(inserted) - len(removed) for _offset, removed, inserted in deltas[:-1])
+	last = deltas[-1]
+	start = deltas[0].offset
+	span = TextDelta(start, old[start:last.offset - shift + len(last.removed)], new[start:last.offset + len(last.inserted)])
+	if deltasSize([span]) < deltasSize(deltas):
+		return [span]
+	return deltas
+
+
+class UndoStack:
+	def __init__(self, levels=UNDO_LEVELS, memoryLimit=UNDO_MEMORY_LIMIT):
+		self.levels = levels
+		self.memoryLimit = memoryLimit
+		# (deltas, size) pairs, most recent last.
+		self._undo = deque()
+		self._redo = []
+		self.memorySize = 0
+
+	@property
+	def canUndo(self):
+		return bool(self._undo)
+
+	@property
+	def canRedo(self):
+		return bool(self._redo)
+
+	def push(self, deltas):
+		# Records a new step; anything that could be redone is dropped.
+		if not deltas:
+			return
+		for _step, size in self._redo:
+			self.memorySize -= size
+		self._redo.clear()
+		self._add(self._undo, deltas)
+		while len(self._undo) > 1 and (len(self._undo) > self.levels or self.memorySize > self.memoryLimit):
+			_step, size = self._undo.popleft()
+			self.memorySize -= size
+
+	def _add(self, steps, deltas):
+		size = deltasSize(deltas)
+		steps.append((deltas, size))
+		self.memorySize += size
+
+	def undo(self):
+		# The deltas turning the text back, or None when there is nothing to undo.
+		if not self._undo:
+			return None
+		deltas, size = self._undo.pop()
+		self._redo.append((deltas, size))
+		return invertDeltas(deltas)
+
+	def redo(self):
+		if not self._redo:
+			return None
+		deltas, size = self._redo.pop()
+		self._undo.append((deltas, size))
+		return deltas
+
+	def clear(self):
+		self._undo.clear()
+		self._redo.clear()
+		self.memorySize = 0
@@ -0,0 +1,21 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+# The add-on's package __init__ needs NVDA, so the tests load its modules
+# through a bare package pointing at the same directory.
+
+import os
+import sys
+import types
+
+PACKAGE_NAME = "ClipboardContentEditor"
+PACKAGE_DIRECTORY = os.path.join(
+	os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+	"addon", "globalPlugins", PACKAGE_NAME,
+)
+
+if PACKAGE_NAME not in sys.modules:
+	package = types.ModuleType(PACKAGE_NAME)
+	package.__path__ = [PACKAGE_DIRECTORY]
+	sys.modules[PACKAGE_NAME] = package
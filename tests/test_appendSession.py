@@ -0,0 +1,55 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import random
+
+from ClipboardContentEditor.appendSession import SEPARATOR, AppendSession
+from ClipboardContentEditor.clipboardMonitor import textDigest
+from ClipboardContentEditor.history import ClipboardHistory
+
+
+def test_matchesPlainConcatenation():
+	rng = random.Random(10)
+	texts = ["".join(rng.choice("ab é😀\n") for _ in range(rng.randint(0, 20))) for _ in range(200)]
+	session = AppendSession(texts[0])
+	joined = texts[0]
+	for text in texts[1:]:
+		assert session.readWith(text) == joined + SEPARATOR + text
+		assert session.digestWith(text) == textDigest(joined + SEPARATOR + text)
+		session.append(text)
+		joined += SEPARATOR + text
+		assert session.digest == textDigest(joined)
+	assert session.read() == joined
+	assert "".join(session.iterChunks()) == joined
+	assert len(session) == len(joined)
+	assert session.byteLength == len(joined.encode("utf-8"))
+	assert session.segmentCount == len(texts)
+	for length in (0, 1, 5, 50, len(joined) + 10):
+		assert session.readPrefix(length) == joined[:length]
+
+
+def test_historyEntryFollowsTheSession():
+	history = ClipboardHistory()
+	history.add("earlier")
+	session = AppendSession("first")
+	entry = history.addSession(session)
+	for text in ("second", "third"):
+		session.append(text)
+		entry = history.extendSession(entry, text)
+	assert entry.isSession
+	assert history.get(SEPARATOR.join(("first", "second", "third"))) is entry
+	assert history.get("first") is None
+	history.finishSession(entry)
+	assert not entry.isSession
+	assert [item.text for item in history] == ["first\r\nsecond\r\nthird", "earlier"]
+
+
+def test_sessionRemovedMeanwhileComesBack():
+	history = ClipboardHistory()
+	session = AppendSession("first")
+	entry = history.addSession(session)
+	history.removeEntry(entry)
+	session.append("second")
+	entry = history.extendSession(entry, "second")
+	assert [item.text for item in history] == ["first\r\nsecond"]
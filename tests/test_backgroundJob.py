@@ -0,0 +1,125 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import queue
+import threading
+
+from ClipboardContentEditor.backgroundJob import BackgroundJob
+from ClipboardContentEditor.textFile import writeTextFile
+
+
+class Recorder:
+	# Stands in for the GUI thread: calls handed to callAfter run in runPending.
+	def __init__(self):
+		self.calls = queue.Queue()
+		self.events = []
+
+	def callAfter(self, func, *args):
+		self.calls.put((func, args))
+
+	def runPending(self):
+		func, args = self.calls.get(timeout=10)
+		func(*args)
+
+	def makeJob(self, work, keepsResult=False):
+		return BackgroundJob(
+			work,
+			lambda result: self.events.append(("done", result)),
+			lambda error: self.events.append(("error", error)),
+			self.callAfter,
+			onCancelled=lambda: self.events.append(("cancelled",)),
+			keepsResult=keepsResult,
+		)
+
+
+def _blockedWork(release, result="result"):
+	# Work that waits for release, then finishes without reporting progress again.
+	def work(progress):
+		progress(0.0)
+		release.wait(10)
+		return result
+	return work
+
+
+def test_resultIsDelivered():
+	recorder = Recorder()
+	job = recorder.makeJob(lambda progress: 42)
+	job.start()
+	recorder.runPending()
+	assert job.finished
+	assert recorder.events == [("done", 42)]
+
+
+def test_cancelledWorkEndsOnceTheWorkerStops():
+	recorder = Recorder()
+	reported = threading.Event()
+
+	def work(progress):
+		while True:
+			progress(0.5)
+			reported.set()
+
+	job = recorder.makeJob(work)
+	job.start()
+	reported.wait(10)
+	job.cancel()
+	assert not job.finished
+	recorder.runPending()
+	assert job.finished
+	assert recorder.events == [("cancelled",)]
+
+
+def test_resultFinishedAfterCancelIsDropped():
+	recorder = Recorder()
+	release = threading.Event()
+	job = recorder.makeJob(_blockedWork(release))
+	job.start()
+	job.cancel()
+	release.set()
+	recorder.runPending()
+	assert recorder.events == [("cancelled",)]
+
+
+def test_keptResultFinishedAfterCancelIsDelivered():
+	recorder = Recorder()
+	release = threading.Event()
+	job = recorder.makeJob(_blockedWork(release, "saved"), keepsResult=True)
+	job.start()
+	job.cancel()
+	release.set()
+	recorder.runPending()
+	assert recorder.events == [("done", "saved")]
+
+
+def test_abandonedJobDeliversNothing():
+	recorder = Recorder()
+	release = threading.Event()
+	job = recorder.makeJob(_blockedWork(release), keepsResult=True)
+	job.start()
+	job.abandon()
+	release.set()
+	recorder.runPending()
+	assert job.finished
+	assert recorder.events == []
+
+
+def test_saveCancelledAtTheLastMomentKeepsTheTarget(tmp_path):
+	path = tmp_path / "out.txt"
+	path.write_text("old")
+	recorder = Recorder()
+
+	def work(progress):
+		def cancelLast(fraction):
+			# Cancel once everything is written, just before the file would be replaced.
+			if fraction == 1.0:
+				job.cancel()
+			progress(fraction)
+		writeTextFile(str(path), "new text", progress=cancelLast)
+
+	job = recorder.makeJob(work, keepsResult=True)
+	job.start()
+	recorder.runPending()
+	assert recorder.events == [("cancelled",)]
+	assert path.read_text() == "old"
+	assert list(tmp_path.iterdir()) == [path]
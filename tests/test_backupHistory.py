@@ -0,0 +1,109 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import random
+
+import pytest
+
+from ClipboardContentEditor import backupHistory
+from ClipboardContentEditor.backupHistory import BackupHistory, BackupStore
+
+
+def _edit(rng, text):
+	start = rng.randint(0, len(text))
+	end = min(len(text), start + rng.randint(0, 20))
+	return text[:start] + "".join(rng.choice("xyz\n") for _ in range(rng.randint(0, 20))) + text[end:]
+
+
+def test_matchesAListModel(monkeypatch):
+	# Small chunks make deltas cross chunk boundaries.
+	monkeypatch.setattr(backupHistory, "_CHUNK_SIZE", 7)
+	rng = random.Random(18)
+	backups = BackupHistory()
+	model = []
+	text = "start of the text\n" * 3
+	for _ in range(600):
+		action = rng.random()
+		if action < 0.55:
+			text = _edit(rng, text) if rng.random() < 0.9 else text
+			backups.push(text)
+			model.insert(0, text)
+		elif action < 0.75 and model:
+			level = rng.randrange(len(model))
+			assert backups.pop(level) == model.pop(level)
+		elif action < 0.8:
+			levels = rng.randrange(6)
+			backups.truncate(levels)
+			del model[levels:]
+		elif model:
+			level = rng.randrange(len(model))
+			assert backups.text(level) == model[level]
+		assert len(backups) == len(model)
+	assert [backups.text(level) for level in range(len(model))] == model
+	assert backups.previews(5) == [text[:5] for text in model]
+
+
+def test_truncate():
+	backups = BackupHistory()
+	for number in range(5):
+		backups.push("text %d" % number)
+	backups.truncate(2)
+	assert [backups.text(level) for level in range(len(backups))] == ["text 4", "text 3"]
+	with pytest.raises(IndexError):
+		backups.text(2)
+	backups.truncate(0)
+	assert len(backups) == 0
+	assert backups.previews(5) == []
+
+
+def test_olderLevelsCostAboutTheirEdit():
+	backups = BackupHistory()
+	text = "x" * 100000
+	backups.push(text)
+	size = backups.memorySize
+	for number in range(10):
+		text = text[:50000] + str(number) + text[50001:]
+		backups.push(text)
+	assert backups.memorySize < size + 10 * 1000
+
+
+def _saveAndLoad(path, backups):
+	store = BackupStore(str(path))
+	store.start()
+	store.save(backups.snapshot())
+	store.close()
+	loaded = BackupHistory()
+	loaded.restore(*BackupStore(str(path)).load())
+	return loaded
+
+
+def test_storeRoundTrip(tmp_path):
+	backups = BackupHistory()
+	for text in ("first é", "second \ud800", "third 😀", "third 😀"):
+		backups.push(text)
+	loaded = _saveAndLoad(tmp_path / "backups.bin", backups)
+	assert [loaded.text(level) for level in range(len(loaded))] == ["third 😀", "third 😀", "second \ud800", "first é"]
+
+
+def test_storeRemovesTheFileWhenEmpty(tmp_path):
+	path = tmp_path / "backups.bin"
+	backups = BackupHistory()
+	backups.push("text")
+	_saveAndLoad(path, backups)
+	backups.clear()
+	assert len(_saveAndLoad(path, backups)) == 0
+	assert not path.exists()
+
+
+def test_damagedStoreLoadsEmpty(tmp_path):
+	path = tmp_path / "backups.bin"
+	backups = BackupHistory()
+	backups.push("first")
+	backups.push("second")
+	_saveAndLoad(path, backups)
+	path.write_bytes(path.read_bytes()[:-3])
+	assert BackupStore(str(path)).load() == (None, [])
+	path.write_bytes(b"something else")
+	assert BackupStore(str(path)).load() == (None, [])
+	assert BackupStore(str(tmp_path / "missing.bin")).load() == (None, [])
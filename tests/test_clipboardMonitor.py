@@ -0,0 +1,74 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import struct
+
+from ClipboardContentEditor.clipboardFormats import FORMAT_HTML, FORMAT_IMAGE
+from ClipboardContentEditor.clipboardMonitor import ClipboardMonitor, FakeClipboardBackend
+
+
+def _makeMonitor(text=None, formats=None):
+	backend = FakeClipboardBackend(text, formats)
+	changes = []
+	monitor = ClipboardMonitor(backend, lambda *change: changes.append(change))
+	return backend, monitor, changes
+
+
+def _dib(width, height):
+	stride = (width * 24 + 31) // 32 * 4
+	header = struct.pack("<IiiHHIIiiII", 40, width, height, 1, 24, 0, stride * height, 0, 0, 0, 0)
+	return header + b"\0" * (stride * height)
+
+
+def test_idlePollOnlyReadsTheSequenceNumber():
+	backend, monitor, changes = _makeMonitor("x" * 100000)
+	assert monitor.poll()
+	assert changes == [("x" * 100000, True, {})]
+	textReads, formatReads = backend.textReads, backend.formatReads
+	for _ in range(100):
+		assert not monitor.poll()
+	assert backend.sequenceReads == 101
+	assert (backend.textReads, backend.formatReads) == (textReads, formatReads)
+
+
+def test_changeIsReportedOnce():
+	backend, monitor, changes = _makeMonitor("first")
+	monitor.poll()
+	backend.setText("second")
+	assert monitor.poll()
+	assert not monitor.poll()
+	assert changes[-1] == ("second", False, {})
+	assert backend.textReads == 2
+
+
+def test_sameTextCopiedAgainIsIgnored():
+	backend, monitor, changes = _makeMonitor("same")
+	monitor.poll()
+	backend.setText("same")
+	assert not monitor.poll()
+	assert len(changes) == 1
+
+
+def test_noteWrittenSuppressesRecapture():
+	backend, monitor, changes = _makeMonitor("copied")
+	monitor.poll()
+	monitor.noteWritten("edited")
+	backend.setText("edited")
+	assert not monitor.poll()
+	assert len(changes) == 1
+	backend.setText("copied later")
+	assert monitor.poll()
+	assert changes[-1] == ("copied later", False, {})
+
+
+def test_imagesAreOnlyFetchedWithoutText():
+	image = _dib(4, 4)
+	backend, monitor, changes = _makeMonitor("start")
+	monitor.poll()
+	backend.setData("text", {FORMAT_HTML: b"<b>text</b>", FORMAT_IMAGE: image})
+	monitor.poll()
+	assert changes[-1] == ("text", False, {FORMAT_HTML: b"<b>text</b>"})
+	backend.setData(formats={FORMAT_IMAGE: image})
+	monitor.poll()
+	assert changes[-1] == ("", False, {FORMAT_IMAGE: image})
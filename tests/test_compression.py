@@ -0,0 +1,68 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import os
+import random
+
+from ClipboardContentEditor.backupHistory import BackupHistory
+from ClipboardContentEditor.compression import CompressedText, TextPacker, packText, packedSize, unpackText
+from ClipboardContentEditor.history import ClipboardHistory
+
+LOG = "".join("2026-01-01 12:00:%02d INFO request %d served in %d ms\n" % (n % 60, n, n % 97) for n in range(5000))
+
+
+def test_largeTextsAreCompressed():
+	packed = packText(LOG, 1024)
+	assert isinstance(packed, CompressedText)
+	assert len(packed) == len(LOG)
+	assert packedSize(packed) < packedSize(LOG) / 4
+	assert unpackText(packed) == LOG
+	assert "".join(packed.iterChunks(1000)) == LOG
+
+
+def test_smallOrIncompressibleTextsStayPlain():
+	assert packText("short", 1024) == "short"
+	assert packText(LOG, 0) is LOG
+	rng = random.Random(8)
+	noise = "".join(chr(rng.randrange(0x4e00, 0x9fff)) for _ in range(20000))
+	assert packText(noise, 1024) is noise
+
+
+def test_nonBmpAndSurrogatesSurvive():
+	text = ("😀 \ud800 Ω " * 2000)
+	assert unpackText(packText(text, 16)) == text
+
+
+def test_packerSpillsHugeTexts(tmp_path):
+	packer = TextPacker()
+	packer.compressThreshold = 1024
+	packer.spillThreshold = len(LOG)
+	packer.spillDirectory = str(tmp_path)
+	spilled = packer.pack(LOG)
+	assert len(os.listdir(tmp_path)) == 1
+	assert unpackText(spilled) == LOG
+	assert isinstance(packer.pack(LOG[:-1]), CompressedText)
+	del spilled
+	assert os.listdir(tmp_path) == []
+
+
+def test_historyHoldsCompressedBodies():
+	history = ClipboardHistory()
+	history.packer.compressThreshold = 1024
+	entry = history.add(LOG)
+	assert not isinstance(entry.packedText, str)
+	assert entry.text == LOG
+	assert history.get(LOG) is entry
+	assert history.memoryUsage < len(LOG) / 4
+
+
+def test_backupBaseIsCompressed():
+	packer = TextPacker()
+	packer.compressThreshold = 1024
+	backups = BackupHistory(packer)
+	backups.push(LOG)
+	backups.push(LOG + "edited")
+	assert backups.memorySize < len(LOG) / 4
+	assert backups.text(0) == LOG + "edited"
+	assert backups.text(1) == LOG
@@ -0,0 +1,112 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import gc
+import random
+import tracemalloc
+
+from ClipboardContentEditor.history import ClipboardHistory, makePreview
+
+MB = 1024 * 1024
+
+
+def _text(number, length=MB):
+	return ("%d " % number).ljust(length, "x")
+
+
+def test_removedBodiesAreCollectable():
+	history = ClipboardHistory()
+	tracemalloc.start()
+	try:
+		for number in range(60):
+			history.add(_text(number))
+			history.truncate(10)
+		gc.collect()
+		held = tracemalloc.get_traced_memory()[0]
+	finally:
+		tracemalloc.stop()
+	assert len(history) == 10
+	assert 10 * MB <= history.memoryUsage < 11 * MB
+	assert held < 12 * MB
+
+
+def _texts(history):
+	return [entry.text for entry in history]
+
+
+def test_matchesAListModel():
+	# The list model keeps the newest text first and drops duplicates.
+	rng = random.Random(2)
+	history = ClipboardHistory()
+	model = []
+	for _ in range(3000):
+		action = rng.random()
+		if action < 0.6:
+			text = "text %d" % rng.randrange(60)
+			history.add(text)
+			if text in model:
+				model.remove(text)
+			model.insert(0, text)
+		elif action < 0.75 and model:
+			index = rng.randrange(len(model))
+			del history[index]
+			del model[index]
+		elif action < 0.85 and model:
+			index = rng.randrange(len(model))
+			history.moveToFront(history[index])
+			model.insert(0, model.pop(index))
+		elif action < 0.9:
+			limit = rng.randrange(40)
+			history.truncate(limit)
+			del model[limit:]
+		else:
+			text = rng.choice(model) if model else "missing"
+			entry = history.get(text)
+			assert (entry is not None) == (text in model)
+			if entry is not None:
+				assert history.indexOf(entry) == model.index(text)
+		assert len(history) == len(model)
+	assert _texts(history) == model
+	assert [history[index].text for index in range(-len(model), len(model))] == model + model
+
+
+def test_truncateKeepsPinnedEntries():
+	history = ClipboardHistory()
+	for number in range(10):
+		history.add("text %d" % number)
+	history.setPinned(history[9], True)
+	history.setPinned(history[5], True)
+	evicted = history.truncate(3)
+	# Pinned entries count towards the limit.
+	assert _texts(history) == ["text 9", "text 4", "text 0"]
+	assert len(evicted) == 7
+
+
+def test_evictToBudgetRemovesLargeAndOldEntriesFirst():
+	history = ClipboardHistory()
+	history.add("a" * 100000)
+	for number in range(5):
+		history.add("small %d" % number)
+	history.add("b" * 100000)
+	history.add("front")
+	budget = history.memoryUsage - 150000
+	removed = history.evictToBudget(budget)
+	assert history.memoryUsage <= budget
+	assert [entry.text[:1] for entry in removed] == ["a", "b"]
+	assert _texts(history)[0] == "front"
+
+
+def test_evictToBudgetSkipsPinnedEntries():
+	history = ClipboardHistory()
+	pinned = history.add("p" * 100000)
+	history.setPinned(pinned, True)
+	history.add("front")
+	assert history.evictToBudget(0) == []
+	assert _texts(history) == ["front", "p" * 100000]
+
+
+def test_makePreview():
+	assert makePreview("one\n\ttwo  three") == "one two three"
+	assert makePreview("x" * 100, 10) == "x" * 10 + "..."
+	assert makePreview("a\r\nb", collapseWhitespace=False) == "a b"
@@ -0,0 +1,39 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import collections
+
+import pytest
+
+from ClipboardContentEditor.historyArchive import ArchiveError, exportEntries, readArchive
+
+Entry = collections.namedtuple("Entry", ("text", "timestamp", "pinned", "size"))
+
+
+def _export(path, texts):
+	entries = [Entry(text, 1000.0 + number, False, len(text)) for number, text in enumerate(texts)]
+	for _ in exportEntries(str(path), entries):
+		pass
+
+
+def test_roundTrip(tmp_path):
+	path = tmp_path / "history.jsonl"
+	_export(path, ["first", "two\nlines", "\ud83d unpaired"])
+	assert [text for text, timestamp, pinned in readArchive(str(path))] == ["first", "two\nlines", "\ud83d unpaired"]
+
+
+def test_invalidUtf8LineIsSkipped(tmp_path):
+	path = tmp_path / "history.jsonl"
+	_export(path, ["first", "last"])
+	lines = path.read_bytes().split(b"\n")
+	lines.insert(2, b'{"text": "bad \xff\xfe"}')
+	path.write_bytes(b"\n".join(lines))
+	assert [text for text, timestamp, pinned in readArchive(str(path))] == ["first", "last"]
+
+
+def test_notAnArchive(tmp_path):
+	path = tmp_path / "other.txt"
+	path.write_bytes(b"\xff\xfe not json\n")
+	with pytest.raises(ArchiveError):
+		list(readArchive(str(path)))
@@ -0,0 +1,133 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import os
+
+from ClipboardContentEditor import historyStore
+from ClipboardContentEditor.history import ClipboardHistory
+from ClipboardContentEditor.historyStore import HistoryStore
+
+
+def _open(path, residentCount=25):
+	# Attaches a store the way the add-on does.
+	history = ClipboardHistory(residentCount)
+	store = HistoryStore(str(path))
+	history.attachStore(store, store.load(residentCount))
+	store.start()
+	return history, store
+
+
+def _describe(history):
+	return [(entry.text, entry.pinned, entry.timestamp) for entry in history]
+
+
+def test_roundTrip(tmp_path):
+	path = tmp_path / "history.log"
+	history, store = _open(path)
+	for number in range(10):
+		history.add("text %d" % number, timestamp=1000.0 + number)
+	history.add("surrogate \ud800 and é", timestamp=2000.0)
+	history.moveToFront(history.get("text 3"))
+	history.setPinned(history.get("text 5"), True)
+	history.removeEntry(history.get("text 7"))
+	expected = _describe(history)
+	store.close()
+
+	history, store = _open(path)
+	try:
+		assert _describe(history) == expected
+		assert history[0].text == "text 3"
+	finally:
+		store.close()
+
+
+def test_onlyResidentBodiesAreLoaded(tmp_path):
+	path = tmp_path / "history.log"
+	history, store = _open(path)
+	for number in range(10):
+		history.add("text %d" % number)
+	store.close()
+
+	history, store = _open(path, residentCount=3)
+	try:
+		assert [entry.isResident for entry in history] == [True] * 3 + [False] * 7
+		assert history[9].text == "text 0"
+		assert history[9].getPreview() == "text 0"
+	finally:
+		store.close()
+
+
+def test_clearIsPersisted(tmp_path):
+	path = tmp_path / "history.log"
+	history, store = _open(path)
+	history.add("old")
+	history.clear()
+	history.add("new")
+	store.close()
+
+	history, store = _open(path)
+	try:
+		assert [entry.text for entry in history] == ["new"]
+	finally:
+		store.close()
+
+
+def test_recordCutShortIsDropped(tmp_path):
+	path = tmp_path / "history.log"
+	history, store = _open(path)
+	history.add("first")
+	history.add("second")
+	store.close()
+	complete = os.path.getsize(path)
+	with open(path, "ab") as handle:
+		handle.write(b"\x01partial record")
+
+	history, store = _open(path)
+	try:
+		assert os.path.getsize(path) == complete
+		history.add("third")
+	finally:
+		store.close()
+	history, store = _open(path)
+	try:
+		assert [entry.text for entry in history] == ["third", "second", "first"]
+	finally:
+		store.close()
+
+
+def test_foreignFileIsSetAside(tmp_path):
+	path = tmp_path / "history.log"
+	path.write_bytes(b"not a history log")
+	history, store = _open(path)
+	store.close()
+	assert len(history) == 0
+	assert (tmp_path / "history.log.bad").read_bytes() == b"not a history log"
+
+
+def test_compactionKeepsLiveEntries(tmp_path, monkeypatch):
+	monkeypatch.setattr(historyStore, "_COMPACT_MIN_DEAD_BYTES", 0)
+	path = tmp_path / "history.log"
+	history, store = _open(path)
+	for number in range(50):
+		history.add("text %d " % number * 100)
+	for number in range(40):
+		history.removeEntry(history.get("text %d " % number * 100))
+	expected = [entry.text for entry in history]
+	store.close()
+	uncompacted = os.path.getsize(path)
+
+	# A store compacts when it starts, if dead records outweigh live ones.
+	history, store = _open(path, residentCount=2)
+	store.close()
+	assert os.path.getsize(path) < uncompacted / 4
+	assert not os.path.exists(str(path) + ".tmp")
+	# Entries whose bodies stayed on disk read them where compaction moved them.
+	assert [entry.isResident for entry in history].count(False) == 8
+	assert [entry.text for entry in history] == expected
+
+	history, store = _open(path)
+	try:
+		assert [entry.text for entry in history] == expected
+	finally:
+		store.close()
@@ -0,0 +1,82 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import random
+
+import pytest
+
+from ClipboardContentEditor.ruleSets import (
+	RuleSyntaxError,
+	compileRules,
+	dumpRuleSets,
+	formatRules,
+	loadRuleSets,
+	parseRules,
+)
+
+
+def _replaceSlowly(text, rules):
+	# Reference: at each position the longest matching find wins; replaced text is not scanned again.
+	replacements = dict(rules)
+	finds = sorted(replacements, key=len, reverse=True)
+	output = []
+	count = 0
+	position = 0
+	while position < len(text):
+		for find in finds:
+			if text.startswith(find, position):
+				output.append(replacements[find])
+				position += len(find)
+				count += 1
+				break
+		else:
+			output.append(text[position])
+			position += 1
+	return "".join(output), count
+
+
+def test_matchesAReferenceScan():
+	rng = random.Random(13)
+	for _ in range(300):
+		rules = [
+			("".join(rng.choice("abc") for _ in range(rng.randint(1, 3))), "".join(rng.choice("abx") for _ in range(rng.randint(0, 3))))
+			for _ in range(rng.randint(1, 5))
+		]
+		text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 40)))
+		assert compileRules(tuple(rules)).apply(text) == _replaceSlowly(text, rules)
+
+
+def test_progressIsReported():
+	reports = []
+	text = "a" * 10000
+	assert compileRules((("a", "b"),)).apply(text, reports.append) == ("b" * 10000, 10000)
+	assert reports and all(0 < fraction <= 1 for fraction in reports)
+
+
+def test_parseAndFormatRoundTrip():
+	rules = [("colour", "color"), (" lead", "trail "), ("a\tb", "line\nbreak"), ("back\\slash", ""), ("x", " ")]
+	assert parseRules(formatRules(rules)) == rules
+
+
+def test_parseSkipsBlankAndCommentLines():
+	assert parseRules("# comment\n\n  teh => the  \nrecieve=>receive") == [("teh", "the"), ("recieve", "receive")]
+
+
+@pytest.mark.parametrize("line", ["no separator", " => empty find"])
+def test_parseReportsTheBadLine(line):
+	with pytest.raises(RuleSyntaxError) as info:
+		parseRules("ok => fine\n" + line)
+	assert info.value.lineNumber == 2
+
+
+def test_storedRuleSetsRoundTrip():
+	ruleSets = {"Spelling": [("teh", "the")], "Quotes": [("“", "\""), ("”", "\"")]}
+	assert loadRuleSets(dumpRuleSets(ruleSets)) == ruleSets
+	assert "\n" not in dumpRuleSets(ruleSets)
+
+
+def test_malformedStoredRuleSetsAreIgnored():
+	assert loadRuleSets("not json") == {}
+	assert loadRuleSets("[1, 2]") == {}
+	assert loadRuleSets('{"good": [["a", "b"], ["", "x"], ["c"], [1, 2]], "bad": "x"}') == {"good": [("a", "b")]}
@@ -0,0 +1,105 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import random
+import time
+
+from ClipboardContentEditor.searchIndex import SearchIndex, _countTerms
+
+
+def _makeIndex():
+	index = SearchIndex()
+	index.start()
+	return index
+
+
+def _terms(index):
+	index._expandPrefix("")
+	return index._vocabulary
+
+
+def test_readdedTermIsListedOnce():
+	index = _makeIndex()
+	try:
+		index.add(1, "apple pie")
+		index.add(2, "banana bread")
+		index.waitIdle()
+		for _ in range(3):
+			index.remove(1)
+			index.add(1, "apple pie")
+			index.waitIdle()
+			assert index.search("app") == [1]
+		assert _terms(index).count("apple") == 1
+	finally:
+		index.close()
+
+
+def test_droppedTermsDoNotAccumulate():
+	index = _makeIndex()
+	try:
+		index.add(0, "constant")
+		for key in range(1, 500):
+			index.add(key, "word%d" % key)
+			index.remove(key)
+		index.waitIdle()
+		assert len(_terms(index)) <= 2 * len(index._postings)
+		assert index.search("word") == []
+		assert index.search("const") == [0]
+	finally:
+		index.close()
+
+
+def test_singleLetterIsNotAPrefix():
+	index = _makeIndex()
+	try:
+		index.add(1, "apple")
+		index.add(2, "a pear")
+		index.waitIdle()
+		assert index.search("a") == [2]
+		assert sorted(index.search("ap")) == [1]
+	finally:
+		index.close()
+
+
+def test_prefixKeepsTheMostCommonTerms():
+	index = _makeIndex()
+	try:
+		for key in range(200):
+			index.add(key, "term%d common" % key)
+		index.add(200, "termpopular")
+		index.add(201, "termpopular")
+		index.waitIdle()
+		keys = index.search("term")
+		# termpopular and 63 of the single-entry terms.
+		assert len(keys) == 65
+		assert {200, 201} <= set(keys)
+	finally:
+		index.close()
+
+
+class ChunkedText:
+	# A body read in pieces, like a spill file.
+	def __init__(self, text, chunkSize):
+		self.text = text
+		self.chunkSize = chunkSize
+
+	def iterChunks(self):
+		for start in range(0, len(self.text), self.chunkSize):
+			yield self.text[start:start + self.chunkSize]
+
+
+def test_chunkedBodiesCountLikeStrings():
+	rng = random.Random(4)
+	for _ in range(200):
+		text = "".join(rng.choice("ab é\n.ß") for _ in range(rng.randint(0, 60)))
+		chunked = ChunkedText(text, rng.randint(1, 8))
+		assert _countTerms(chunked) == _countTerms(text)
+
+
+def test_separatorFreeBodyIsReadInLinearTime():
+	text = "f" * (8 * 1024 * 1024) + " end"
+	started = time.perf_counter()
+	counts = _countTerms(ChunkedText(text, 64 * 1024))
+	assert time.perf_counter() - started < 2
+	assert counts == _countTerms(text)
@@ -0,0 +1,76 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+from ClipboardContentEditor.speechReader import SpeechReader
+
+TEXT = "One. Two. Three. Four. Five."
+
+
+class FakeSynth:
+	# Holds queued chunks until they are spoken or canceled.
+	def __init__(self):
+		self.queued = []
+		self.spoken = []
+		self.cancels = 0
+
+	def speak(self, text, onDone):
+		self.queued.append((text, onDone))
+
+	def speakNext(self):
+		text, onDone = self.queued.pop(0)
+		self.spoken.append(text)
+		onDone()
+
+	def cancel(self):
+		self.cancels += 1
+		self.queued.clear()
+
+
+def _makeReader():
+	synth = FakeSynth()
+	return synth, SpeechReader(synth.speak, synth.cancel)
+
+
+def test_readsToTheEnd():
+	synth, reader = _makeReader()
+	assert reader.start(TEXT, "key")
+	while synth.queued:
+		synth.speakNext()
+	assert "".join(synth.spoken) == TEXT
+	assert not reader.isReading
+	assert reader.position("key") == 0
+
+
+def test_stopRemembersTheUnfinishedChunk():
+	synth, reader = _makeReader()
+	reader.start(TEXT, "key")
+	synth.speakNext()
+	reader.stop()
+	assert synth.cancels == 1
+	assert not reader.isReading
+	assert reader.position("key") == TEXT.index("Two")
+
+
+def test_interruptStopsWithoutCanceling():
+	synth, reader = _makeReader()
+	reader.start(TEXT, "key")
+	synth.speakNext()
+	pending = synth.queued[:]
+	reader.interrupt()
+	assert not reader.isReading
+	assert synth.cancels == 0
+	assert reader.position("key") == TEXT.index("Two")
+	# A report arriving after the interruption changes nothing.
+	pending[0][1]()
+	assert reader.position("key") == TEXT.index("Two")
+	reader.resume(TEXT, "key")
+	assert synth.queued[-2][0].startswith("Two")
+
+
+def test_interruptWhenIdleDoesNothing():
+	synth, reader = _makeReader()
+	reader.interrupt()
+	reader.stop()
+	assert synth.cancels == 0
+	assert not reader.isReading
@@ -0,0 +1,72 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import gzip
+import os
+import random
+
+import pytest
+
+from ClipboardContentEditor.textFile import LINE_ENDINGS, writeTextFile
+
+
+def test_lineEndingsAcrossChunkBoundaries(tmp_path, monkeypatch):
+	# Hundreds of saves; flushing each to the disk is not what this checks.
+	monkeypatch.setattr(os, "fsync", lambda fileno: None)
+	path = str(tmp_path / "out.txt")
+	rng = random.Random(22)
+	for _ in range(200):
+		text = "".join(rng.choice(["a", "\r", "\n", "\r\n"]) for _ in range(rng.randint(0, 30)))
+		chunkSize = rng.randint(1, 6)
+		for lineEnding in ("\r\n", "\n"):
+			writeTextFile(path, text, lineEnding=lineEnding, chunkSize=chunkSize)
+			expected = text.replace("\r\n", "\n").replace("\r", "\n").replace("\n", lineEnding)
+			with open(path, "rb") as handle:
+				assert handle.read() == expected.encode("utf-8")
+
+
+def test_crLfSplitByAChunk(tmp_path):
+	path = tmp_path / "out.txt"
+	writeTextFile(str(path), "ab\r\ncd\r", lineEnding=LINE_ENDINGS["unix"], chunkSize=3)
+	assert path.read_bytes() == b"ab\ncd\n"
+
+
+def test_lineEndingsKept(tmp_path):
+	path = tmp_path / "out.txt"
+	writeTextFile(str(path), "a\rb\r\nc\n", lineEnding=LINE_ENDINGS["keep"], chunkSize=2)
+	assert path.read_bytes() == b"a\rb\r\nc\n"
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "utf-16"])
+def test_encodingsAcrossChunks(tmp_path, encoding):
+	path = tmp_path / "out.txt"
+	text = "é😀 text\n" * 50
+	writeTextFile(str(path), text, encoding=encoding, chunkSize=7)
+	assert path.read_bytes() == text.encode(encoding)
+
+
+def test_gzip(tmp_path):
+	path = tmp_path / "out.txt.gz"
+	text = "line\r\n" * 100000
+	writeTextFile(str(path), text, lineEnding="\n", compress=True, chunkSize=4096)
+	assert path.stat().st_size < len(text) / 20
+	with gzip.open(path, "rb") as handle:
+		assert handle.read() == b"line\n" * 100000
+
+
+def test_progress(tmp_path):
+	reports = []
+	writeTextFile(str(tmp_path / "out.txt"), "x" * 100, progress=reports.append, chunkSize=10)
+	assert reports == [index / 10 for index in range(10)] + [1.0]
+
+
+def test_failureLeavesTheTarget(tmp_path):
+	path = tmp_path / "out.txt"
+	path.write_bytes(b"old")
+	with pytest.raises(UnicodeEncodeError):
+		writeTextFile(str(path), "ascii then é", encoding="ascii", chunkSize=4)
+	with pytest.raises(LookupError):
+		writeTextFile(str(path), "text", encoding="no such codec")
+	assert path.read_bytes() == b"old"
+	assert [item.name for item in tmp_path.iterdir()] == ["out.txt"]
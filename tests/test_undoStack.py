@@ -0,0 +1,110 @@
+# Clipboard Content Editor: edit clipboard text before pasting
+# Copyright (C) 2026 Fauzan January
+# Released under GPL 2
+
+import random
+
+from ClipboardContentEditor.undoStack import (
+	TextDelta,
+	UndoStack,
+	applyDeltas,
+	compactStep,
+	diffTexts,
+	invertDeltas,
+)
+
+
+def _randomText(rng, length):
+	return "".join(rng.choice("ab\n") for _ in range(length))
+
+
+def _randomStep(rng, text):
+	# Non-overlapping replacements in order, offsets counted in the text as each leaves it.
+	deltas = []
+	position = 0
+	shift = 0
+	while True:
+		position += rng.randint(0, 10)
+		if position > len(text) or len(deltas) >= 6:
+			return deltas
+		end = min(len(text), position + rng.randint(0, 5))
+		inserted = _randomText(rng, rng.randint(0, 5))
+		deltas.append(TextDelta(position + shift, text[position:end], inserted))
+		shift += len(inserted) - (end - position)
+		position = end + 1
+
+
+def test_diffFindsTheSmallestSingleDelta():
+	rng = random.Random(17)
+	for _ in range(500):
+		old = _randomText(rng, rng.randint(0, 30))
+		new = _randomText(rng, rng.randint(0, 30))
+		delta = diffTexts(old, new)
+		if old == new:
+			assert delta is None
+			continue
+		assert applyDeltas(old, [delta]) == new
+		assert applyDeltas(new, invertDeltas([delta])) == old
+		prefix = delta.offset
+		assert old[:prefix] == new[:prefix]
+		assert not (delta.removed and delta.inserted and delta.removed[0] == delta.inserted[0])
+
+
+def test_diffOfLargeTextsCrossesCompareBlocks():
+	old = "x" * 10000 + "middle" + "y" * 10000
+	new = "x" * 10000 + "centra" + "y" * 10000
+	assert diffTexts(old, new, 5) == TextDelta(10005, "middle", "centra")
+
+
+def test_stepsUndoAndCompact():
+	rng = random.Random(18)
+	for _ in range(500):
+		old = _randomText(rng, rng.randint(0, 60))
+		deltas = _randomStep(rng, old)
+		new = applyDeltas(old, deltas)
+		assert applyDeltas(new, invertDeltas(deltas)) == old
+		compacted = compactStep(deltas, old, new)
+		assert applyDeltas(old, compacted) == new
+		assert applyDeltas(new, invertDeltas(compacted)) == old
+
+
+def test_undoAndRedoReplayTheTexts():
+	rng = random.Random(19)
+	stack = UndoStack()
+	texts = [_randomText(rng, 40)]
+	for _ in range(30):
+		deltas = _randomStep(rng, texts[-1])
+		stack.push(deltas)
+		texts.append(applyDeltas(texts[-1], deltas))
+	text = texts[-1]
+	for expected in reversed(texts[:-1]):
+		text = applyDeltas(text, stack.undo())
+		assert text == expected
+	assert stack.undo() is None
+	for expected in texts[1:]:
+		text = applyDeltas(text, stack.redo())
+		assert text == expected
+	assert stack.redo() is None
+
+
+def test_newStepDropsRedo():
+	stack = UndoStack()
+	stack.push([TextDelta(0, "", "a")])
+	stack.undo()
+	stack.push([TextDelta(0, "", "b")])
+	assert not stack.canRedo
+	assert stack.undo() == [TextDelta(0, "b", "")]
+
+
+def test_levelAndMemoryLimits():
+	stack = UndoStack(levels=3)
+	for number in range(10):
+		stack.push([TextDelta(0, "", str(number))])
+	assert [stack.undo() for _ in range(4)][3] is None
+	stack = UndoStack(memoryLimit=50000)
+	for _ in range(10):
+		stack.push([TextDelta(0, "", "x" * 20000)])
+	assert stack.memorySize <= 50000
+	assert sum(stack.undo() is not None for _ in range(10)) == 2
+	stack.clear()
+	assert stack.memorySize == 0 and not stack.canUndo